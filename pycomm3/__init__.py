@@ -33,6 +33,9 @@ from .const import CommonService, ClassCode, TagService, DataType, ConnectionMan
 from .bytes_ import Pack, Unpack
 from .tag import Tag
 from .exceptions import PycommError, CommError, DataError, RequestError
+from .socket_ import SocketOptions
 from .cip_base import CIPDriver
 from .clx import LogixDriver
 from .slc import SLCDriver
+from .async_ import AsyncCIPDriver, AsyncLogixDriver
+from .pool import ConnectionPool
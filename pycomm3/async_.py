@@ -0,0 +1,710 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020 Ian Ottoway <ian@ottoway.dev>
+# Copyright (c) 2014 Agostino Ruscito <ruscito@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+__all__ = ['AsyncCIPDriver', 'AsyncLogixDriver', ]
+
+import asyncio
+import logging
+import struct
+from os import urandom
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .exceptions import DataError, CommError, RequestError
+from .tag import Tag
+from .bytes_ import Pack
+from .cip_base import CIPDriver, _check_pipelined_requests, _module_info_params, _module_info_response
+from .clx import (LogixDriver, ReadGroup, ReadWriteReturnType, TagValueType, _base_tag_name,
+                  _PLC_NAME_PARAMS, _CHANGE_INDICATOR_PARAMS, _GET_PLC_TIME_PARAMS, _plc_time_response, _set_plc_time_params)
+from .const import CHASSIS_SLOTS, HEADER_SIZE, MICRO800_PREFIX, MIN_VER_INSTANCE_IDS
+from .packets import RequestPacket, ResponsePacket, DataFormatType
+from .socket_ import SocketOptions, apply_socket_options, check_timeout
+
+
+class AsyncSocket:
+    """
+    An asyncio stream version of :class:`~pycomm3.socket_.Socket`
+    """
+    __log = logging.getLogger(f'{__module__}.{__qualname__}')
+
+    def __init__(self, timeout=5.0, options: Optional[SocketOptions] = None):
+        self.timeout = check_timeout(timeout)
+        self.options = options or SocketOptions()
+        self._reader = None
+        self._writer = None
+
+    async def connect(self, host, port):
+        source = self.options.source_address
+        local_addr = (source, 0) if isinstance(source, str) else source
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, local_addr=local_addr),
+                self.timeout if self.options.connect_timeout is None else check_timeout(self.options.connect_timeout,
+                                                                                        'connect_timeout'))
+            apply_socket_options(self._writer.get_extra_info('socket'), self.options)
+        except asyncio.TimeoutError:
+            raise CommError("Socket timeout during connection.")
+        except OSError as err:
+            raise CommError("socket connection broken.") from err
+
+    async def send(self, msg):
+        try:
+            self._writer.write(msg)
+            await self._writer.drain()
+        except (OSError, AttributeError) as err:
+            raise CommError("socket connection broken.") from err
+        return len(msg)
+
+    async def receive(self, timeout: Optional[float] = None) -> bytes:
+        """
+        Receives a single encapsulated message, reads the header and then exactly the length of data it declares.
+        ``timeout`` overrides the default timeout for this receive only.
+        """
+        timeout = self.timeout if timeout is None else check_timeout(timeout)
+        try:
+            header = await asyncio.wait_for(self._reader.readexactly(HEADER_SIZE), timeout)
+            data_len = struct.unpack_from('<H', header, 2)[0]
+            data = await asyncio.wait_for(self._reader.readexactly(data_len), timeout)
+            return header + data
+        except asyncio.TimeoutError as err:
+            raise CommError('socket timeout waiting for reply') from err
+        except (OSError, asyncio.IncompleteReadError, AttributeError) as err:
+            raise CommError('socket connection broken') from err
+
+    def has_data(self) -> bool:
+        """
+        Returns True if the other end has closed the connection or it failed.  Unlike the sync socket, data already
+        received by the stream but not yet read is not checked, the stream has no public way to do so.
+        """
+        if self._reader is None:
+            raise CommError('socket connection broken')
+        return self._reader.at_eof() or self._reader.exception() is not None or self._writer.is_closing()
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._reader = None
+
+
+class AsyncCIPDriver(CIPDriver):
+    """
+    An asyncio version of the :class:`~pycomm3.CIPDriver`.  Uses the same request and response packets, but
+    the messages are sent over an asyncio stream instead of a blocking socket.  All methods that communicate with
+    the target are coroutines.  Requests sent using the same driver are sent one at a time, to poll many devices
+    concurrently use a separate driver for each one.
+    """
+    __log = logging.getLogger(f'{__module__}.{__qualname__}')
+
+    def __init__(self, path: str, *args, **kwargs):
+        super().__init__(path, *args, **kwargs)
+        self._lock = None
+
+    def __enter__(self):
+        raise TypeError(f'use "async with" for the {self.__class__.__name__}')
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            await self.close()
+        except CommError:
+            self.__log.exception('Error closing connection.')
+            return False
+        else:
+            if not exc_type:
+                return True
+            else:
+                self.__log.exception('Unhandled Client Error', exc_info=(exc_type, exc_val, exc_tb))
+                return False
+
+    async def _send_request(self, request: RequestPacket) -> ResponsePacket:
+        """
+        Sends all messages for a request and returns the final response
+        """
+        if request._send_error():
+            return request.send()  # request will not be sent, only the failed response is created
+
+        if self._lock is None:
+            raise CommError('connection not opened')
+
+        async with self._lock:
+            response = await self._exchange(request)
+
+        self.__log.debug(f'Received: {response!r}')
+        return response
+
+    async def _exchange(self, request: RequestPacket) -> ResponsePacket:
+        """
+        Sends the messages for a request, the lock must be held by the caller
+        """
+        messages = request._messages()
+        try:
+            message = next(messages)
+            while True:
+                await self._sock.send(message)
+                self.__log.debug(f'Sent: {request!r}')
+                message = messages.send(await self._sock.receive(request.timeout))
+        except StopIteration as stop:
+            return stop.value
+
+    async def _send_pipelined(self, requests: Iterable[RequestPacket],
+                              window: Optional[int] = None) -> List[Tuple[RequestPacket, Any]]:
+        """
+        Sends the requests, keeping up to ``window`` requests waiting for a reply at once, see
+        :meth:`CIPDriver._send_pipelined`.  No other requests are sent using the driver until all the replies have
+        been received.
+
+        :return: list of (request, response) tuples in the order the replies are received
+        """
+        window = window or self.pipeline_window
+        requests = _check_pipelined_requests(requests)
+        results = []
+        pending = {}
+
+        if self._lock is None:
+            raise CommError('connection not opened')
+
+        async with self._lock:
+            for request in requests:
+                if request._send_error():
+                    results.append((request, request.send()))  # request will not be sent
+                elif window > 1 and request.can_pipeline:
+                    if len(pending) >= window:
+                        results.append(await self._receive_pipelined(pending))
+                    key = request._pipeline_key()
+                    await self._sock.send(request._build_request())
+                    self.__log.debug(f'Sent: {request!r}')
+                    pending[key] = request
+                else:
+                    while pending:
+                        results.append(await self._receive_pipelined(pending))
+                    try:
+                        response = await self._exchange(request)
+                        self.__log.debug(f'Received: {response!r}')
+                    except (RequestError, DataError) as err:
+                        response = err
+                    results.append((request, response))
+
+            while pending:
+                results.append(await self._receive_pipelined(pending))
+
+        return results
+
+    async def _receive_pipelined(self, pending: dict) -> Tuple[RequestPacket, Any]:
+        """
+        Receives the next reply and pops the matching request from ``pending``, see
+        :meth:`CIPDriver._receive_pipelined`
+        """
+        while True:
+            try:
+                reply = await self._sock.receive(self._pipelined_timeout(pending))
+            except Exception as err:
+                raise CommError('failed to receive reply') from err
+
+            result = self._pipelined_response(pending, reply)
+            if result is not None:
+                return result
+
+    async def _require_forward_open(self):
+        """
+        Ensures a forward open has been completed with the target, like the ``with_forward_open`` decorator
+        """
+        opened = False
+        if not await self._forward_open():
+            if self._cfg['extended forward open']:
+                self.__log.info('Extended Forward Open failed, attempting standard Forward Open.')
+                self._cfg['extended forward open'] = False
+                if await self._forward_open():
+                    opened = True
+        else:
+            opened = True
+
+        if not opened:
+            raise DataError('Target did not connected.')
+
+    @classmethod
+    async def list_identity(cls, path) -> Optional[str]:
+        """
+        Uses the ListIdentity service to identify the target
+
+        :return: device identity if reply contains valid response else None
+        """
+        plc = cls(path, init_tags=False, init_info=False)
+        await plc.open()
+        identity = await plc._list_identity()
+        await plc.close()
+        return identity
+
+    async def _list_identity(self):
+        request = self.new_request('list_identity')
+        response = await self._send_request(request)
+        return response.identity
+
+    async def get_module_info(self, slot):
+        try:
+            response = await self.generic_message(**_module_info_params(slot))
+            return _module_info_response(response)
+        except Exception as err:
+            raise DataError('error getting module info') from err
+
+    async def get_rack_info(self, slots: Union[int, Iterable[int]] = CHASSIS_SLOTS,
+                            slot_timeout: float = 0.25) -> Dict[int, dict]:
+        """
+        Gets the module info for every slot in the chassis at once, see :meth:`CIPDriver.get_rack_info`.
+        """
+        requests = self._rack_info_requests(slots, slot_timeout)
+        return self._rack_info_response(requests, await self._send_pipelined(requests, window=len(requests)))
+
+    @classmethod
+    async def survey(cls, paths: Iterable[str], slots: Union[int, Iterable[int]] = CHASSIS_SLOTS,
+                     slot_timeout: float = 0.25, max_workers: int = 16) -> Dict[str, Optional[Dict[int, dict]]]:
+        """
+        Gets the rack info of many chassis, ``max_workers`` chassis at a time, see :meth:`CIPDriver.survey`.
+        """
+        if isinstance(slots, int):
+            slots = range(slots)
+        slots = list(slots)
+        paths = list(paths)
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def _rack_info(path):
+            async with semaphore:
+                plc = cls(path, init_tags=False, init_info=False)
+                try:
+                    await plc.open()
+                    return await plc.get_rack_info(slots, slot_timeout)
+                except Exception as err:
+                    cls.__log.warning(f'Failed to get rack info for {path} - {err}')
+                    return None
+                finally:
+                    try:
+                        await plc.close()
+                    except CommError:
+                        pass
+
+        return dict(zip(paths, await asyncio.gather(*(_rack_info(path) for path in paths))))
+
+    async def open(self):
+        """
+        Creates a new Ethernet/IP connection to target device and registers a CIP session.
+
+        :return: True if successful, False otherwise
+        """
+        if self._connection_opened:
+            return
+        try:
+            if self._sock is None:
+                self._sock = AsyncSocket(self._cfg['timeout'], self._cfg['socket_options'])
+            await self._sock.connect(self._cfg['ip address'], self._cfg['port'])
+            self._lock = asyncio.Lock()
+            self._connection_opened = True
+            self._cfg['cid'] = urandom(4)
+            self._cfg['vsn'] = urandom(4)
+            if await self._register_session() is None:
+                self.__log.warning("Session not registered")
+                return False
+            return True
+        except Exception as err:
+            raise CommError('failed to open a connection') from err
+
+    async def _register_session(self) -> Optional[int]:
+        if self._session:
+            return self._session
+
+        self._session = 0
+        request = self._register_session_request()
+        response = await self._send_request(request)
+        return self._register_session_response(response)
+
+    async def _forward_open(self):
+        if self._target_is_connected:
+            return True
+
+        if self._session == 0:
+            raise CommError("A Session Not Registered Before forward_open.")
+
+        response = await self.generic_message(**self._forward_open_params())
+        return self._forward_open_response(response)
+
+    async def close(self):
+        """
+        Closes the current connection and un-registers the session.
+        """
+        errs = []
+        try:
+            if self._target_is_connected:
+                await self._forward_close()
+            if self._session != 0:
+                await self._un_register_session()
+        except Exception as err:
+            errs.append(err)
+            self.__log.warning(f"Error on close() -> session Err: {err}")
+
+        try:
+            if self._sock:
+                await self._sock.close()
+        except Exception as err:
+            errs.append(err)
+            self.__log.warning(f"close() -> _sock.close Err: {err}")
+
+        self._sock = None
+        self._lock = None
+        self._target_is_connected = False
+        self._session = 0
+        self._connection_opened = False
+
+        if errs:
+            raise CommError(' - '.join(str(e) for e in errs))
+
+    async def reconnect(self):
+        """
+        Reopens a broken connection to the target, see :meth:`CIPDriver.reconnect`.
+
+        :raises CommError: if the connection could not be reopened
+        """
+        reopen_connection = self._target_is_connected
+        try:
+            if self._sock:
+                await self._sock.close()
+        except Exception as err:
+            self.__log.warning(f"reconnect() -> _sock.close Err: {err}")
+
+        self._sock = None
+        self._lock = None
+        self._target_is_connected = False
+        self._session = 0
+        self._connection_opened = False
+
+        if not await self.open():
+            raise CommError('failed to register a session')
+
+        if reopen_connection and not await self._forward_open():
+            raise CommError('failed to reopen the connection')
+
+        self.__log.info('Reconnected to target')
+
+    async def check_connection(self) -> bool:
+        """
+        Checks the connection is still usable by sending an encapsulation NOP, see :meth:`CIPDriver.check_connection`.
+
+        :return: True if the connection is open and usable, False otherwise
+        """
+        if not self._connection_opened or self._sock is None:
+            return False
+
+        try:
+            if self._sock.has_data():
+                return False
+            await self._sock.send(self.new_request('nop')._build_request())  # target does not reply
+        except CommError:
+            return False
+
+        return True
+
+    async def _un_register_session(self):
+        request = self.new_request('unregister_session')
+        await self._sock.send(request._build_request())  # target does not reply
+        self._session = None
+        self.__log.info('Session Unregistered')
+
+    async def _forward_close(self):
+        if self._session == 0:
+            raise CommError("A session need to be registered before to call forward_close.")
+
+        response = await self.generic_message(**self._forward_close_params())
+        return self._forward_close_response(response)
+
+    async def generic_message(self,
+                              service: Union[int, bytes],
+                              class_code: Union[int, bytes],
+                              instance: Union[int, bytes],
+                              attribute: Union[int, bytes] = b'',
+                              request_data: bytes = b'',
+                              data_format: Optional[DataFormatType] = None,
+                              name: str = 'generic',
+                              connected: bool = True,
+                              unconnected_send: bool = False,
+                              route_path: Union[bool, bytes] = True,
+                              unconnected_send_timeout: Optional[float] = None) -> Tag:
+        """
+        Perform a generic CIP message, see :meth:`CIPDriver.generic_message` for a description of the parameters.
+        """
+        if connected:
+            await self._require_forward_open()
+
+        request = self._generic_message_request(service, class_code, instance, attribute, request_data, data_format,
+                                                connected, unconnected_send, route_path, unconnected_send_timeout)
+        response = await self._send_request(request)
+
+        return Tag(name, response.value, None, error=response.error)
+
+
+class AsyncLogixDriver(AsyncCIPDriver, LogixDriver):
+    """
+    An asyncio version of the :class:`~pycomm3.LogixDriver`.  Controller info and tag definitions are initialized
+    when the connection is opened instead of when the driver is created, so it must be used in an ``async with`` block
+    or :meth:`open` must be awaited before reading or writing.
+
+    >>> async with AsyncLogixDriver('10.20.30.100') as plc:
+    >>>     tag = await plc.read('DINT1')
+    """
+    __log = logging.getLogger(f'{__module__}.{__qualname__}')
+
+    def __init__(self, path: str, *args, micro800: bool = False,
+                 init_info: bool = True, init_tags: bool = True, init_program_tags: bool = False, **kwargs):
+        """
+        See :meth:`LogixDriver.__init__` for a description of the parameters, ``connections`` must be ``1``.
+        """
+        super().__init__(path, *args, micro800=False, init_info=False, init_tags=False, **kwargs)
+        self._micro800 = micro800
+        self._init_args = (init_info, init_tags, init_program_tags)
+        self._initialized = False
+
+    @LogixDriver.connections.setter
+    def connections(self, value: int):
+        # requests are only sent on this driver's connection, reads are not split between parallel connections
+        if value != 1:
+            raise ValueError('AsyncLogixDriver only supports a single connection, connections must be 1')
+        LogixDriver.connections.fset(self, value)
+
+    async def open(self):
+        """
+        Opens the connection to the PLC, the first time the connection is opened the controller info and tag
+        definitions are also initialized.
+
+        :return: True if successful, False otherwise
+        """
+        if self._connection_opened:
+            return
+
+        opened = await super().open()
+        if opened and not self._initialized:
+            self._initialized = True
+            await self._initialize(*self._init_args)
+
+        return opened
+
+    async def close(self):
+        """
+        Closes the connection and releases the shared tag definitions, see :meth:`AsyncCIPDriver.close`.
+        """
+        self._release_shared_tags()
+        await super().close()
+
+    async def _initialize(self, init_info, init_tags, init_program_tags):
+        if init_info:
+            target_identity = await self._list_identity()
+            self._micro800 = target_identity.get('product_name', '').startswith(MICRO800_PREFIX)
+            await self.get_plc_info()
+
+            self.use_instance_ids = (self.info.get('version_major', 0) >= MIN_VER_INSTANCE_IDS) and not self._micro800
+            if not self._micro800:
+                await self.get_plc_name()
+
+        if self._micro800:  # strip off backplane/0 from path, not used for these processors
+            _path = Pack.epath(self._cfg['cip_path'][:-2])
+            self._cfg['cip_path'] = _path[1:]  # leave out the len, we sometimes add to the path later
+
+        if init_tags:
+            await self._init_tag_list(program='*' if init_program_tags else None)
+
+    async def _init_tag_list(self, program):
+        self._tag_list_program = program
+        key = self._tag_definitions_key()
+        if key is None:
+            await self.get_tag_list(program)
+            return
+
+        change_indicator = await self.get_change_indicator()
+        entry = self._acquire_shared_tags(key) if self._cfg['share_tags'] else None
+        definitions = entry.get(change_indicator, program) if entry is not None else None
+        if definitions is not None:
+            self._use_tag_definitions(definitions, entry.generation)
+            return
+
+        if not (self._cfg['tag_cache'] and self._load_tag_cache(key, change_indicator, program)):
+            await self.get_tag_list(program)
+            if self._cfg['tag_cache']:
+                self._save_tag_cache(key, change_indicator, program)
+
+        if entry is not None:
+            entry.register(change_indicator, program, self._tag_definitions())
+
+    async def get_plc_name(self) -> str:
+        """
+        Requests the name of the program running in the PLC, see :meth:`LogixDriver.get_plc_name`.
+        """
+        await self._require_forward_open()
+        try:
+            response = await self.generic_message(**_PLC_NAME_PARAMS)
+            return self._plc_name_response(response)
+        except Exception as err:
+            raise DataError('failed to get the plc name') from err
+
+    async def get_change_indicator(self) -> Optional[str]:
+        """
+        Reads the change indicator from the controller, see :meth:`LogixDriver.get_change_indicator`.
+        """
+        await self._require_forward_open()
+        return self._change_indicator_response(await self.generic_message(**_CHANGE_INDICATOR_PARAMS))
+
+    async def get_plc_info(self) -> dict:
+        """
+        Reads basic information from the controller, see :meth:`LogixDriver.get_plc_info`.
+        """
+        try:
+            response = await self.generic_message(**self._plc_info_params())
+            return self._plc_info_response(response)
+        except Exception as err:
+            raise DataError('Failed to get PLC info') from err
+
+    async def get_tag_list(self, program: str = None, cache: bool = True) -> List[dict]:
+        """
+        Reads the tag list from the controller and the definition for each tag, see :meth:`LogixDriver.get_tag_list`.
+        """
+        await self._require_forward_open()
+        return await self._run_steps(self._get_tag_list_steps(program, cache))
+
+    async def refresh_tag_list(self) -> Dict[str, List[str]]:
+        """
+        Updates the tag definitions after changes to the program, see :meth:`LogixDriver.refresh_tag_list`.
+        """
+        await self._require_forward_open()
+        return await self._run_steps(self._refresh_tag_list_steps())
+
+    async def _run_steps(self, steps):
+        """
+        Runs the steps of an operation shared with the sync driver, see :meth:`LogixDriver._run_steps`.
+        The requests of each step are sent one at a time, since requests are not pipelined by the async driver.
+        """
+        try:
+            requests = next(steps)
+            while True:
+                sent = []
+                for request in requests:
+                    try:
+                        response = await self._send_request(request)
+                    except (RequestError, DataError) as err:
+                        response = err
+                    sent.append((request, response))
+                requests = steps.send(sent)
+        except StopIteration as stop:
+            return stop.value
+
+    async def _upload_lazy_data_types(self, tags):
+        """
+        Uploads the data types for the struct tags used in ``tags`` that have not been uploaded yet, see
+        :attr:`LogixDriver.lazy_data_types`.  Done before the tags are parsed, since parsing cannot send requests.
+        """
+        unresolved = [tag for tag in (self._tags.get(_base_tag_name(name)) for name in tags)
+                      if tag is not None and tag['tag_type'] == 'struct' and tag['data_type'] is None]
+        if unresolved:
+            await self._run_steps(self._lazy_data_types_steps(unresolved))
+
+    def _lazy_data_type(self, tag: dict) -> dict:
+        raise DataError(f'Data type for {tag["tag_name"]} has not been uploaded')
+
+    def _get_data_type(self, instance_id):
+        # nested UDTs are uploaded with the template using them, parsing a template cannot send requests
+        if instance_id not in self._cache['id:udt']:
+            raise DataError(f'Data type with instance id {instance_id} has not been uploaded')
+        return self._cache['id:udt'][instance_id]
+
+    async def read(self, *tags: str) -> ReadWriteReturnType:
+        """
+        Read the value of tag(s), see :meth:`LogixDriver.read`.
+
+        :param tags: one or many tags to read
+        :return: a single or list of ``Tag`` objects
+        """
+        await self._require_forward_open()
+        await self._upload_lazy_data_types(tags)
+        parsed_requests = self._parse_requested_tags(tags)
+        requests = self._read_build_requests(parsed_requests)
+        read_results = await self._send_read_requests(requests, parsed_requests)
+        return self._read_results(tags, parsed_requests, read_results)
+
+    async def prepare_read(self, *tags: str) -> ReadGroup:
+        """
+        Prepares a group of tags to be read repeatedly, see :meth:`LogixDriver.prepare_read`.  Reading the
+        group is a coroutine, ``results = await group.read()``.
+        """
+        await self._require_forward_open()
+        await self._upload_lazy_data_types(tags)
+        return ReadGroup(self, tags)
+
+    async def _read_group(self, group: ReadGroup) -> ReadWriteReturnType:
+        await self._require_forward_open()
+        self._check_shared_tags()
+        requests = group._renew_requests()
+        read_results = await self._send_read_requests(requests, group._parsed_requests)
+        return self._read_results(group.tags, group._parsed_requests, read_results)
+
+    async def _send_read_requests(self, requests, parsed_requests):
+        read_results = await self._send_requests(requests)
+        uncoalesced = self._uncoalesced_requests(parsed_requests, read_results)
+        if uncoalesced:
+            read_results.update(await self._send_requests(uncoalesced))
+        return read_results
+
+    async def write(self, *tags_values: Tuple[str, TagValueType]) -> ReadWriteReturnType:
+        """
+        Write to tag(s), see :meth:`LogixDriver.write`.
+
+        :param tags_values: one or many 2-element tuples (tag name, value)
+        :return: a single or list of ``Tag`` objects.
+        """
+        await self._require_forward_open()
+        await self._upload_lazy_data_types(tag for tag, _ in tags_values)
+        parsed_requests = self._parse_write_requests(tags_values)
+        requests, bit_writes = self._write_build_requests(parsed_requests)
+        write_results = await self._send_requests(requests)
+        return self._write_results(tags_values, parsed_requests, write_results)
+
+    async def _send_requests(self, requests):
+        results = {}
+
+        for request in requests:
+            try:
+                response = await self._send_request(request)
+            except (RequestError, DataError) as err:
+                response = err
+            self._request_results(request, response, results)
+
+        return results
+
+    async def get_plc_time(self, fmt: str = '%A, %B %d, %Y %I:%M:%S%p') -> Tag:
+        """
+        Gets the current time of the PLC system clock, see :meth:`LogixDriver.get_plc_time`.
+        """
+        tag = await self.generic_message(**_GET_PLC_TIME_PARAMS)
+        return _plc_time_response(tag, fmt)
+
+    async def set_plc_time(self, microseconds: Optional[int] = None) -> Tag:
+        """
+        Set the time of the PLC system clock, see :meth:`LogixDriver.set_plc_time`.
+        """
+        return await self.generic_message(**_set_plc_time_params(microseconds))
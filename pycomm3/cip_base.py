@@ -24,20 +24,24 @@
 
 __all__ = ['CIPDriver', 'with_forward_open', 'parse_connection_path', ]
 
+import ipaddress
 import logging
 import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 from os import urandom
-from typing import Union, Optional, List
+from typing import Union, Optional, List, Iterable, Generator, Tuple, Any, Dict
 
 from .exceptions import DataError, CommError, RequestError
 from .tag import Tag
 from .bytes_ import Pack, Unpack
 from .const import (PATH_SEGMENTS, ConnectionManagerInstance, PRIORITY, ClassCode, TIMEOUT_MULTIPLIER, TIMEOUT_TICKS,
                     TRANSPORT_CLASS, PRODUCT_TYPES, VENDORS, STATES, MSG_ROUTER_PATH,
-                    ConnectionManagerService, CommonService)
-from .packets import REQUEST_MAP, RequestPacket, DataFormatType
-from .socket_ import Socket
+                    ConnectionManagerService, CommonService, EncapsulationCommand, ENIP_PORT, LIST_IDENTITY_MAX_DELAY,
+                    CHASSIS_SLOTS)
+from .packets import REQUEST_MAP, RequestPacket, DataFormatType, ListIdentityResponsePacket
+from .socket_ import Socket, SocketOptions, check_timeout
 
 
 def with_forward_open(func):
@@ -71,7 +75,8 @@ class CIPDriver:
     """
     __log = logging.getLogger(f'{__module__}.{__qualname__}')
 
-    def __init__(self, path: str, *args, large_packets: bool = True, **kwargs):
+    def __init__(self, path: str, *args, large_packets: bool = True, timeout: float = 5.0,
+                 socket_options: Optional[SocketOptions] = None, **kwargs):
         """
         :param path: CIP path to intended target
 
@@ -85,7 +90,8 @@ class CIPDriver:
 
                 Both the IP Address and IP Address/Slot options are shortcuts, they will be replaced with the
                 CIP path automatically.  The ``enet`` / ``backplane`` (or ``bp``) segments are symbols for the CIP routing
-                port numbers and will be replaced with the correct value.
+                port numbers and will be replaced with the correct value.  The IP address may also include the TCP
+                port, like ``10.20.30.100:44818``, if the target is not using the default EtherNet/IP port.
 
         :param large_packets: if True (default), the *Extended Forward Open* service will be used
 
@@ -95,6 +101,10 @@ class CIPDriver:
                 The standard *Forward Open* is limited to 500 bytes.  Not all hardware supports the large packet size,
                 like ENET or ENBT modules or ControlLogix version 19 or lower.  **This argument is no longer required
                 as of 0.5.1, since it will automatically try a standard Forward Open if the extended one fails**
+
+        :param timeout: seconds to wait for each reply (and for the connection, unless set in ``socket_options``)
+        :param socket_options: options for the TCP socket, like ``TCP_NODELAY``, keepalive, buffer sizes, and the
+                               local address to bind to, see :class:`~pycomm3.SocketOptions`
         """
 
         self._sequence_number = 1
@@ -105,13 +115,15 @@ class CIPDriver:
         self._target_is_connected = False
         self._info = {}
         ip, _path = parse_connection_path(path)
+        _, port = _parse_address(path.split('/')[0])
 
         self._cfg = {
             'context': b'_pycomm_',
             'protocol version': b'\x01\x00',
             'rpi': 5000,
-            'port': 0xAF12,  # 44818
-            'timeout': 10,
+            'port': port,
+            'timeout': check_timeout(timeout),
+            'socket_options': socket_options,
             'ip address': ip,
             # is cip_path the right term?  or request_path? or something else?
             'cip_path': _path[1:],  # leave out the len, we sometimes add to the path later
@@ -121,7 +133,8 @@ class CIPDriver:
             'vid': b'\x09\x10',
             'vsn': b'\x09\x10\x19\x71',
             'name': 'LogixDriver',
-            'extended forward open': large_packets}
+            'extended forward open': large_packets,
+            'pipeline_window': 1}
 
     def __enter__(self):
         self.open()
@@ -158,6 +171,39 @@ class CIPDriver:
         """CIP connection size, ``4000`` if using Extended Forward Open else ``500``"""
         return 4000 if self._cfg['extended forward open'] else 500
 
+    @property
+    def timeout(self) -> float:
+        """
+        Seconds to wait for each reply, default is ``5``, must be greater than 0.  Changing the timeout also applies to
+        an opened connection.  Requests may override it for a single request, e.g. ``request.send(timeout=30)``.
+        """
+        return self._cfg['timeout']
+
+    @timeout.setter
+    def timeout(self, value: float):
+        self._cfg['timeout'] = check_timeout(value)
+        if self._sock is not None:
+            self._sock.timeout = value
+
+    @property
+    def pipeline_window(self) -> int:
+        """
+        Maximum number of connected requests that may be waiting for a reply at the same time, default is ``1``.
+
+        With a window larger than 1, requests are sent without waiting for the reply of the previous request and
+        replies are matched back to their request using the sequence count of the connected message.  This
+        reduces the total time spent waiting on the network when sending many requests, but not all targets
+        support more than one outstanding request per connection.  The :class:`~pycomm3.LogixDriver` also uses
+        the window when reading the UDT templates while uploading the tag list.
+        """
+        return self._cfg['pipeline_window']
+
+    @pipeline_window.setter
+    def pipeline_window(self, value: int):
+        if value < 1:
+            raise ValueError('pipeline_window must be 1 or greater')
+        self._cfg['pipeline_window'] = value
+
     def new_request(self, command: str, *args, **kwargs) -> RequestPacket:
         """
         Creates a new request packet for the given command.
@@ -168,6 +214,7 @@ class CIPDriver:
             - `send_rr_data`
             - `register_session`
             - `unregister_session`
+            - `nop`
             - `list_identity`
             - `multi_request`
             - `read_tag`
@@ -197,6 +244,80 @@ class CIPDriver:
 
         return self._sequence_number
 
+    def _send_pipelined(self, requests: Iterable[RequestPacket],
+                        window: Optional[int] = None) -> Generator[Tuple[RequestPacket, Any], None, None]:
+        """
+        Sends the requests, keeping up to ``window`` (default :attr:`pipeline_window`) requests waiting for a reply
+        at once.  Requests that cannot be pipelined (like fragmented services) are sent by themselves after all
+        outstanding replies are received, and requests with errors are answered with an error response without being
+        sent, the same as :meth:`RequestPacket.send`.
+
+        :return: generator of (request, response) tuples in the order the replies are received.  For requests sent
+                 by themselves, the response may instead be the ``RequestError`` or ``DataError`` raised sending it.
+        :raises RequestError: if a request allowing pipelining cannot be matched to its reply, nothing is sent
+        """
+        window = window or self.pipeline_window
+        requests = _check_pipelined_requests(requests)
+        pending = {}
+
+        for request in requests:
+            if window > 1 and request.can_pipeline and not request._send_error():
+                if len(pending) >= window:
+                    yield self._receive_pipelined(pending)
+                key = request._pipeline_key()
+                request._send_request()
+                pending[key] = request
+            else:
+                while pending:
+                    yield self._receive_pipelined(pending)
+                try:
+                    yield request, request.send()
+                except (RequestError, DataError) as err:
+                    yield request, err
+
+        while pending:
+            yield self._receive_pipelined(pending)
+
+    def _receive_pipelined(self, pending: dict) -> Tuple[RequestPacket, Any]:
+        """
+        Receives the next reply and pops the matching request from ``pending`` (``{key: request}``), connected replies
+        are matched by their sequence count and unconnected replies by their sender context.  The reply may be for
+        any of the pending requests, so waits for the longest timeout of the pending requests.
+        """
+        while True:
+            try:
+                reply = self._sock.receive(self._pipelined_timeout(pending))
+            except Exception as err:
+                raise CommError('failed to receive reply') from err
+
+            result = self._pipelined_response(pending, reply)
+            if result is not None:
+                return result
+
+    def _pipelined_timeout(self, pending: dict) -> float:
+        """
+        Returns the longest timeout of the pending requests
+        """
+        return max(self._sock.timeout if request.timeout is None else request.timeout for request in pending.values())
+
+    def _pipelined_response(self, pending: dict, reply) -> Optional[Tuple[RequestPacket, Any]]:
+        """
+        Pops the request the reply is for from ``pending`` and returns it with its response, or ``None`` if the reply
+        is not for any of the pending requests
+        """
+        if reply[:2] == EncapsulationCommand.send_unit_data:
+            key = Unpack.uint(reply[44:46])  # sequence count at start of the connected data item
+        else:
+            key = bytes(reply[12:20])  # sender context
+        request = pending.pop(key, None)
+        if request is None:
+            self.__log.warning(f'Received reply for unknown request {key!r}, ignoring')
+            return None
+
+        response = request._make_response(reply)
+        self.__log.debug(f'Received: {response!r}')
+        return request, response
+
     @classmethod
     def list_identity(cls, path) -> Optional[str]:
         """
@@ -210,6 +331,57 @@ class CIPDriver:
         plc.close()
         return identity
 
+    @classmethod
+    def discover(cls, broadcast_address: str = '255.255.255.255', timeout: float = 2.0) -> List[dict]:
+        """
+        Discovers the devices on the local network by broadcasting a ListIdentity request over UDP.  Devices
+        may delay their reply by a random time (up to half of ``timeout``) to spread out the replies.
+
+        :param broadcast_address: broadcast address of the network, e.g. ``'192.168.1.255'``
+        :param timeout: seconds to wait for replies
+        :return: the identity of each device that replied, same as :meth:`list_identity` with an added ``ip_address``
+        """
+        identities = _udp_list_identity([(broadcast_address, ENIP_PORT)], timeout, broadcast=True)
+        return [identities[address] for address in sorted(identities, key=lambda a: ipaddress.ip_address(a[0]))]
+
+    @classmethod
+    def list_identities(cls, hosts: Union[str, Iterable[str]], timeout: float = 1.0, tcp_fallback: bool = True,
+                        max_workers: int = 32) -> List[dict]:
+        """
+        Identifies many devices at once using ListIdentity.  The request is sent over UDP to all the hosts before
+        waiting for any replies, then the hosts that did not reply are tried over TCP (unless ``tcp_fallback`` is
+        False), ``max_workers`` at a time.  UDP is often blocked by routers and firewalls, TCP is slower but is
+        routed like a normal connection to the device.
+
+        >>> CIPDriver.list_identities('10.20.0.0/22')
+
+        :param hosts: IP address of a device or a list of them (may include the port, ``ip:port``), or a network in CIDR
+                      notation
+        :param timeout: seconds to wait for the UDP replies, and for each TCP connection
+        :param tcp_fallback: if True (default), hosts that did not reply over UDP are tried over TCP
+        :param max_workers: max number of TCP connections at once
+        :return: the identity of each device that replied in the order of ``hosts``, same as :meth:`list_identity`
+                 with an added ``ip_address``
+        """
+        if isinstance(hosts, str) and '/' in hosts:
+            hosts = [str(host) for host in ipaddress.ip_network(hosts, strict=False).hosts()] or [hosts.split('/')[0]]
+        elif isinstance(hosts, str):
+            hosts = [hosts]
+        else:
+            hosts = list(hosts)
+
+        addresses = [_parse_address(host) for host in hosts]
+        identities = _udp_list_identity(addresses, timeout)
+
+        missing = [address for address in addresses if address not in identities]
+        if tcp_fallback and missing:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pycomm3-list-identity') as executor:
+                for address, identity in zip(missing, executor.map(lambda a: _tcp_list_identity(a, timeout), missing)):
+                    if identity is not None:
+                        identities[address] = identity
+
+        return [identities[address] for address in addresses if address in identities]
+
     def _list_identity(self):
         request = self.new_request('list_identity')
         response = request.send()
@@ -217,21 +389,87 @@ class CIPDriver:
 
     def get_module_info(self, slot):
         try:
-            response = self.generic_message(
-                service=CommonService.get_attributes_all,
-                class_code=ClassCode.identity_object, instance=b'\x01',
-                connected=False, unconnected_send=True,
-                route_path=Pack.epath(Pack.usint(PATH_SEGMENTS['bp']) + Pack.usint(slot), pad_len=True)
-            )
-
-            if response:
-                return _parse_identity_object(response.value)
-            else:
-                raise DataError(f'generic_message did not return valid data - {response.error}')
-
+            response = self.generic_message(**_module_info_params(slot))
+            return _module_info_response(response)
         except Exception as err:
             raise DataError('error getting module info') from err
 
+    def get_rack_info(self, slots: Union[int, Iterable[int]] = CHASSIS_SLOTS,
+                      slot_timeout: float = 0.25) -> Dict[int, dict]:
+        """
+        Gets the module info (:meth:`get_module_info`) for every slot in the chassis at once.  The requests for all of
+        the slots are sent before waiting for any of the replies, and the comm module waits at most ``slot_timeout``
+        for the module in each slot, so empty slots do not time out one after another.
+
+        :param slots: number of slots in the chassis, or the slot numbers to get
+        :param slot_timeout: seconds the comm module waits for a reply from the module in a slot
+        :return: ``{slot: module info}`` for each slot with a module, empty slots and slots that returned an error are
+                 not included
+        """
+        requests = self._rack_info_requests(slots, slot_timeout)
+        return self._rack_info_response(requests, self._send_pipelined(requests, window=len(requests)))
+
+    def _rack_info_requests(self, slots: Union[int, Iterable[int]], slot_timeout: float) -> Dict[RequestPacket, int]:
+        """
+        Creates the get module info request for each slot, ``{request: slot}``
+        """
+        if isinstance(slots, int):
+            slots = range(slots)
+
+        return {self._generic_message_request(**_module_info_params(slot, slot_timeout)): slot for slot in slots}
+
+    def _rack_info_response(self, requests: Dict[RequestPacket, int],
+                            responses: Iterable[Tuple[RequestPacket, Any]]) -> Dict[int, dict]:
+        modules = {}
+        for request, response in responses:
+            slot = requests[request]
+            if isinstance(response, Exception) or not response:
+                error = response if isinstance(response, Exception) else response.error
+                self.__log.debug(f'No module info for slot {slot} - {error}')
+                continue
+            try:
+                modules[slot] = _parse_identity_object(response.value)
+            except Exception as err:
+                self.__log.warning(f'Failed to parse module info for slot {slot} - {err}')
+
+        return {slot: modules[slot] for slot in sorted(modules)}
+
+    @classmethod
+    def survey(cls, paths: Iterable[str], slots: Union[int, Iterable[int]] = CHASSIS_SLOTS, slot_timeout: float = 0.25,
+               max_workers: int = 16) -> Dict[str, Optional[Dict[int, dict]]]:
+        """
+        Gets the rack info (:meth:`get_rack_info`) of many chassis, ``max_workers`` chassis at a time.
+
+        >>> CIPDriver.survey(['10.20.30.100', '10.20.30.101'])
+
+        :param paths: IP address (or CIP path) of the comm module in each chassis
+        :param slots: number of slots in each chassis, or the slot numbers to get
+        :param slot_timeout: seconds the comm module waits for a reply from the module in a slot
+        :return: ``{path: rack info}`` in the order of ``paths``, rack info is ``None`` if the chassis could not be
+                 reached
+        """
+        if isinstance(slots, int):
+            slots = range(slots)
+        slots = list(slots)
+        paths = list(paths)
+
+        def _rack_info(path):
+            plc = cls(path, init_tags=False, init_info=False)
+            try:
+                plc.open()
+                return plc.get_rack_info(slots, slot_timeout)
+            except Exception as err:
+                cls.__log.warning(f'Failed to get rack info for {path} - {err}')
+                return None
+            finally:
+                try:
+                    plc.close()
+                except CommError:
+                    pass
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pycomm3-survey') as executor:
+            return dict(zip(paths, executor.map(_rack_info, paths)))
+
     def open(self):
         """
         Creates a new Ethernet/IP socket connection to target device and registers a CIP session.
@@ -243,7 +481,7 @@ class CIPDriver:
             return
         try:
             if self._sock is None:
-                self._sock = Socket()
+                self._sock = Socket(self._cfg['timeout'], self._cfg['socket_options'])
             self._sock.connect(self._cfg['ip address'], self._cfg['port'])
             self._connection_opened = True
             self._cfg['cid'] = urandom(4)
@@ -265,13 +503,19 @@ class CIPDriver:
             return self._session
 
         self._session = 0
+        request = self._register_session_request()
+        response = request.send()
+        return self._register_session_response(response)
+
+    def _register_session_request(self) -> RequestPacket:
         request = self.new_request('register_session')
         request.add(
             self._cfg['protocol version'],
             b'\x00\x00'
         )
+        return request
 
-        response = request.send()
+    def _register_session_response(self, response) -> Optional[int]:
         if response:
             self._session = response.session
             self.__log.info(f"Session = {response.session} has been registered.")
@@ -293,6 +537,13 @@ class CIPDriver:
         if self._session == 0:
             raise CommError("A Session Not Registered Before forward_open.")
 
+        response = self.generic_message(**self._forward_open_params())
+        return self._forward_open_response(response)
+
+    def _forward_open_params(self) -> dict:
+        """
+        :return: the kwargs for :meth:`generic_message` to send the (Extended) Forward Open request
+        """
         init_net_params = 0b_0100_0010_0000_0000  # CIP Vol 1 - 3-5.5.1.1
 
         if self._cfg['extended forward open']:
@@ -322,7 +573,7 @@ class CIPDriver:
             TRANSPORT_CLASS,
         ]
 
-        response = self.generic_message(
+        return dict(
             service=service,
             class_code=ClassCode.connection_manager,
             instance=ConnectionManagerInstance.open_request,
@@ -332,6 +583,7 @@ class CIPDriver:
             name='__FORWARD_OPEN__'
         )
 
+    def _forward_open_response(self, response: Tag) -> bool:
         if response:
             self._target_cid = response.value[:4]
             self._target_is_connected = True
@@ -370,6 +622,55 @@ class CIPDriver:
         if errs:
             raise CommError(' - '.join(str(e) for e in errs))
 
+    def reconnect(self):
+        """
+        Reopens a broken connection to the target, the socket is replaced, a new session is registered and if a
+        connection was open it is opened again with a new *Forward Open*.  Unlike calling :meth:`close` and
+        :meth:`open`, nothing is sent on the old connection and the driver is not initialized again, so things like
+        the tag definitions of a :class:`~pycomm3.LogixDriver` are kept.
+
+        :raises CommError: if the connection could not be reopened
+        """
+        reopen_connection = self._target_is_connected
+        try:
+            if self._sock:
+                self._sock.close()
+        except Exception as err:
+            self.__log.warning(f"reconnect() -> _sock.close Err: {err}")
+
+        self._sock = None
+        self._target_is_connected = False
+        self._session = 0
+        self._connection_opened = False
+
+        if not self.open():
+            raise CommError('failed to register a session')
+
+        if reopen_connection and not self._forward_open():
+            raise CommError('failed to reopen the connection')
+
+        self.__log.info('Reconnected to target')
+
+    def check_connection(self) -> bool:
+        """
+        Checks the connection is still usable by sending an encapsulation NOP (the target does not reply).  The
+        connection is also considered broken if anything is waiting to be received, since no reply should be pending
+        between requests and a closed connection is always readable.
+
+        :return: True if the connection is open and usable, False otherwise
+        """
+        if not self._connection_opened or self._sock is None:
+            return False
+
+        try:
+            if self._sock.has_data():
+                return False
+            self.new_request('nop').send()
+        except CommError:
+            return False
+
+        return True
+
     def _un_register_session(self):
         """
         Un-registers the current session with the target.
@@ -391,6 +692,13 @@ class CIPDriver:
         if self._session == 0:
             raise CommError("A session need to be registered before to call forward_close.")
 
+        response = self.generic_message(**self._forward_close_params())
+        return self._forward_close_response(response)
+
+    def _forward_close_params(self) -> dict:
+        """
+        :return: the kwargs for :meth:`generic_message` to send the Forward Close request
+        """
         route_path = Pack.epath(self._cfg['cip_path'] + MSG_ROUTER_PATH, pad_len=True)
 
         forward_close_msg = [
@@ -401,7 +709,7 @@ class CIPDriver:
             self._cfg['vsn'],
         ]
 
-        response = self.generic_message(
+        return dict(
             service=ConnectionManagerService.forward_close,
             class_code=ClassCode.connection_manager,
             instance=ConnectionManagerInstance.open_request,
@@ -410,6 +718,8 @@ class CIPDriver:
             request_data=b''.join(forward_close_msg),
             name='__FORWARD_CLOSE__'
         )
+
+    def _forward_close_response(self, response: Tag) -> bool:
         if response:
             self._target_is_connected = False
             self.__log.info('Forward Close succeeded.')
@@ -428,7 +738,8 @@ class CIPDriver:
                         name: str = 'generic',
                         connected: bool = True,
                         unconnected_send: bool = False,
-                        route_path: Union[bool, bytes] = True) -> Tag:
+                        route_path: Union[bool, bytes] = True,
+                        unconnected_send_timeout: Optional[float] = None) -> Tag:
         """
         Perform a generic CIP message.  Similar to how MSG instructions work in Logix.
 
@@ -447,12 +758,26 @@ class CIPDriver:
         :param unconnected_send: (Unconnected Only) wrap service in an UnconnectedSend service
         :param route_path: (Unconnected Only) ``True`` to use current connection route to destination, ``False`` to ignore,
                            Or provide a packed EPATH (``bytes``) route to use.
+        :param unconnected_send_timeout: (UnconnectedSend Only) seconds the target waits for a reply from the
+                                         destination of the route, ``None`` to use the default (about 5 seconds)
         :return: a Tag with the result of the request. (Tag.value for writes will be the request_data)
         """
 
         if connected:
             with_forward_open(lambda _: None)(self)
 
+        request = self._generic_message_request(service, class_code, instance, attribute, request_data, data_format,
+                                                connected, unconnected_send, route_path, unconnected_send_timeout)
+        response = request.send()
+
+        return Tag(name, response.value, None, error=response.error)
+
+    def _generic_message_request(self, service, class_code, instance, attribute=b'', request_data=b'',
+                                 data_format=None, connected=True, unconnected_send=False,
+                                 route_path=True, unconnected_send_timeout=None) -> RequestPacket:
+        """
+        Creates the request for :meth:`generic_message`, see it for a description of the parameters
+        """
         _kwargs = {
             'service': service,
             'class_code': class_code,
@@ -469,18 +794,18 @@ class CIPDriver:
                 _kwargs['route_path'] = route_path
 
             _kwargs['unconnected_send'] = unconnected_send
+            _kwargs['unconnected_send_timeout'] = unconnected_send_timeout
 
         request = self.new_request('generic_connected' if connected else 'generic_unconnected')
 
         request.build(**_kwargs)
 
-        response = request.send()
-
-        return Tag(name, response.value, None, error=response.error)
+        return request
 
 
 def parse_connection_path(path):
-    ip, *segments = path.split('/')
+    address, *segments = path.split('/')
+    ip, _ = _parse_address(address)
     try:
         socket.inet_aton(ip)
     except OSError:
@@ -507,6 +832,29 @@ def parse_connection_path(path):
     return ip, Pack.epath(b''.join(_path))
 
 
+def _parse_address(address: str) -> Tuple[str, int]:
+    """
+    Splits an ``ip[:port]`` address into the IP address and TCP port, the EtherNet/IP port is used if not included
+    """
+    ip, _, port = address.partition(':')
+    try:
+        return ip, int(port) if port else ENIP_PORT
+    except ValueError:
+        raise RequestError('Invalid port', port)
+
+
+def _check_pipelined_requests(requests: Iterable[RequestPacket]) -> List[RequestPacket]:
+    """
+    Returns the requests as a list, raising a ``RequestError`` if any allowing pipelining do not have a key to match
+    them to their reply
+    """
+    requests = list(requests)
+    for request in requests:
+        if request.can_pipeline and request._pipeline_key() is None:
+            raise RequestError(f'{request.__class__.__name__} cannot be pipelined')
+    return requests
+
+
 def _parse_cip_path_segment(segment: str):
     try:
         if segment.isnumeric():
@@ -525,6 +873,104 @@ def _parse_cip_path_segment(segment: str):
         raise RequestError(f'Failed to parse path segment', segment)
 
 
+def _list_identity_message(max_delay: int = 0) -> bytes:
+    """
+    Creates a ListIdentity request, ``max_delay`` is the max ms the target may delay its reply to a broadcast
+    """
+    return b''.join((
+        EncapsulationCommand.list_identity,
+        b'\x00\x00',  # length
+        b'\x00\x00\x00\x00',  # session
+        b'\x00\x00\x00\x00',  # status
+        Pack.uint(max_delay) + b'\x00' * 6,  # sender context
+        b'\x00\x00\x00\x00',  # options
+    ))
+
+
+def _list_identity_reply(reply, ip_address) -> Optional[dict]:
+    response = ListIdentityResponsePacket(reply)
+    if not response or not response.identity:
+        return None
+    return {**response.identity, 'ip_address': ip_address}
+
+
+def _udp_list_identity(addresses: List[Tuple[str, int]], timeout: float, broadcast: bool = False) -> dict:
+    """
+    Sends a ListIdentity request over UDP to each (ip, port) address, then receives replies until the timeout.
+
+    :return: ``{(ip, port): identity}`` for each device that replied
+    """
+    _log = logging.getLogger(f'{__name__}.discovery')
+    max_delay = min(int(timeout * 500), LIST_IDENTITY_MAX_DELAY) if broadcast else 0
+    message = _list_identity_message(max_delay)
+    identities = {}
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        if broadcast:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+
+        for address in addresses:
+            try:
+                sock.sendto(message, address)
+            except OSError as err:
+                _log.debug(f'Failed to send ListIdentity to {address} - {err}')
+
+        deadline = time.monotonic() + timeout
+        remaining = timeout
+        while remaining > 0:
+            sock.settimeout(remaining)
+            try:
+                reply, (ip_address, port) = sock.recvfrom(4096)
+            except socket.timeout:
+                break
+            except OSError as err:  # e.g. ICMP port unreachable reported on some platforms
+                _log.debug(f'Error receiving ListIdentity reply - {err}')
+            else:
+                identity = _list_identity_reply(reply, ip_address)
+                if identity is not None:
+                    identities[(ip_address, port)] = identity
+            remaining = deadline - time.monotonic()
+    finally:
+        sock.close()
+
+    return identities
+
+
+def _tcp_list_identity(address: Tuple[str, int], timeout: float) -> Optional[dict]:
+    """
+    Sends a ListIdentity request to the (ip, port) address over TCP, no session is needed for ListIdentity
+
+    :return: the identity or None if the host did not reply
+    """
+    sock = Socket(timeout)
+    try:
+        sock.connect(*address)
+        sock.send(_list_identity_message())
+        return _list_identity_reply(sock.receive(), address[0])
+    except (CommError, OSError):
+        return None
+    finally:
+        sock.close()
+
+
+def _module_info_params(slot, timeout: Optional[float] = None) -> dict:
+    return dict(
+        service=CommonService.get_attributes_all,
+        class_code=ClassCode.identity_object, instance=b'\x01',
+        connected=False, unconnected_send=True,
+        route_path=Pack.epath(Pack.usint(PATH_SEGMENTS['bp']) + Pack.usint(slot), pad_len=True),
+        unconnected_send_timeout=timeout,
+    )
+
+
+def _module_info_response(response: Tag) -> dict:
+    if response:
+        return _parse_identity_object(response.value)
+    else:
+        raise DataError(f'generic_message did not return valid data - {response.error}')
+
+
 def _parse_identity_object(reply):
     vendor = Unpack.uint(reply[:2])
     product_type = Unpack.uint(reply[2:4])
@@ -22,13 +22,14 @@
 # SOFTWARE.
 #
 
-__all__ = ['LogixDriver', ]
+__all__ = ['LogixDriver', 'ReadGroup', ]
 
 import datetime
-import itertools
 import logging
 import time
-from typing import List, Tuple, Optional, Union
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Tuple, Optional, Union, Dict, Generator, Any
 
 from . import util
 from .exceptions import DataError, CommError, RequestError
@@ -38,8 +39,14 @@ from .cip_base import CIPDriver, with_forward_open
 from .const import (TagService, EXTENDED_SYMBOL, CLASS_TYPE, INSTANCE_TYPE, ClassCode, DataType, PRODUCT_TYPES, VENDORS,
                     MICRO800_PREFIX, READ_RESPONSE_OVERHEAD, MULTISERVICE_READ_OVERHEAD, CommonService, SUCCESS,
                     INSUFFICIENT_PACKETS, BASE_TAG_BIT, MIN_VER_INSTANCE_IDS, SEC_TO_US, KEYSWITCH,
-                    TEMPLATE_MEMBER_INFO_LEN, EXTERNAL_ACCESS, DataTypeSize, MIN_VER_EXTERNAL_ACCESS)
-from .packets import request_path
+                    TEMPLATE_MEMBER_INFO_LEN, EXTERNAL_ACCESS, DataTypeSize, MIN_VER_EXTERNAL_ACCESS,
+                    TAG_REQUEST_CACHE_SIZE, ARRAY_READ_MAX_GAP, STRUCTURE_MAKEUP_REPLY_SIZE)
+from .packets import request_path, MultiServiceRequestPacket, RequestPacket
+from .packets.requests import _create_tag_rp, struct_encoder
+from .packets.responses import numpy
+from .planner import READ_PLANNERS, ReadPlanItem, ReadPlannerType
+from .tag_cache import (tag_cache_key, load_tag_cache, save_tag_cache, tag_registry, TagRegistryEntry,
+                        next_generation)
 
 AtomicValueType = Union[int, float, bool, str]
 TagValueType = Union[AtomicValueType, List[AtomicValueType]]
@@ -53,7 +60,9 @@ class LogixDriver(CIPDriver):
     __log = logging.getLogger(f'{__module__}.{__qualname__}')
 
     def __init__(self, path: str, *args,  micro800: bool = False,
-                 init_info: bool = True, init_tags: bool = True, init_program_tags: bool = False, **kwargs):
+                 init_info: bool = True, init_tags: bool = True, init_program_tags: bool = False,
+                 tag_cache: Optional[str] = None, share_tags: bool = False, lazy_data_types: bool = False,
+                 connections: int = 1, **kwargs):
         """
         :param path: CIP path to intended target
 
@@ -80,13 +89,30 @@ class LogixDriver(CIPDriver):
         :param init_tags: if True (default), uploads all controller-scoped tag definitions on connect
         :param init_program_tags: if True, uploads all program-scoped tag definitions on connect
         :param micro800: set to True if connecting to a Micro800 series PLC with ``init_info`` disabled, it will disable unsupported features
+        :param tag_cache: path to a file to cache the tag definitions in, if the file contains definitions for this
+                          controller they are used instead of uploading the tag list on connect. Requires ``init_info``.
+
+            .. note::
+
+                Cached definitions are used only if the serial number, program name and revision of the controller
+                match and the change indicator read from the controller has not changed.  Controllers that do not
+                support the change indicator are only checked by the serial, name, and revision, so the cache file
+                should be deleted after making changes to the program that did not change the program name.
+
+        :param share_tags: if True, the tag definitions are shared with the other drivers connected to the same controller
+                           that also enabled this option.  Only the first connection uploads the definitions, the others
+                           will use the same definitions instead of uploading them again. Requires ``init_info``.
+        :param lazy_data_types: if True, only the tag list is uploaded on connect and the data type of a struct tag is
+                                uploaded the first time the tag is used, see :attr:`lazy_data_types`
+        :param connections: number of connections to open to the controller for sending reads in parallel,
+                            see :attr:`connections`
 
         .. tip::
 
             Initialization of tags is required for the :meth:`.read` and :meth:`.write` to work.  This is because
             they require information about the data type and structure of the tags inside the controller.  If opening
-            multiple connections to the same controller, you may disable tag initialization in all but the first connection
-            and set ``plc2._tags = plc1.tags`` to prevent needing to upload the tag definitions multiple times.
+            multiple connections to the same controller, enable ``share_tags`` on all of them to prevent needing to
+            upload the tag definitions multiple times.
 
         """
 
@@ -94,8 +120,23 @@ class LogixDriver(CIPDriver):
         self._cache = None
         self._data_types = {}
         self._tags = {}
+        self._tag_list_program = None  # scope of the tag list in the tags property
+        self._shared_tags = None  # registry entry for the shared tag definitions, see share_tags
+        self._tag_generation = 0  # changed whenever the tag definitions change, see _tags_changed
+        self._tag_request_cache = util.LRUCache(TAG_REQUEST_CACHE_SIZE)
         self._micro800 = micro800
         self._cfg['use_instance_ids'] = True
+        self._cfg['read_planner'] = 'in_order'
+        self._cfg['coalesce_array_reads'] = True
+        self._cfg['numpy_arrays'] = False
+        self._cfg['tag_cache'] = tag_cache
+        self._cfg['share_tags'] = share_tags
+        self._cfg['lazy_data_types'] = lazy_data_types
+        self._cfg['connections'] = 1
+        self._parallel_connections = []  # the other connections used when connections > 1
+        self._executor = None
+        self._read_plan_stats = {}
+        self.connections = connections
 
         if init_tags or init_info:
             self.open()
@@ -114,7 +155,7 @@ class LogixDriver(CIPDriver):
             self._cfg['cip_path'] = _path[1:]  # leave out the len, we sometimes add to the path later
 
         if init_tags:
-            self.get_tag_list(program='*' if init_program_tags else None)
+            self._init_tag_list(program='*' if init_program_tags else None)
 
     def __enter__(self):
         self.open()
@@ -194,6 +235,106 @@ class LogixDriver(CIPDriver):
         """
         return self._info.get('name')
 
+    @property
+    def tag_request_cache_info(self) -> dict:
+        """
+        Hit/miss counts and size of the cache of parsed tag requests and request paths used by :meth:`.read`
+        and :meth:`.write`.  The cache is cleared whenever the tag list is uploaded.
+        """
+        return self._tag_request_cache.info()
+
+    @property
+    def read_planner(self) -> Union[str, ReadPlannerType]:
+        """
+        The planner used to group tags into multi-service requests by :meth:`.read`, may be the name of one of the
+        included planners or a custom planner function (see :mod:`pycomm3.planner`):
+
+        - ``'in_order'`` (default) - fills packets in the order the tags were requested
+        - ``'first_fit_decreasing'`` - bin-packs the tags largest first, usually needs fewer packets
+
+        """
+        return self._cfg['read_planner']
+
+    @read_planner.setter
+    def read_planner(self, value: Union[str, ReadPlannerType]):
+        if not callable(value) and value not in READ_PLANNERS:
+            raise ValueError(f'read_planner must be a function or one of: {", ".join(READ_PLANNERS)}')
+        self._cfg['read_planner'] = value
+
+    @property
+    def coalesce_array_reads(self) -> bool:
+        """
+        If True (default), reads of elements in the same array are combined into a single read of the range
+        of elements and the results split back out, e.g. reading ``'Array[0]', 'Array[1]', 'Array[2]'``
+        is sent as a single read of ``'Array[0]{3}'``.
+        """
+        return self._cfg['coalesce_array_reads']
+
+    @coalesce_array_reads.setter
+    def coalesce_array_reads(self, value: bool):
+        self._cfg['coalesce_array_reads'] = value
+
+    @property
+    def connections(self) -> int:
+        """
+        Number of connections used to send the requests of a :meth:`.read`, default is ``1``.
+
+        When larger than 1, the other connections are opened the first time there are enough requests to use them
+        and the requests of a read are split between all the connections and sent in parallel, each connection
+        using its own session, connection id, and sequence count (and the :attr:`pipeline_window`).  Controllers
+        can handle many connections at once, so this increases the number of tags read per second when reading
+        more tags than fit in a single packet.  Writes are always sent using a single connection, so they are
+        written in the order requested.  If the controller refuses one of the other connections, a read uses the
+        connections that could be opened and opening the rest is tried again on the next read.
+        """
+        return self._cfg['connections']
+
+    @connections.setter
+    def connections(self, value: int):
+        if value < 1:
+            raise ValueError('connections must be 1 or greater')
+        self._close_parallel_connections()
+        self._cfg['connections'] = value
+
+    @property
+    def numpy_arrays(self) -> bool:
+        """
+        If True, reading multiple elements of an atomic array returns a ``numpy.ndarray`` instead of a list,
+        default is False.  Requires `numpy`_ to be installed.
+
+        .. _numpy: https://numpy.org
+        """
+        return self._cfg['numpy_arrays']
+
+    @numpy_arrays.setter
+    def numpy_arrays(self, value: bool):
+        if value and numpy is None:
+            raise ImportError('numpy is required to read arrays as ndarrays')
+        self._cfg['numpy_arrays'] = value
+
+    @property
+    def read_plan_stats(self) -> dict:
+        """
+        Statistics for the requests last planned by :meth:`.read`, the number of ``packets`` (including fragmented
+        reads), how many of them were ``fragmented`` reads, and the ``wasted_bytes`` left unused in the replies
+        of the multi-service requests.
+        """
+        return self._read_plan_stats
+
+    @property
+    def lazy_data_types(self) -> bool:
+        """
+        If True, :meth:`get_tag_list` only uploads the tag list and not the data types of struct tags, their
+        ``data_type`` is ``None`` until the tag is used by :meth:`read` or :meth:`write` and the data type uploaded.
+        Enable to reduce the startup time and memory used when only a small number of the tags in a large program
+        are used.  Default is False.
+        """
+        return self._cfg['lazy_data_types']
+
+    @lazy_data_types.setter
+    def lazy_data_types(self, value: bool):
+        self._cfg['lazy_data_types'] = value
+
     @property
     def use_instance_ids(self):
         return self._cfg['use_instance_ids']
@@ -212,47 +353,168 @@ class LogixDriver(CIPDriver):
         :return:  the controller program name
         """
         try:
-            response = self.generic_message(
-                service=CommonService.get_attribute_list,
-                class_code=ClassCode.program_name,
-                instance=b'\x01\x00',  # instance 1
-                request_data=b'\x01\x00\x01\x00',  # num attributes, attribute 1 (program name)
-                data_format=((None, 6), ('program_name', 'STRING')),
-            )
-            if response:
-                self._info['name'] = response.value['program_name']
-                return self._info['name']
-            else:
-                raise DataError(f'response did not return valid data - {response.error}')
-
+            response = self.generic_message(**_PLC_NAME_PARAMS)
+            return self._plc_name_response(response)
         except Exception as err:
             raise DataError('failed to get the plc name') from err
 
+    def _plc_name_response(self, response: Tag) -> str:
+        if response:
+            self._info['name'] = response.value['program_name']
+            return self._info['name']
+        else:
+            raise DataError(f'response did not return valid data - {response.error}')
+
     def get_plc_info(self) -> dict:
         """
         Reads basic information from the controller, returns it and stores it in the ``info`` property.
         """
         try:
-            response = self.generic_message(
-                class_code=ClassCode.identity_object, instance=b'\x01',
-                service=CommonService.get_attributes_all,
-                data_format=[
-                    ('vendor', 'INT'), ('product_type', 'INT'), ('product_code', 'INT'),
-                    ('version_major', 'SINT'), ('version_minor', 'SINT'), ('_keyswitch', 2),
-                    ('serial', 'DINT'), ('device_type', 'SHORT_STRING')
-                ],
-                connected=False, unconnected_send=not self._micro800)
-
-            if response:
-                info = _parse_plc_info(response.value)
-                self._info = {**self._info, **info}
-                return info
-            else:
-                raise DataError(f'get_plc_info did not return valid data - {response.error}')
-
+            response = self.generic_message(**self._plc_info_params())
+            return self._plc_info_response(response)
         except Exception as err:
             raise DataError('Failed to get PLC info') from err
 
+    def _plc_info_params(self) -> dict:
+        return dict(
+            class_code=ClassCode.identity_object, instance=b'\x01',
+            service=CommonService.get_attributes_all,
+            data_format=[
+                ('vendor', 'INT'), ('product_type', 'INT'), ('product_code', 'INT'),
+                ('version_major', 'SINT'), ('version_minor', 'SINT'), ('_keyswitch', 2),
+                ('serial', 'DINT'), ('device_type', 'SHORT_STRING')
+            ],
+            connected=False, unconnected_send=not self._micro800)
+
+    def _plc_info_response(self, response: Tag) -> dict:
+        if response:
+            info = _parse_plc_info(response.value)
+            self._info = {**self._info, **info}
+            return info
+        else:
+            raise DataError(f'get_plc_info did not return valid data - {response.error}')
+
+    @with_forward_open
+    def get_change_indicator(self) -> Optional[str]:
+        """
+        Reads the change indicator from the controller, it is updated by the controller whenever changes
+        are made to the program, like adding or changing tags and data types.  The value is only meant to be
+        compared to a previously read value to detect changes.
+
+        :return: a hex string, or ``None`` if the controller does not support it
+        """
+        return self._change_indicator_response(self.generic_message(**_CHANGE_INDICATOR_PARAMS))
+
+    def _change_indicator_response(self, response: Tag) -> Optional[str]:
+        if response:
+            return response.value.hex()
+        self.__log.debug(f'Controller does not support the change indicator - {response.error}')
+        return None
+
+    def _init_tag_list(self, program):
+        self._tag_list_program = program
+        key = self._tag_definitions_key()
+        if key is None:
+            self.get_tag_list(program)
+            return
+
+        change_indicator = self.get_change_indicator()
+        if not self._cfg['share_tags']:
+            self._init_tag_definitions(key, change_indicator, program)
+            return
+
+        entry = self._acquire_shared_tags(key)
+        with entry.lock:  # other connections wait for the first one to upload the definitions
+            definitions = entry.get(change_indicator, program)
+            if definitions is None:
+                self._init_tag_definitions(key, change_indicator, program)
+                definitions = entry.register(change_indicator, program, self._tag_definitions())
+            else:
+                self.__log.info(f'Using {len(definitions["tags"])} shared tag definitions')
+            self._use_tag_definitions(definitions, entry.generation)
+
+    def _acquire_shared_tags(self, key) -> TagRegistryEntry:
+        if self._shared_tags is not None and self._shared_tags.key != key:
+            self._release_shared_tags()
+        if self._shared_tags is None:
+            self._shared_tags = tag_registry.acquire(key)
+        return self._shared_tags
+
+    def _release_shared_tags(self):
+        if self._shared_tags is not None:
+            tag_registry.release(self._shared_tags)
+            self._shared_tags = None
+
+    def _check_shared_tags(self):
+        """
+        Switches to the shared tag definitions if another driver replaced or refreshed them after this driver's
+        definitions were uploaded
+        """
+        entry = self._shared_tags
+        if entry is not None and entry.generation > self._tag_generation:
+            with entry.lock:
+                if entry.scope == self._tag_list_program and entry.definitions is not None:
+                    self.__log.info('Using the shared tag definitions updated by another driver')
+                    self._use_tag_definitions(entry.definitions, entry.generation)
+                else:  # definitions for another scope, this driver keeps its own
+                    self._tag_generation = entry.generation
+
+    def _tags_changed(self, generation: Optional[int] = None):
+        """
+        Clears everything built from the previous tag definitions, like the cached request paths
+        """
+        self._tag_request_cache.clear()
+        self._tag_generation = generation or next_generation()
+
+    def _init_tag_definitions(self, key, change_indicator, program):
+        if not (self._cfg['tag_cache'] and self._load_tag_cache(key, change_indicator, program)):
+            self.get_tag_list(program)
+            if self._cfg['tag_cache']:
+                self._save_tag_cache(key, change_indicator, program)
+
+    def _tag_definitions_key(self) -> Optional[str]:
+        if not (self._cfg['tag_cache'] or self._cfg['share_tags']):
+            return None
+
+        key = tag_cache_key(self._info)
+        if key is None:
+            self.__log.warning('Unable to cache or share tags, init_info is required to identify the controller')
+        return key
+
+    def _tag_definitions(self) -> dict:
+        return {
+            'tags': self._tags,
+            'data_types': self._data_types,
+            **{k: self._info[k] for k in ('programs', 'tasks', 'modules')}
+        }
+
+    def _use_tag_definitions(self, definitions: dict, generation: Optional[int] = None):
+        self._tags = definitions['tags']
+        self._data_types = definitions['data_types']
+        self._info.update((k, definitions[k]) for k in ('programs', 'tasks', 'modules'))
+        self._tags_changed(generation)
+
+    def _load_tag_cache(self, key, change_indicator, program) -> bool:
+        try:
+            cached = load_tag_cache(self._cfg['tag_cache'], key, change_indicator, program)
+        except Exception:
+            self.__log.exception('Failed to load the tag cache')
+            return False
+
+        if cached is None:
+            return False
+
+        self._use_tag_definitions(cached)
+        self.__log.info(f'Loaded {len(self._tags)} tag definitions from the tag cache')
+        return True
+
+    def _save_tag_cache(self, key, change_indicator, program):
+        try:
+            save_tag_cache(self._cfg['tag_cache'], key, change_indicator, program,
+                           self._tags, self._data_types, self._info)
+        except Exception:
+            self.__log.exception('Failed to save the tag cache')
+
     @with_forward_open
     def get_tag_list(self, program: str = None, cache: bool = True) -> List[dict]:
         """
@@ -273,7 +535,27 @@ class LogixDriver(CIPDriver):
 
         :return: a list containing dicts for each tag definition collected
         """
+        return self._run_steps(self._get_tag_list_steps(program, cache))
 
+    def _run_steps(self, steps: Generator[List[RequestPacket], List[Tuple[RequestPacket, Any]], Any]):
+        """
+        Runs a generator of the requests needed for an operation, like :meth:`_get_tag_list_steps`, and returns its
+        result.  The generator yields each batch of requests and is sent their ``(request, response)`` pairs, in the
+        order the replies were received.  The operations are written once this way and shared with the async driver,
+        which runs them by sending the requests itself.  The batch is sent using pipelined requests, a response may
+        instead be the error raised sending the request.
+        """
+        try:
+            requests = next(steps)
+            while True:
+                requests = steps.send(list(self._send_pipelined(requests)))
+        except StopIteration as stop:
+            return stop.value
+
+    def _get_tag_list_steps(self, program, cache):
+        """
+        Steps of :meth:`get_tag_list`, see :meth:`_run_steps`
+        """
         self._cache = {
             'tag_name:id': {},
             'id:struct': {},
@@ -285,31 +567,192 @@ class LogixDriver(CIPDriver):
             self._info['programs'] = {}
             self._info['tasks'] = {}
             self._info['modules'] = {}
+        self._data_types = dict(self._data_types)  # the current definitions may be shared, never change them
 
         if program == '*':
-            tags = self._get_tag_list()
+            tags = yield from self._tag_list_steps()
             for prog in self._info['programs']:
-                tags += self._get_tag_list(prog)
+                tags += yield from self._tag_list_steps(prog)
         else:
-            tags = self._get_tag_list(program)
+            tags = yield from self._tag_list_steps(program)
 
         if cache:
             self._tags = {tag['tag_name']: tag for tag in tags}
+            self._tag_list_program = program
 
-        self._cache = None
+        self._release_tag_list_cache()
+        self._tags_changed()
 
         return tags
 
-    def _get_tag_list(self, program=None):
-        all_tags = self._get_instance_attribute_list_service(program)
-        user_tags = self._isolate_user_tags(all_tags, program)
-        for tag in user_tags:
+    def _tag_list_steps(self, program=None):
+        user_tags = yield from self._user_tags_steps(program)
+        yield from self._add_tag_data_types_steps([tag for tag in user_tags if tag['tag_type'] == 'struct'])
+        return user_tags
+
+    def _user_tags_steps(self, program=None):
+        all_tags = yield from self._instance_attribute_list_steps(program)
+        return self._isolate_user_tags(all_tags, program)
+
+    def _add_tag_data_types_steps(self, struct_tags, known_types=None):
+        if self._cfg['lazy_data_types']:
+            for tag in struct_tags:
+                tag['data_type'] = None
+        else:
+            yield from self._upload_data_types_steps((tag['template_instance_id'] for tag in struct_tags), known_types)
+            for tag in struct_tags:
+                tag['data_type'] = self._cache['id:udt'][tag['template_instance_id']]
+
+    @with_forward_open
+    def refresh_tag_list(self) -> Dict[str, List[str]]:
+        """
+        Updates the tag definitions after changes to the program, like after a download or online edits.
+        Unlike :meth:`get_tag_list`, only the definitions for new or changed tags are updated and templates are only
+        read for data types that have not already been uploaded, data types are matched using their structure handle.
+        The tags are refreshed for the same scope used to upload them.
+
+        :return: the names of the tags that were ``added``, ``changed``, and ``removed``
+        """
+        return self._run_steps(self._refresh_tag_list_steps())
+
+    def _refresh_tag_list_steps(self):
+        """
+        Steps of :meth:`refresh_tag_list`, see :meth:`_run_steps`
+        """
+        self._cache = {
+            'tag_name:id': {},
+            'id:struct': {},
+            'handle:id': {},
+            'id:udt': {}
+        }
+        program = self._tag_list_program
+        self._new_tag_list_info(program)
+        self._data_types = dict(self._data_types)  # the current definitions may be shared, never change them
+
+        if program == '*':
+            tags = yield from self._user_tags_steps()
+            for prog in self._info['programs']:
+                tags += yield from self._user_tags_steps(prog)
+        else:
+            tags = yield from self._user_tags_steps(program)
+
+        struct_ids = {tag['template_instance_id'] for tag in tags if tag['tag_type'] == 'struct'}
+        for request, response in _sent_responses((yield self._structure_makeups_requests(struct_ids))):
+            self._structure_makeups_response(request, response)
+
+        tags, changes, struct_tags = self._merge_tag_list(tags)
+        yield from self._add_tag_data_types_steps(struct_tags, self._known_data_types())
+        self._update_tag_list(tags)
+
+        key = self._tag_definitions_key()
+        if key is not None:
+            request = self._generic_message_request(**_generic_message_params(_CHANGE_INDICATOR_PARAMS))
+            [(_, response)] = _sent_responses((yield [request]))
+            self._tag_definitions_changed(key, self._change_indicator_response(response), program)
+
+        return changes
+
+    def _new_tag_list_info(self, program):
+        if program in ('*', None):
+            for key in ('programs', 'tasks', 'modules'):
+                self._info[key] = {}
+
+    def _merge_tag_list(self, new_tags):
+        """
+        Compares the new tag list with the current tags, unchanged tags keep their current definition.  Returns the
+        merged tags, the names of the tags added, changed, and removed, and the struct tags needing a data type.
+        Requires the structure makeup of the struct tag templates, to detect changes to the data type.
+        """
+        tags, added, changed, struct_tags = {}, [], [], []
+        for tag in new_tags:
+            name = tag['tag_name']
+            old = self._tags.get(name)
+            if old is not None and _tag_signature(old) == _tag_signature(tag) and not self._data_type_changed(old):
+                tags[name] = old
+                continue
+
+            (added if old is None else changed).append(name)
             if tag['tag_type'] == 'struct':
-                tag['data_type'] = self._get_data_type(tag['template_instance_id'])
+                struct_tags.append(tag)
+            tags[name] = tag
 
-        return user_tags
+        removed = [name for name in self._tags if name not in tags]
+        return tags, {'added': added, 'changed': changed, 'removed': removed}, struct_tags
+
+    def _data_type_changed(self, tag) -> bool:
+        if tag['tag_type'] != 'struct' or tag['data_type'] is None:
+            return False
+        template = self._cache['id:struct'].get(tag['template_instance_id'], {})
+        return template.get('structure_handle') != tag['data_type']['template']['structure_handle']
+
+    def _known_data_types(self) -> dict:
+        return {data_type['template']['structure_handle']: data_type for data_type in self._data_types.values()}
+
+    def _update_tag_list(self, tags):
+        """
+        Replaces the current tag list, the old one is not changed since other drivers may still be using it
+        """
+        self._tags = tags
+        self._release_tag_list_cache()
+        self._tags_changed()
+
+    def _tag_definitions_changed(self, key, change_indicator, program):
+        if self._cfg['share_tags']:
+            entry = self._acquire_shared_tags(key)
+            with entry.lock:  # other drivers switch to the new definitions when they see the new generation
+                entry.register(change_indicator, program, self._tag_definitions())
+                self._tag_generation = entry.generation
+        if self._cfg['tag_cache']:
+            self._save_tag_cache(key, change_indicator, program)
+
+    def _release_tag_list_cache(self):
+        if self._cfg['lazy_data_types']:
+            del self._cache['tag_name:id']  # keep the templates to upload the data types as they are used
+        else:
+            self._cache = None
+
+    def _lazy_data_type(self, tag: dict) -> dict:
+        """
+        Uploads the data type for a struct tag from a tag list uploaded with :attr:`lazy_data_types`, returns the
+        tag definition including the data type
+        """
+        self._run_steps(self._lazy_data_types_steps([tag]))
+        return self._tags[tag['tag_name']]
+
+    def _lazy_data_types_steps(self, tags):
+        """
+        Steps to upload the data types of struct tags from a tag list uploaded with :attr:`lazy_data_types`, see
+        :meth:`_run_steps`.  The current definitions may be shared, so the tags are replaced instead of changed.
+        """
+        if self._cache is None:
+            self._cache = {'id:struct': {}, 'handle:id': {}, 'id:udt': {}}
+        self._data_types = dict(self._data_types)
+        yield from self._upload_data_types_steps(tag['template_instance_id'] for tag in tags)
+
+        resolved = {}
+        for tag in tags:
+            data_type = self._cache['id:udt'].get(tag['template_instance_id'])
+            if data_type is None:
+                raise DataError(f'Failed to get data type information for {tag["tag_name"]}')
+            resolved[tag['tag_name']] = {**tag, 'data_type': data_type}
 
-    def _get_instance_attribute_list_service(self, program=None):
+        self._tags = {**self._tags, **resolved}
+        self._lazy_data_types_changed()
+
+    def _lazy_data_types_changed(self):
+        """
+        Shares the uploaded data types with the other drivers, if this driver is still using the shared definitions
+        """
+        entry = self._shared_tags
+        if entry is not None:
+            with entry.lock:
+                if entry.generation == self._tag_generation:
+                    entry.register(entry.change_indicator, entry.scope, self._tag_definitions())
+                    self._tags_changed(entry.generation)
+                    return
+        self._tags_changed()
+
+    def _instance_attribute_list_steps(self, program=None):
         """ Step 1: Finding user-created controller scope tags in a Logix5000 controller
 
         This service returns instance IDs for each created instance of the symbol class, along with a list
@@ -319,48 +762,8 @@ class LogixDriver(CIPDriver):
             last_instance = 0
             tag_list = []
             while last_instance != -1:
-                # Creating the Message Request Packet
-                path = []
-                if program:
-                    if not program.startswith('Program:'):
-                        program = f'Program:{program}'
-                    path = [EXTENDED_SYMBOL, Pack.usint(len(program)), program.encode('utf-8')]
-                    if len(program) % 2:
-                        path.append(b'\x00')
-
-                # just manually build the request path b/c there my be the extended symbol portion
-                path += [
-                    # Request Path ( 20 6B 25 00 Instance )
-                    CLASS_TYPE["8-bit"],  # Class id = 20 from spec 0x20
-                    ClassCode.symbol_object,  # Logical segment: Symbolic Object 0x6B
-                    INSTANCE_TYPE["16-bit"],  # Instance Segment: 16 Bit instance 0x25
-                    Pack.uint(last_instance),  # The instance
-                ]
-                path = b''.join(path)
-                path_size = Pack.usint(len(path) // 2)
-                request = self.new_request('send_unit_data')
-
-                attributes = [
-                    b'\x01\x00',  # Attr. 1: Symbol name
-                    b'\x02\x00',  # Attr. 2 : Symbol Type
-                    b'\x03\x00',  # Attr. 3 : Symbol Address
-                    b'\x05\x00',  # Attr. 5 : Symbol Object Address
-                    b'\x06\x00',  # Attr. 6 : ? - Not documented (Software Control?)
-                    b'\x08\x00'  # Attr. 8 : array dimensions [1,2,3]
-                ]
-
-                if self.info.get('version_major', 0) >= MIN_VER_EXTERNAL_ACCESS:
-                    attributes.append(b'\x0a\x00')  # Attr. 10 : external access
-
-                request.add(
-                    TagService.get_instance_attribute_list,
-                    path_size,
-                    path,
-                    Pack.uint(len(attributes)),
-                    *attributes
-
-                )
-                response = request.send()
+                request = self._instance_attribute_list_request(program, last_instance)
+                [(_, response)] = _sent_responses((yield [request]))
                 if not response:
                     raise DataError(f"send_unit_data returned not valid data - {response.error}")
 
@@ -370,6 +773,50 @@ class LogixDriver(CIPDriver):
         except Exception as err:
             raise DataError('failed to get attribute list') from err
 
+    def _instance_attribute_list_request(self, program, last_instance):
+        # Creating the Message Request Packet
+        path = []
+        if program:
+            if not program.startswith('Program:'):
+                program = f'Program:{program}'
+            path = [EXTENDED_SYMBOL, Pack.usint(len(program)), program.encode('utf-8')]
+            if len(program) % 2:
+                path.append(b'\x00')
+
+        # just manually build the request path b/c there my be the extended symbol portion
+        path += [
+            # Request Path ( 20 6B 25 00 Instance )
+            CLASS_TYPE["8-bit"],  # Class id = 20 from spec 0x20
+            ClassCode.symbol_object,  # Logical segment: Symbolic Object 0x6B
+            INSTANCE_TYPE["16-bit"],  # Instance Segment: 16 Bit instance 0x25
+            Pack.uint(last_instance),  # The instance
+        ]
+        path = b''.join(path)
+        path_size = Pack.usint(len(path) // 2)
+        request = self.new_request('send_unit_data')
+
+        attributes = [
+            b'\x01\x00',  # Attr. 1: Symbol name
+            b'\x02\x00',  # Attr. 2 : Symbol Type
+            b'\x03\x00',  # Attr. 3 : Symbol Address
+            b'\x05\x00',  # Attr. 5 : Symbol Object Address
+            b'\x06\x00',  # Attr. 6 : ? - Not documented (Software Control?)
+            b'\x08\x00'  # Attr. 8 : array dimensions [1,2,3]
+        ]
+
+        if self.info.get('version_major', 0) >= MIN_VER_EXTERNAL_ACCESS:
+            attributes.append(b'\x0a\x00')  # Attr. 10 : external access
+
+        request.add(
+            TagService.get_instance_attribute_list,
+            path_size,
+            path,
+            Pack.uint(len(attributes)),
+            *attributes
+
+        )
+        return request
+
     def _parse_instance_attribute_list(self, response, tag_list):
         """ extract the tags list from the message received"""
 
@@ -382,7 +829,7 @@ class LogixDriver(CIPDriver):
                 idx += 4
                 tag_length = Unpack.uint(tags_returned[idx:idx + 2])
                 idx += 2
-                tag_name = tags_returned[idx:idx + tag_length]
+                tag_name = bytes(tags_returned[idx:idx + tag_length])
                 idx += tag_length
                 symbol_type = Unpack.uint(tags_returned[idx:idx + 2])
                 idx += 2
@@ -503,29 +950,142 @@ class LogixDriver(CIPDriver):
         get the structure makeup for a specific structure
         """
         if instance_id not in self._cache['id:struct']:
-            request = self.new_request('send_unit_data')
-            req_path = request_path(ClassCode.template_object, Pack.uint(instance_id))
-            request.add(
-                CommonService.get_attribute_list,
-                req_path,
-
-                # service data:
-                b'\x04\x00',  # Number of attributes
-                b'\x04\x00',  # Template Object Definition Size UDINT
-                b'\x05\x00',  # Template Structure Size UDINT
-                b'\x02\x00',  # Template Member Count UINT
-                b'\x01\x00',  # Structure Handle We can use this to read and write UINT
-            )
-
+            request = self._structure_makeup_request(instance_id)
             response = request.send()
-            if not response:
-                raise DataError(f"send_unit_data returned not valid data", response.error)
-            _struct = _parse_structure_makeup_attributes(response)
-            self._cache['id:struct'][instance_id] = _struct
-            self._cache['handle:id'][_struct['structure_handle']] = instance_id
+            self._structure_makeup_response(instance_id, response)
 
         return self._cache['id:struct'][instance_id]
 
+    def _structure_makeup_request(self, instance_id):
+        request = self.new_request('send_unit_data')
+        service, req_path, service_data, _ = _structure_makeup_service(instance_id)
+        request.add(service, req_path, service_data)
+        return request
+
+    def _structure_makeup_response(self, instance_id, response):
+        if not response:
+            raise DataError(f"send_unit_data returned not valid data", response.error)
+        self._add_structure_makeup(instance_id, response.service_status, response.data)
+
+    def _add_structure_makeup(self, instance_id, service_status, data):
+        _struct = _parse_structure_makeup_attributes(service_status, data)
+        self._cache['id:struct'][instance_id] = _struct
+        if 'structure_handle' in _struct:
+            self._cache['handle:id'][_struct['structure_handle']] = instance_id
+
+    def _structure_makeups_requests(self, instance_ids) -> List[MultiServiceRequestPacket]:
+        """
+        Creates the multi-service requests to get the structure makeup of many templates at once,
+        skipping any templates already in the cache
+        """
+        requests = []
+        request, count = None, 0
+        max_count = (self.connection_size - MULTISERVICE_READ_OVERHEAD) // STRUCTURE_MAKEUP_REPLY_SIZE
+        for instance_id in instance_ids:
+            if instance_id in self._cache['id:struct']:
+                continue
+            if request is None or count >= max_count or not request.add_service(*_structure_makeup_service(instance_id)):
+                request, count = self.new_request('multi_request'), 0
+                requests.append(request)
+                request.add_service(*_structure_makeup_service(instance_id))
+            count += 1
+
+        return requests
+
+    def _structure_makeups_response(self, request, response):
+        if not response:
+            raise DataError(f"send_unit_data returned not valid data", response.error)
+        for service in request.tags:
+            self._add_structure_makeup(service['tag'], service['service_status'], service['value'])
+
+    def _upload_data_types_steps(self, instance_ids, known_types=None):
+        """
+        Uploads the definitions of the UDTs and all the UDTs nested in them.  Instead of uploading them one at a time,
+        the structure makeups for many templates are requested in each multi-service request and then the template
+        data for all of them is read using pipelined requests, repeated for each level of nested UDTs.
+        Templates with a structure handle in ``known_types`` (``{handle: data type}``) reuse that data type instead
+        of being read again.  See :meth:`_run_steps`.
+        """
+        templates = {}
+        pending = self._data_types_to_upload(instance_ids, templates)
+        try:
+            while pending:
+                for request, response in _sent_responses((yield self._structure_makeups_requests(pending))):
+                    self._structure_makeups_response(request, response)
+
+                level = {instance_id: b'' for instance_id in self._templates_to_read(pending, known_types)}
+                reading = list(level)
+                while reading:
+                    requests = self._template_requests(level, reading)
+                    reading = []
+                    for request, response in _sent_responses((yield list(requests))):
+                        if self._template_response(level, requests[request], response):
+                            reading.append(requests[request])
+
+                templates.update(level)
+                pending = self._data_types_to_upload(self._nested_template_ids(level), templates)
+
+            for instance_id in templates:
+                self._add_uploaded_data_type(instance_id, templates)
+        except Exception as err:
+            raise DataError('Failed to get data type information') from err
+
+    def _templates_to_read(self, instance_ids, known_types):
+        to_read = []
+        for instance_id in instance_ids:
+            template = self._cache['id:struct'][instance_id]
+            if template.get('error'):
+                continue
+            known = known_types.get(template['structure_handle']) if known_types else None
+            if known is not None:
+                self._cache['id:udt'][instance_id] = known
+            else:
+                to_read.append(instance_id)
+        return to_read
+
+    def _data_types_to_upload(self, instance_ids, templates):
+        return [instance_id for instance_id in dict.fromkeys(instance_ids)
+                if instance_id not in templates and instance_id not in self._cache['id:udt']]
+
+    def _nested_template_ids(self, templates):
+        return (struct_id for instance_id, data in templates.items()
+                for struct_id in _template_member_struct_ids(data, self._cache['id:struct'][instance_id]['member_count']))
+
+    def _template_requests(self, templates, instance_ids) -> dict:
+        """
+        Creates the requests to read the remaining template data for each template, returns ``{request: instance id}``
+        """
+        requests = {}
+        for instance_id in instance_ids:
+            object_definition_size = self._cache['id:struct'][instance_id]['object_definition_size']
+            request = self._read_template_request(instance_id, object_definition_size, len(templates[instance_id]))
+            request.can_pipeline = True  # a single service, a partial reply is continued by another request
+            requests[request] = instance_id
+        return requests
+
+    def _template_response(self, templates, instance_id, response) -> bool:
+        """
+        Adds the template data from the response, returns True if there is more data to read
+        """
+        if response.service_status not in (SUCCESS, INSUFFICIENT_PACKETS):
+            raise DataError('Error reading template', response)
+
+        templates[instance_id] += response.data
+        return response.service_status == INSUFFICIENT_PACKETS
+
+    def _add_uploaded_data_type(self, instance_id, templates):
+        """
+        Adds the data type for the uploaded template, any nested UDTs are added before it so parsing the template
+        never needs to send a request
+        """
+        if instance_id not in self._cache['id:udt']:
+            template = self._cache['id:struct'][instance_id]
+            data = templates[instance_id]
+            for struct_id in _template_member_struct_ids(data, template['member_count']):
+                if struct_id in templates:
+                    self._add_uploaded_data_type(struct_id, templates)
+            self._add_data_type(instance_id, template, data)
+
     def _read_template(self, instance_id, object_definition_size):
         """ get a list of the tags in the plc
 
@@ -535,15 +1095,7 @@ class LogixDriver(CIPDriver):
         template_raw = b''
         try:
             while True:
-                request = self.new_request('send_unit_data')
-                req_path = request_path(ClassCode.template_object, instance=Pack.uint(instance_id))
-                request.add(
-                    TagService.read_tag,
-                    req_path,
-                    # service data:
-                    Pack.dint(offset),
-                    Pack.uint(((object_definition_size * 4) - 21) - offset)
-                )
+                request = self._read_template_request(instance_id, object_definition_size, offset)
                 response = request.send()
 
                 if response.service_status not in (SUCCESS, INSUFFICIENT_PACKETS):
@@ -561,6 +1113,18 @@ class LogixDriver(CIPDriver):
         else:
             return template_raw
 
+    def _read_template_request(self, instance_id, object_definition_size, offset):
+        request = self.new_request('send_unit_data')
+        req_path = request_path(ClassCode.template_object, instance=Pack.uint(instance_id))
+        request.add(
+            TagService.read_tag,
+            req_path,
+            # service data:
+            Pack.dint(offset),
+            Pack.uint(((object_definition_size * 4) - 21) - offset)
+        )
+        return request
+
     def _parse_template_data(self, data, member_count):
         info_len = member_count * TEMPLATE_MEMBER_INFO_LEN
         info_data = data[:info_len]
@@ -633,15 +1197,19 @@ class LogixDriver(CIPDriver):
                 template = self._get_structure_makeup(instance_id)  # instance id from type
                 if not template.get('error'):
                     _data = self._read_template(instance_id, template['object_definition_size'])
-                    data_type = self._parse_template_data(_data, template['member_count'])
-                    data_type['template'] = template
-                    self._cache['id:udt'][instance_id] = data_type
-                    self._data_types[data_type['name']] = data_type
+                    self._add_data_type(instance_id, template, _data)
             except Exception as err:
                 raise DataError('Failed to get data type information') from err
 
         return self._cache['id:udt'][instance_id]
 
+    def _add_data_type(self, instance_id, template, template_data):
+        data_type = self._parse_template_data(template_data, template['member_count'])
+        data_type['template'] = template
+        self._cache['id:udt'][instance_id] = data_type
+        self._data_types[data_type['name']] = data_type
+        return data_type
+
     @with_forward_open
     def read(self, *tags: str) -> ReadWriteReturnType:
         """
@@ -657,8 +1225,47 @@ class LogixDriver(CIPDriver):
 
         parsed_requests = self._parse_requested_tags(tags)
         requests = self._read_build_requests(parsed_requests)
-        read_results = self._send_requests(requests)
+        read_results = self._send_read_requests(requests, parsed_requests)
+        return self._read_results(tags, parsed_requests, read_results)
+
+    @with_forward_open
+    def prepare_read(self, *tags: str) -> 'ReadGroup':
+        """
+        Prepares the requests to read a fixed group of tags, so they can be read repeatedly without parsing the tags
+        and building the requests every time.  Tags are grouped into packets the same way as :meth:`.read`.
+
+        >>> group = plc.prepare_read('DINT1', 'REAL1', 'SINT_ARY{10}')
+        >>> while True:
+        >>>     results = group.read()
+
+        .. note::
+
+            The prepared requests are based on the tag definitions and connection size when the group is created,
+            they are prepared again automatically if the tag list is reloaded or refreshed.
 
+        :param tags: one or many tags to read
+        :return: a :class:`ReadGroup`, use ``group.read()`` to read the tags
+        """
+        return ReadGroup(self, tags)
+
+    @with_forward_open
+    def _read_group(self, group: 'ReadGroup') -> ReadWriteReturnType:
+        self._check_shared_tags()
+        requests = group._renew_requests()
+        read_results = self._send_read_requests(requests, group._parsed_requests)
+        return self._read_results(group.tags, group._parsed_requests, read_results)
+
+    def _send_read_requests(self, requests, parsed_requests):
+        read_results = self._send_requests(requests, parallel=True)
+        uncoalesced = self._uncoalesced_requests(parsed_requests, read_results)
+        if uncoalesced:
+            read_results.update(self._send_requests(uncoalesced, parallel=True))
+        return read_results
+
+    def _read_results(self, tags, parsed_requests, read_results) -> ReadWriteReturnType:
+        """
+        Creates the ``Tag`` results for each of the requested tags from the results of the sent requests
+        """
         results = []
 
         for tag in tags:
@@ -668,7 +1275,12 @@ class LogixDriver(CIPDriver):
                     results.append(Tag(tag, None, None, request_data['error']))
                     continue
 
-                result = read_results[(request_data['plc_tag'], request_data['elements'])]
+                if request_data.get('coalesced') and \
+                        (request_data['plc_tag'], request_data['elements']) not in read_results:  # not read separately
+                    result = _split_coalesced_result(request_data, read_results)
+                else:
+                    result = read_results[(request_data['plc_tag'], request_data['elements'])]
+
                 if request_data.get('bit') is None:
                     results.append(result)
                 else:
@@ -686,21 +1298,75 @@ class LogixDriver(CIPDriver):
         else:
             return results[0]
 
-    def _read_build_requests(self, parsed_tags):
+    def _read_build_requests(self, parsed_tags, coalesce=True):
+        if coalesce and self.coalesce_array_reads:
+            parsed_tags = self._coalesce_array_reads(parsed_tags)
+
         if len(parsed_tags) == 1 or self._micro800:
             requests = (self._read_build_single_request(parsed_tags[tag]) for tag in parsed_tags)
             return [r for r in requests if r is not None]
         else:
             return self._read_build_multi_requests(parsed_tags)
 
+    def _coalesce_array_reads(self, parsed_tags):
+        """
+        Combines reads of elements from the same array into a single read of the range of elements.  Elements may be
+        combined if the gap between them is no larger than ``ARRAY_READ_MAX_GAP`` bytes.  Each combined request is
+        marked with ``'coalesced'``, the key of the combined read and the offset of its elements in it.  If a combined
+        read fails, its requests are read separately, see :meth:`_uncoalesced_requests`.
+
+        :return: the requests to read, the combined reads replacing the requests that were combined
+        """
+        arrays = {}
+        for tag, tag_data in parsed_tags.items():
+            array_index = _coalescable_array_index(tag_data)
+            if array_index is not None:
+                base, index = array_index
+                arrays.setdefault(base, []).append((index, tag_data))
+
+        if not any(len(elements) > 1 for elements in arrays.values()):
+            return parsed_tags
+
+        requests = {tag: tag_data for tag, tag_data in parsed_tags.items() if _coalescable_array_index(tag_data) is None}
+
+        for base, elements in arrays.items():
+            elements.sort(key=lambda x: x[0])
+            max_gap = ARRAY_READ_MAX_GAP // _element_size(elements[0][1]['tag_info'])
+            group = []
+            end = None
+            for index, tag_data in elements:
+                if group and index - end > max_gap:
+                    requests.update(_coalesce_group(base, group, end))
+                    group = []
+                group.append((index, tag_data))
+                end = max(end or 0, index + tag_data['elements'])
+            requests.update(_coalesce_group(base, group, end))
+
+        return requests
+
+    def _uncoalesced_requests(self, parsed_requests, read_results) -> list:
+        """
+        Returns the requests to read separately the elements of the combined array reads that failed, so an invalid
+        element (or one the combined read could not be used for) only fails its own request
+        """
+        separate = {}
+        for tag_data in parsed_requests.values():
+            coalesced = tag_data.get('coalesced')
+            if coalesced and not read_results.get(coalesced[0]):
+                tag_data = {key: value for key, value in tag_data.items() if key != 'coalesced'}
+                separate[f"{tag_data['plc_tag']}{{{tag_data['elements']}}}"] = tag_data
+
+        if not separate:
+            return []
+        self.__log.info(f'Combined array read failed, reading {len(separate)} element(s) separately')
+        return self._read_build_requests(separate, coalesce=False)
+
     def _read_build_multi_requests(self, parsed_tags):
         """
-        creates a list of multi-request packets
+        creates a list of multi-request packets, grouping the tags using the :attr:`read_planner`
         """
         requests = []
-        response_size = MULTISERVICE_READ_OVERHEAD
-        current_request = self.new_request('multi_request')
-        requests.append(current_request)
+        items = []
         tags_in_requests = set()
         for tag, tag_data in parsed_tags.items():
             if tag_data.get('error') is None and (tag_data['plc_tag'], tag_data['elements']) not in tags_in_requests:
@@ -711,29 +1377,40 @@ class LogixDriver(CIPDriver):
                     _request.add(tag_data['plc_tag'], tag_data['elements'], tag_data['tag_info'])
                     requests.append(_request)
                 else:
-                    try:
-                        return_size += 2  # add 2 bytes for offset list in reply
-                        if response_size + return_size < self.connection_size:
-                            if current_request.add_read(tag_data['plc_tag'], tag_data['elements'], tag_data['tag_info']):
-                                response_size += return_size
-                            else:
-                                response_size = return_size + MULTISERVICE_READ_OVERHEAD
-                                current_request = self.new_request('multi_request')
-                                current_request.add_read(tag_data['plc_tag'], tag_data['elements'], tag_data['tag_info'])
-                                requests.append(current_request)
-                        else:
-                            response_size = return_size + MULTISERVICE_READ_OVERHEAD
-                            current_request = self.new_request('multi_request')
-                            current_request.add_read(tag_data['plc_tag'], tag_data['elements'], tag_data['tag_info'])
-                            requests.append(current_request)
-                    except RequestError:
-                        self.__log.exception(f'Failed to build request for {tag} - skipping')
+                    request_path = self._tag_request_path(tag_data['plc_tag'])
+                    if request_path is None:
+                        self.__log.error(f'Failed to build request for {tag} - skipping')
                         continue
+                    # service + request path + elements + offset, return size + offset
+                    items.append(ReadPlanItem(tag_data, len(request_path) + 5, return_size + 2))
             else:
                 self.__log.error(f'Skipping making request for {tag}, error: {tag_data.get("error")}')
                 continue
 
-        return (r for r in requests if (r.type_ == 'multi' and r.tags) or r.type_ == 'read')
+        planner = self.read_planner
+        if not callable(planner):
+            planner = READ_PLANNERS[planner]
+
+        packets = planner(items, self.connection_size)
+        fragmented = len(requests)
+
+        for packet in packets:
+            current_request = self.new_request('multi_request')
+            requests.append(current_request)
+            for item in packet.items:
+                tag_data = item.tag_data
+                if not current_request.add_read(tag_data['plc_tag'], tag_data['elements'], tag_data['tag_info']):
+                    current_request = self.new_request('multi_request')
+                    current_request.add_read(tag_data['plc_tag'], tag_data['elements'], tag_data['tag_info'])
+                    requests.append(current_request)
+
+        self._read_plan_stats = {
+            'packets': len(requests),
+            'fragmented': fragmented,
+            'wasted_bytes': sum(packet.wasted for packet in packets),
+        }
+
+        return requests
 
     def _read_build_single_request(self, parsed_tag):
         """
@@ -761,27 +1438,30 @@ class LogixDriver(CIPDriver):
         response size.  Will use the multi-service request to group many tags into a single packet and also will automatically
         use fragmented read requests if the response size will not fit in a single packet.  Supports arrays (specify element
         count in using curly braces (array{10}).  Also supports full structure writing (when possible), value must be a
-        sequence of values matching the exact structure of the destination tag.
+        sequence of values matching the exact structure of the destination tag or a dict of ``{attribute: value}``,
+        any attributes not included in the dict are written as 0.
 
         :param tags_values: one or many 2-element tuples (tag name, value)
         :return: a single or list of ``Tag`` objects.
         """
+        parsed_requests = self._parse_write_requests(tags_values)
+        requests, bit_writes = self._write_build_requests(parsed_requests)
+        write_results = self._send_requests(requests)
+        return self._write_results(tags_values, parsed_requests, write_results)
+
+    def _parse_write_requests(self, tags_values):
         tags = (tag for (tag, value) in tags_values)
         parsed_requests = self._parse_requested_tags(tags)
 
-        normal_tags = set()
-        bit_tags = set()
-
         for tag, value in tags_values:
             parsed_requests[tag]['value'] = value
 
-            if parsed_requests[tag].get('bit') is None:
-                normal_tags.add(tag)
-            else:
-                bit_tags.add(tag)
+        return parsed_requests
 
-        requests, bit_writes = self._write_build_requests(parsed_requests)
-        write_results = self._send_requests(requests)
+    def _write_results(self, tags_values, parsed_requests, write_results) -> ReadWriteReturnType:
+        """
+        Creates the ``Tag`` results for each of the written tags from the results of the sent requests
+        """
         results = []
         for tag, value in tags_values:
             try:
@@ -903,6 +1583,8 @@ class LogixDriver(CIPDriver):
                     return None
         try:
             data = self._tags[util.strip_array(base)]
+            if data['tag_type'] == 'struct' and data['data_type'] is None:
+                data = self._lazy_data_type(data)
             if not len(attrs):
                 return data
             else:
@@ -917,6 +1599,7 @@ class LogixDriver(CIPDriver):
             raise RequestError(_msg) from err
 
     def _parse_requested_tags(self, tags):
+        self._check_shared_tags()
         requests = {}
         for tag in tags:
             parsed = {}
@@ -938,6 +1621,26 @@ class LogixDriver(CIPDriver):
         return requests
 
     def _parse_tag_request(self, tag: str) -> Optional[Tuple[str, Optional[int], int, dict]]:
+        key = ('request', tag, self.use_instance_ids)
+        parsed_request = self._tag_request_cache.get(key)
+        if parsed_request is None:
+            parsed_request = self._parse_tag(tag)
+            self._tag_request_cache.set(key, parsed_request)
+        return parsed_request
+
+    def _tag_request_path(self, tag: str) -> Optional[bytes]:
+        """
+        Returns the packed request path for a tag, see ``_create_tag_rp``
+        """
+        key = ('path', tag, self.use_instance_ids)
+        request_path = self._tag_request_cache.get(key)
+        if request_path is None:
+            request_path = _create_tag_rp(tag, self._tags, self.use_instance_ids)
+            if request_path is not None:
+                self._tag_request_cache.set(key, request_path)
+        return request_path
+
+    def _parse_tag(self, tag: str) -> Tuple[str, Optional[int], int, dict]:
         try:
             if tag.endswith('}') and '{' in tag:
                 tag, _tmp = tag.split('{')
@@ -967,7 +1670,87 @@ class LogixDriver(CIPDriver):
         except Exception as err:
             raise RequestError('Failed to parse tag request', tag) from err
 
-    def _send_requests(self, requests):
+    def _send_requests(self, requests, parallel=False):
+        results = {}
+        connections = self._get_parallel_connections(len(requests)) if parallel else [self, ]
+
+        if len(connections) == 1:
+            for request, response in self._send_pipelined(_requests_on_connection(self, requests)):
+                self._request_results(request, response, results)
+        else:
+            assigned = [list(_requests_on_connection(connection, requests[i::len(connections)]))
+                        for i, connection in enumerate(connections)]
+
+            futures = [self._executor.submit(_send_on_connection, connection, _requests)
+                       for connection, _requests in zip(connections[1:], assigned[1:])]
+            try:
+                for request, response in self._send_pipelined(assigned[0]):
+                    self._request_results(request, response, results)
+            finally:
+                wait(futures)  # never leave the other connections sending when this one fails
+
+            for connection, future in zip(connections[1:], futures):
+                sent, err = future.result()
+                if err is not None:
+                    self.__log.error(f'Parallel connection failed, it will be reopened when needed - {err}')
+                    self._drop_parallel_connection(connection)
+                for request, response in sent:
+                    self._request_results(request, response, results)
+
+        return results
+
+    def _get_parallel_connections(self, num_requests: int) -> list:
+        """
+        Returns the connections (this driver and the other connections) to use for sending ``num_requests``,
+        opening any of the other connections that are needed but not opened yet
+        """
+        count = min(self._cfg['connections'], num_requests)
+        while len(self._parallel_connections) < count - 1:
+            connection = _ParallelConnection(self)
+            try:
+                connection.open()
+                if not connection._forward_open():
+                    raise CommError('Forward Open failed')
+            except Exception as err:
+                self.__log.warning(f'Failed to open parallel connection, using {len(self._parallel_connections) + 1} '
+                                   f'connection(s) for this request - {err}')
+                _close_connection(connection)
+                count = len(self._parallel_connections) + 1
+                break
+            self._parallel_connections.append(connection)
+
+        if self._parallel_connections and self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._cfg['connections'] - 1,
+                                                thread_name_prefix='pycomm3-connection')
+
+        return [self, *self._parallel_connections[:count - 1]]
+
+    def _drop_parallel_connection(self, connection):
+        self._parallel_connections.remove(connection)
+        _close_connection(connection)
+
+    def _close_parallel_connections(self):
+        for connection in self._parallel_connections:
+            _close_connection(connection)
+        self._parallel_connections = []
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def close(self):
+        self._close_parallel_connections()
+        self._release_shared_tags()
+        super().close()
+
+    def reconnect(self):
+        self._close_parallel_connections()
+        super().reconnect()
+
+    def _request_results(self, request, response, results):
+        """
+        Adds the ``Tag`` result(s) for a sent request to ``results``, ``{(tag, elements): Tag}``.
+        ``response`` may be the exception raised while sending the request.
+        """
 
         def _mkkey(t=None, r=None):
             if t is not None:
@@ -975,35 +1758,30 @@ class LogixDriver(CIPDriver):
             else:
                 return r.tag, r.elements
 
-        results = {}
-
-        for request in requests:
-            try:
-                response = request.send()
-            except (RequestError, DataError) as err:
-                self.__log.exception('Error sending request')
-                if request.type_ != 'multi':
-                    results[_mkkey(r=request)] = Tag(request.tag, None, None, str(err))
+        if isinstance(response, Exception):
+            err = response
+            self.__log.error(f'Error sending request - {err}', exc_info=err)
+            if request.type_ != 'multi':
+                results[_mkkey(r=request)] = Tag(request.tag, None, None, str(err))
+            else:
+                for tag in request.tags:
+                    results[_mkkey(t=tag)] = Tag(tag['tag'], None, None, str(err))
+        else:
+            if request.type_ != 'multi':
+                if response:
+                    results[_mkkey(r=request)] = Tag(request.tag,
+                                                     response.value if request.type_ == 'read' else request.value,
+                                                     response.data_type if request.type_ == 'read' else request.data_type,
+                                                     response.error)
                 else:
-                    for tag in request.tags:
-                        results[_mkkey(t=tag)] = Tag(tag['tag'], None, None, str(err))
+                    results[_mkkey(r=request)] = Tag(request.tag, None, None, response.error)
             else:
-                if request.type_ != 'multi':
-                    if response:
-                        results[_mkkey(r=request)] = Tag(request.tag,
-                                                         response.value if request.type_ == 'read' else request.value,
-                                                         response.data_type if request.type_ == 'read' else request.data_type,
-                                                         response.error)
+                for tag in response.tags:
+                    if tag['service_status'] == SUCCESS:
+                        results[_mkkey(t=tag)] = Tag(tag['tag'], tag['value'], tag['data_type'], None)
                     else:
-                        results[_mkkey(r=request)] = Tag(request.tag, None, None, response.error)
-                else:
-                    for tag in response.tags:
-                        if tag['service_status'] == SUCCESS:
-                            results[_mkkey(t=tag)] = Tag(tag['tag'], tag['value'], tag['data_type'], None)
-                        else:
-                            results[_mkkey(t=tag)] = Tag(tag['tag'], None, None,
-                                                         tag.get('error', 'Unknown Service Error'))
-        return results
+                        results[_mkkey(t=tag)] = Tag(tag['tag'], None, None,
+                                                     tag.get('error', 'Unknown Service Error'))
 
     def get_plc_time(self, fmt: str='%A, %B %d, %Y %I:%M:%S%p') -> Tag:
         """
@@ -1014,19 +1792,8 @@ class LogixDriver(CIPDriver):
         :param fmt: format string for converting the time to a string
         :return: a Tag object with the current time
         """
-        tag = self.generic_message(
-            service=CommonService.get_attribute_list,
-            class_code=ClassCode.wall_clock_time,
-            instance=b'\x01',
-            request_data=b'\x01\x00\x0B\x00',
-            data_format=[(None, 6), ('us', 'ULINT'), ]
-        )
-        if tag:
-            _time = datetime.datetime(1970, 1, 1) + datetime.timedelta(microseconds=tag.value['us'])
-            value = {'datetime': _time, 'microseconds': tag.value['us'], 'string': _time.strftime(fmt)}
-        else:
-            value = None
-        return Tag('__GET_PLC_TIME__', value, None, error=tag.error)
+        tag = self.generic_message(**_GET_PLC_TIME_PARAMS)
+        return _plc_time_response(tag, fmt)
 
     def set_plc_time(self, microseconds: Optional[int] = None) -> Tag:
         """
@@ -1035,20 +1802,155 @@ class LogixDriver(CIPDriver):
         :param microseconds: None to use client PC clock, else timestamp in microseconds to set the PLC clock to
         :return: Tag with status of request
         """
-        if microseconds is None:
-            microseconds = int(time.time() * SEC_TO_US)
-
-        request_data = b''.join([
-            b'\x01\x00',  # attribute count
-            b'\x06\x00',  # attribute
-            Pack.ulint(microseconds),
-        ])
-        return self.generic_message(
-            service=CommonService.set_attribute_list,
-            class_code=ClassCode.wall_clock_time,
-            instance=b'\x01',
-            request_data=request_data, name='__SET_PLC_TIME__'
-        )
+        return self.generic_message(**_set_plc_time_params(microseconds))
+
+
+class _ParallelConnection(CIPDriver):
+    """
+    An additional connection to the same controller as a :class:`LogixDriver`, used to send requests built by the
+    driver in parallel.  The configuration is shared with the driver, only the values set by this connection (like the
+    connection serial numbers) are kept separate.
+    """
+
+    def __init__(self, plc: LogixDriver):
+        super().__init__(plc._cfg['ip address'])
+        self._cfg = ChainMap({}, plc._cfg)
+
+
+def _requests_on_connection(connection, requests):
+    """
+    Yields the requests, moving any that were last sent on another connection (like prepared requests) to ``connection``
+    """
+    for request in requests:
+        if request._plc is not connection:
+            request._use_connection(connection)
+        yield request
+
+
+def _send_on_connection(connection, requests):
+    """
+    Sends the requests on ``connection``, returning the sent ``(request, response)`` pairs and the error that broke the
+    connection (or ``None``).  If the connection fails, the error is the response for every request not yet answered.
+    """
+    sent = []
+    try:
+        for request, response in connection._send_pipelined(requests):
+            sent.append((request, response))
+    except Exception as err:
+        answered = {id(request) for request, _ in sent}
+        sent += [(request, err) for request in requests if id(request) not in answered]
+        return sent, err
+    return sent, None
+
+
+def _close_connection(connection):
+    try:
+        connection.close()
+    except CommError as err:
+        logging.getLogger(__name__).warning(f'Error closing parallel connection - {err}')
+
+
+class ReadGroup:
+    """
+    A group of tags prepared by :meth:`LogixDriver.prepare_read` to be read repeatedly.  The tags are parsed and
+    the request messages built only once, reading the group only updates the sequence number, session, and
+    connection id of each message before sending it.
+    """
+
+    def __init__(self, plc: LogixDriver, tags: Tuple[str, ...]):
+        self._plc = plc
+        self.tags = tags
+        self._prepare()
+
+    def _prepare(self):
+        plc = self._plc
+        self._parsed_requests = plc._parse_requested_tags(self.tags)
+        self._generation = plc._tag_generation
+        self._requests = []  # prepared requests or parsed tags for requests rebuilt every read
+        for request in plc._read_build_requests(self._parsed_requests):
+            if request.can_pipeline and not request.error:
+                request._prepare()
+                self._requests.append(request)
+            else:  # fragmented requests send a new message for each fragment, so they cannot be prepared
+                self._requests.append({'plc_tag': request.tag, 'elements': request.elements,
+                                       'tag_info': request.tag_info})
+
+    def __len__(self):
+        return len(self.tags)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(tags={self.tags!r})'
+
+    def _renew_requests(self):
+        if self._generation != self._plc._tag_generation:  # tag definitions changed since the group was prepared
+            self._prepare()
+        requests = []
+        for request in self._requests:
+            if isinstance(request, dict):
+                requests.append(self._plc._read_build_single_request(request))
+            else:
+                request._renew()
+                requests.append(request)
+        return requests
+
+    def read(self) -> ReadWriteReturnType:
+        """
+        Reads the tags in the group, results are the same as :meth:`LogixDriver.read`
+
+        :return: a single or list of ``Tag`` objects
+        """
+        return self._plc._read_group(self)
+
+
+_PLC_NAME_PARAMS = dict(
+    service=CommonService.get_attribute_list,
+    class_code=ClassCode.program_name,
+    instance=b'\x01\x00',  # instance 1
+    request_data=b'\x01\x00\x01\x00',  # num attributes, attribute 1 (program name)
+    data_format=((None, 6), ('program_name', 'STRING')),
+)
+
+_CHANGE_INDICATOR_PARAMS = dict(
+    service=CommonService.get_attribute_list,
+    class_code=ClassCode.controller_change,
+    instance=b'\x01',
+    request_data=b'\x05\x00\x01\x00\x02\x00\x03\x00\x04\x00\x0A\x00',  # num attributes, attributes 1-4, 10
+    name='change_indicator',
+)
+
+_GET_PLC_TIME_PARAMS = dict(
+    service=CommonService.get_attribute_list,
+    class_code=ClassCode.wall_clock_time,
+    instance=b'\x01',
+    request_data=b'\x01\x00\x0B\x00',
+    data_format=[(None, 6), ('us', 'ULINT'), ]
+)
+
+
+def _plc_time_response(tag, fmt):
+    if tag:
+        _time = datetime.datetime(1970, 1, 1) + datetime.timedelta(microseconds=tag.value['us'])
+        value = {'datetime': _time, 'microseconds': tag.value['us'], 'string': _time.strftime(fmt)}
+    else:
+        value = None
+    return Tag('__GET_PLC_TIME__', value, None, error=tag.error)
+
+
+def _set_plc_time_params(microseconds=None):
+    if microseconds is None:
+        microseconds = int(time.time() * SEC_TO_US)
+
+    request_data = b''.join([
+        b'\x01\x00',  # attribute count
+        b'\x06\x00',  # attribute
+        Pack.ulint(microseconds),
+    ])
+    return dict(
+        service=CommonService.set_attribute_list,
+        class_code=ClassCode.wall_clock_time,
+        instance=b'\x01',
+        request_data=request_data, name='__SET_PLC_TIME__'
+    )
 
 
 def _parse_plc_info(data):
@@ -1062,15 +1964,58 @@ def _parse_plc_info(data):
     return parsed
 
 
-def _parse_structure_makeup_attributes(response):
+def _tag_signature(tag):
+    return {key: value for key, value in tag.items() if key != 'data_type' or tag['tag_type'] != 'struct'}
+
+
+def _base_tag_name(tag):
+    """
+    Returns the name of the base tag in the :attr:`LogixDriver.tags` for a tag request, like ``_parse_tag``
+    """
+    base, *attrs = tag.split('{')[0].split('.')
+    if base.startswith('Program:') and attrs:
+        base = f'{base}.{attrs[0]}'
+    return util.strip_array(base)
+
+
+def _structure_makeup_service(instance_id):
+    return (
+        CommonService.get_attribute_list,
+        request_path(ClassCode.template_object, Pack.uint(instance_id)),
+        b''.join((
+            b'\x04\x00',  # Number of attributes
+            b'\x04\x00',  # Template Object Definition Size UDINT
+            b'\x05\x00',  # Template Structure Size UDINT
+            b'\x02\x00',  # Template Member Count UINT
+            b'\x01\x00',  # Structure Handle We can use this to read and write UINT
+        )),
+        instance_id
+    )
+
+
+def _template_member_struct_ids(data, member_count):
+    """
+    Returns the instance ids of the UDTs used as members in the template data, in the order they appear.
+    """
+    struct_ids = []
+    for i in range(0, member_count * TEMPLATE_MEMBER_INFO_LEN, TEMPLATE_MEMBER_INFO_LEN):
+        typ = Unpack.uint(data[i + 2:i + 4])
+        if DataType.get(typ) is None:
+            instance_id = typ & 0b0000_1111_1111_1111
+            if DataType.get(instance_id) is None and instance_id not in struct_ids:
+                struct_ids.append(instance_id)
+
+    return struct_ids
+
+
+def _parse_structure_makeup_attributes(service_status, attribute):
         """ extract the tags list from the message received"""
         structure = {}
 
-        if response.service_status != SUCCESS:
-            structure['error'] = response.service_status
-            return
+        if service_status != SUCCESS:
+            structure['error'] = service_status
+            return structure
 
-        attribute = response.data
         idx = 4
         try:
             if Unpack.uint(attribute[idx:idx + 2]) == SUCCESS:
@@ -1138,78 +2083,122 @@ def writable_value(parsed_tag):
         raise RequestError('Unable to create a writable value') from err
 
 
-def _tag_return_size(tag_data):
-    tag_info = tag_data['tag_info']
-    if tag_info['tag_type'] == 'atomic':
-        size = DataTypeSize[tag_info['data_type']]
-    else:
-        size = tag_info['data_type']['template']['structure_size']
+def _coalescable_array_index(tag_data):
+    """
+    Returns the array and index (``'Array[5]'`` -> ``('Array', 5)``) if the request is for an element
+    of a single dimension array that may be combined with other reads, else None.  Requests past the end of the
+    array are not combined, so they only fail themselves.
+    """
+    if tag_data.get('error') is not None or tag_data.get('coalesced'):
+        return None
 
-    size = (size * tag_data['elements']) + READ_RESPONSE_OVERHEAD  # account for service overhead
+    bit = tag_data.get('bit')
+    plc_tag = tag_data['plc_tag']
+    if (bit is not None and bit[0] != 'bit') or tag_data['tag_info']['data_type'] == 'DWORD' or \
+            not plc_tag.endswith(']'):
+        return None
 
-    return size
+    base, _, index = plc_tag[:-1].rpartition('[')
+    if not base or not index.isdigit():
+        return None
 
+    length = _array_length(tag_data['tag_info'])
+    if length and int(index) + tag_data['elements'] > length:
+        return None
 
-def _writable_value_structure(value, elements, data_type):
+    return base, int(index)
+
+
+def _coalesce_group(base, group, end):
+    """
+    Creates the combined read for a group of ``(index, parsed tag)`` from the same array
+    """
+    if len({(index, tag_data['elements']) for index, tag_data in group}) == 1:
+        return {tag_data['plc_tag']: tag_data for _, tag_data in group}
+
+    start = group[0][0]
+    combined = {
+        'plc_tag': f'{base}[{start}]',
+        'bit': None,
+        'elements': end - start,
+        'tag_info': group[0][1]['tag_info'],
+    }
+    key = (combined['plc_tag'], combined['elements'])
+    for index, tag_data in group:
+        tag_data['coalesced'] = (key, index - start)
+
+    return {f"{combined['plc_tag']}{{{combined['elements']}}}": combined}
+
+
+def _array_length(tag_info):
+    """
+    Returns the number of elements in a single dimension array tag or member, 0 if not known
+    """
+    if 'dimensions' in tag_info:
+        return tag_info['dimensions'][0] if tag_info.get('dim') == 1 else 0
+    return tag_info.get('array', 0)
+
+
+def _sent_responses(sent) -> list:
+    """
+    Returns the ``(request, response)`` pairs sent for a step (see :meth:`LogixDriver._run_steps`), raising the error
+    raised sending any of the requests instead
+    """
+    for _, response in sent:
+        if isinstance(response, Exception):
+            raise response
+    return sent
+
+
+def _generic_message_params(params: dict) -> dict:
+    """
+    Returns the parameters of a generic message for :meth:`CIPDriver._generic_message_request`, without the ``name``
+    """
+    return {key: value for key, value in params.items() if key != 'name'}
+
+
+def _split_coalesced_result(request_data, read_results):
+    """
+    Creates the result for a single request from the result of the combined read
+    """
+    key, offset = request_data['coalesced']
+    result = read_results[key]
+    elements = request_data['elements']
+    if not result:
+        return Tag(request_data['plc_tag'], None, None, result.error)
+
+    data_type = util.strip_array(result.type)
     if elements > 1:
-        return b''.join(_pack_structure(val, data_type) for val in value)
-    else:
-        return _pack_structure(value, data_type)
+        return Tag(request_data['plc_tag'], result.value[offset:offset + elements], f'{data_type}[{elements}]', None)
 
+    return Tag(request_data['plc_tag'], result.value[offset], data_type, None)
 
-def _pack_string(value, string_len, struct_size):
-    try:
-        sint_array = [b'\x00' for _ in range(struct_size-4)]  # 4 for .LEN
-        if len(value) > string_len:
-            value = value[:string_len]
-        for i, s in enumerate(value):
-            sint_array[i] = Pack.char(s)
-    except Exception as err:
-        raise RequestError('Failed to pack string') from err
-    return Pack.dint(len(value)) + b''.join(sint_array)
 
+def _element_size(tag_info):
+    if tag_info['tag_type'] == 'atomic':
+        return DataTypeSize[tag_info['data_type']]
+
+    return tag_info['data_type']['template']['structure_size']
 
-def _pack_structure(value, data_type):
-    string_len = data_type.get('string')
 
-    if string_len:
-        data = _pack_string(value, string_len, data_type['template']['structure_size'])
+def _tag_return_size(tag_data):
+    tag_info = tag_data['tag_info']
+    if tag_info['tag_type'] == 'atomic':
+        size = DataTypeSize[tag_info['data_type']]
     else:
-        data = [0 for _ in range(data_type['template']['structure_size'])]
-        try:
-            # NOTE:  start with bytes(object-definition-size) , then replace sections with offset + data len
-            for val, attr in zip(value, data_type['attributes']):
-                dtype = data_type['internal_tags'][attr]
-                offset = dtype['offset']
-
-                ary = dtype.get('array')
-                if dtype['tag_type'] == 'struct':
-                    if ary:
-                        value_bytes = [_pack_structure(val[i], dtype['data_type']) for i in range(ary)]
-                    else:
-                        value_bytes = [_pack_structure(val, dtype['data_type']), ]
-                else:
-                    pack_func = Pack[dtype['data_type']]
-                    bit = dtype.get('bit')
-                    if bit is not None:
-                        if val:
-                            data[offset] |= 1 << bit
-                        else:
-                            data[offset] &= ~(1 << bit)
-                        continue
+        size = tag_info['data_type']['template']['structure_size']
 
-                    if ary:
-                        value_bytes = [pack_func(val[i]) for i in range(ary)]
-                    else:
-                        value_bytes = [pack_func(val), ]
+    size = (size * tag_data['elements']) + READ_RESPONSE_OVERHEAD  # account for service overhead
 
-                val_bytes = list(itertools.chain.from_iterable(value_bytes))
-                data[offset:offset+len(val_bytes)] = val_bytes
+    return size
 
-        except Exception as err:
-            raise RequestError('Value Invalid for Structure') from err
 
-    return bytes(data)
+def _writable_value_structure(value, elements, data_type):
+    encoder = struct_encoder(data_type)
+    if elements > 1:
+        return encoder.encode_array(value)
+    else:
+        return encoder.encode(value)
 
 
 def _bit_request(tag_data, bit_requests):
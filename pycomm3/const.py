@@ -26,16 +26,25 @@ from .map import EnumMap
 from .bytes_ import Pack, Unpack
 
 HEADER_SIZE = 24
+ENIP_PORT = 0xAF12  # 44818, EtherNet/IP port for TCP and UDP
+LIST_IDENTITY_MAX_DELAY = 2000  # max ms a target may delay its reply to a broadcast ListIdentity
+CHASSIS_SLOTS = 17  # slots in the largest ControlLogix chassis
 
 # used to estimate packet size  and determine
 # when to start a new packet
 MULTISERVICE_READ_OVERHEAD = 6
+MULTISERVICE_REQUEST_OVERHEAD = 10  # sequence, service, path, and service count
 READ_RESPONSE_OVERHEAD = 10
+ARRAY_READ_MAX_GAP = 12  # max bytes of unrequested elements to include when combining array element reads
 
 MIN_VER_INSTANCE_IDS = 21  # using Symbol Instance Addressing not supported below version 21
 MIN_VER_LARGE_CONNECTIONS = 20  # >500 byte connections not supported below logix v20
 MIN_VER_EXTERNAL_ACCESS = 18  # ExternalAccess attributed added in v18
 
+TAG_REQUEST_CACHE_SIZE = 10_000  # max number of parsed tag requests and request paths cached by the LogixDriver
+STRUCT_CODEC_CACHE_SIZE = 4096  # max number of compiled structure decoders/encoders kept
+SLC_ADDRESS_CACHE_SIZE = 10_000  # max number of parsed data file addresses cached by the SLCDriver
+
 MICRO800_PREFIX = '2080'  # catalog number prefix for Micro800 PLCs
 
 EXTENDED_SYMBOL = b'\x91'
@@ -53,13 +62,16 @@ BASE_TAG_BIT = 1 << 26
 SEC_TO_US = 1_000_000  # seconds to microseconds
 
 TEMPLATE_MEMBER_INFO_LEN = 8  # 2B bit/array len, 2B datatype, 4B offset
+STRUCTURE_MAKEUP_REPLY_SIZE = 36  # reply size for the structure makeup attributes in a multi-service request
 STRUCTURE_READ_REPLY = b'\xa0\x02'
 
 SLC_CMD_CODE = b'\x0F'
 SLC_CMD_REPLY_CODE = b'\x4F'
 SLC_FNC_READ = b'\xa2'  # protected typed logical read w/ 3 address fields
 SLC_FNC_WRITE = b'\xaa'  # protected typed logical write w/ 3 address fields
+SLC_FNC_MASKED_WRITE = b'\xab'  # protected typed logical masked write w/ 3 address fields
 SLC_REPLY_START = 61
+SLC_MAX_DATA_SIZE = 236  # max number of data bytes for a single typed read or write
 PCCC_PATH = b'\x67\x24\x01'
 
 
@@ -172,6 +184,7 @@ class ClassCode(EnumMap):
     template_object = b'\x6c'
     connection_manager = b'\x06'
     program_name = b'\x64'  # Rockwell KB# 23341
+    controller_change = b'\xac'  # Logix controller, attributes include counters changed by program edits
     wall_clock_time = b'\x8b'  # Micro800 CIP client messaging quick start
     tcpip = b'\xf5'
     ethernet_link = b'\xf6'
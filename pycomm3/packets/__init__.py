@@ -36,13 +36,13 @@ from .responses import (ResponsePacket, SendUnitDataResponsePacket, SendRRDataRe
                         RegisterSessionResponsePacket, UnRegisterSessionResponsePacket, ReadTagServiceResponsePacket,
                         MultiServiceResponsePacket, ReadTagFragmentedServiceResponsePacket, GenericConnectedResponsePacket,
                         WriteTagServiceResponsePacket, WriteTagFragmentedServiceResponsePacket, GenericUnconnectedResponsePacket,
-                        get_extended_status, get_service_status)
+                        NOPResponsePacket, get_extended_status, get_service_status)
 
 from .requests import (RequestPacket, SendUnitDataRequestPacket, SendRRDataRequestPacket, ListIdentityRequestPacket,
                        RegisterSessionRequestPacket, UnRegisterSessionRequestPacket, ReadTagServiceRequestPacket,
                        MultiServiceRequestPacket, ReadTagFragmentedServiceRequestPacket, WriteTagServiceRequestPacket,
                        WriteTagFragmentedServiceRequestPacket, GenericConnectedRequestPacket, GenericUnconnectedRequestPacket,
-                       request_path)
+                       NOPRequestPacket, request_path)
 
 from collections import defaultdict
 
@@ -53,6 +53,7 @@ REQUEST_MAP = defaultdict(RequestPacket,
     'send_rr_data': SendRRDataRequestPacket,
     'register_session': RegisterSessionRequestPacket,
     'unregister_session': UnRegisterSessionRequestPacket,
+    'nop': NOPRequestPacket,
     'list_identity': ListIdentityRequestPacket,
     'read_tag': ReadTagServiceRequestPacket,
     'multi_request': MultiServiceRequestPacket,
@@ -22,21 +22,29 @@
 # SOFTWARE.
 #
 
+import itertools
 import logging
-from typing import Union
+from typing import Union, Generator, Any, Optional
 from reprlib import repr as _r
+from struct import Struct
 
 from . import Packet, DataFormatType
 from . import (ResponsePacket, SendUnitDataResponsePacket, ReadTagServiceResponsePacket, RegisterSessionResponsePacket,
-               UnRegisterSessionResponsePacket, ListIdentityResponsePacket, SendRRDataResponsePacket,
+               UnRegisterSessionResponsePacket, NOPResponsePacket, ListIdentityResponsePacket, SendRRDataResponsePacket,
                MultiServiceResponsePacket, ReadTagFragmentedServiceResponsePacket, WriteTagServiceResponsePacket,
                WriteTagFragmentedServiceResponsePacket, GenericUnconnectedResponsePacket,
                GenericConnectedResponsePacket)
+from .responses import _ARRAY_FORMATS
+from .. import util
 from ..exceptions import CommError, RequestError
 from ..bytes_ import Pack, print_bytes_msg
+from ..socket_ import check_timeout
 from ..const import (EncapsulationCommand, INSUFFICIENT_PACKETS, DataItem, AddressItem, EXTENDED_SYMBOL, ELEMENT_TYPE,
                      TagService, CLASS_TYPE, INSTANCE_TYPE, DataType, DataTypeSize, ConnectionManagerService,
-                     ClassCode, CommonService, STRUCTURE_READ_REPLY, PRIORITY, TIMEOUT_TICKS, ATTRIBUTE_TYPE)
+                     ClassCode, CommonService, STRUCTURE_READ_REPLY, PRIORITY, TIMEOUT_TICKS, ATTRIBUTE_TYPE,
+                     STRUCT_CODEC_CACHE_SIZE)
+
+_PIPELINE_CONTEXTS = itertools.count()  # unique sender contexts for pipelined unconnected requests
 
 
 class RequestPacket(Packet):
@@ -49,6 +57,7 @@ class RequestPacket(Packet):
     _response_args = ()
     _response_kwargs = {}
     type_ = None
+    can_pipeline = False  # True if the request can be sent while other requests are still waiting for a reply
     VERBOSE_DEBUG = False
 
     def __init__(self, plc):
@@ -56,6 +65,19 @@ class RequestPacket(Packet):
         self._msg = []  # message data
         self._plc = plc
         self.error = None
+        self.context = None  # sender context, the driver's is used if None
+        self._reply_timeout = None
+
+    @property
+    def timeout(self) -> Optional[float]:
+        """
+        Seconds to wait for each reply, the driver's timeout is used if ``None``
+        """
+        return self._reply_timeout
+
+    @timeout.setter
+    def timeout(self, value: Optional[float]):
+        self._reply_timeout = None if value is None else check_timeout(value)
 
     def add(self, *value: bytes):
         self._msg.extend(value)
@@ -83,7 +105,7 @@ class RequestPacket(Packet):
                 Pack.uint(length),  # Length UINT
                 Pack.udint(self._plc._session),  # Session Handle UDINT
                 b'\x00\x00\x00\x00',  # Status UDINT
-                self._plc._cfg['context'],  # Sender Context 8 bytes
+                self.context or self._plc._cfg['context'],  # Sender Context 8 bytes
                 Pack.udint(self._plc._cfg['option']),  # Option UDINT
             ])
 
@@ -112,7 +134,7 @@ class RequestPacket(Packet):
         try:
             if self.VERBOSE_DEBUG:
                 self.__log.debug(print_bytes_msg(message, '>>> SEND >>>'))
-            self._plc._sock.send(message)
+            self._plc._sock.send(message, self.timeout)
         except Exception as err:
             raise CommError('failed to send message') from err
 
@@ -122,7 +144,7 @@ class RequestPacket(Packet):
         :return: reply data
         """
         try:
-            reply = self._plc._sock.receive()
+            reply = self._plc._sock.receive(self.timeout)
         except Exception as err:
             raise CommError('failed to receive reply') from err
         else:
@@ -130,12 +152,67 @@ class RequestPacket(Packet):
                 self.__log.debug(print_bytes_msg(reply, '<<< RECEIVE <<<'))
             return reply
 
-    def send(self) -> ResponsePacket:
+    def _pipeline_key(self):
+        """
+        Returns the key identifying the reply to this request when sent pipelined, the same key is read from the reply
+        by ``CIPDriver._receive_pipelined``.  ``None`` if the reply cannot be identified, so the request cannot be
+        pipelined.
+        """
+        return None
+
+    def _send_error(self) -> Optional[str]:
+        """
+        Returns the error preventing the request from being sent, if any.  Instead of sending the request,
+        :meth:`send` returns a response with the error.
+        """
+        return self.error
+
+    def _send_request(self):
+        """
+        Sends the request without waiting for the reply
+        """
+        self._send(self._build_request())
+        self.__log.debug(f'Sent: {self!r}')
+
+    def _make_response(self, reply) -> ResponsePacket:
+        """
+        Creates the response packet for the reply to this request
+        """
+        return self._response_class(reply, *self._response_args, **self._response_kwargs)
+
+    def _messages(self) -> Generator[bytes, bytes, ResponsePacket]:
+        """
+        Generator for the messages needed to complete the request. Yields each message to send and is sent the reply
+        to it, returns the final response.  Allows requests needing more than one message (like fragmented services)
+        to be sent by something other than :meth:`send`.
+        """
+        reply = yield self._build_request()
+        return self._make_response(reply)
+
+    def _send_messages(self, messages: Generator[bytes, bytes, ResponsePacket]) -> ResponsePacket:
+        """
+        Sends each message from a :meth:`_messages` generator and returns the final response
+        """
+        try:
+            message = next(messages)
+            while True:
+                self._send(message)
+                message = messages.send(self._receive())
+        except StopIteration as stop:
+            return stop.value
+
+    def send(self, timeout: Optional[float] = None) -> ResponsePacket:
+        """
+        Sends the request and returns the response
+
+        :param timeout: seconds to wait for each reply, overrides the driver's timeout for this request
+        """
+        if timeout is not None:
+            self.timeout = timeout
         if not self.error:
-            self._send(self._build_request())
-            self.__log.debug(f'Sent: {self!r}')
+            self._send_request()
             reply = self._receive()
-            response = self._response_class(reply, *self._response_args, **self._response_kwargs)
+            response = self._make_response(reply)
         else:
             response = self._response_class(*self._response_args, **self._response_kwargs)
             response._error = self.error
@@ -157,12 +234,53 @@ class SendUnitDataRequestPacket(RequestPacket):
 
     def __init__(self, plc):
         super().__init__(plc)
-        self._msg = [Pack.uint(plc._sequence), ]
+        self.sequence = plc._sequence
+        self._msg = [Pack.uint(self.sequence), ]
+        self._prepared = None
+
+    def _build_request(self):
+        if self._prepared is not None:
+            return self._prepared
+        return super()._build_request()
+
+    def _prepare(self):
+        """
+        Builds the message once so the request can be sent again, after being prepared the message is not rebuilt
+        and only the session, connection id, and sequence are updated by :meth:`_renew`.
+        """
+        self._prepared = None
+        self._prepared = bytearray(self._build_request())
+
+    def _pipeline_key(self):
+        return self.sequence
+
+    def _use_connection(self, plc):
+        """
+        Moves the request to another connection to the same target, the request is sent using the socket,
+        session, connection id, and sequence of that connection instead
+        """
+        self._plc = plc
+        if self._prepared is not None:
+            self._renew()
+        else:
+            self.sequence = plc._sequence
+            self._msg[0] = Pack.uint(self.sequence)
+
+    def _renew(self):
+        """
+        Updates a prepared message with a new sequence number and the current session and connection id
+        """
+        self.sequence = self._plc._sequence
+        self._msg[0] = Pack.uint(self.sequence)
+        self._prepared[4:8] = Pack.udint(self._plc._session)
+        self._prepared[36:40] = self._plc._target_cid
+        self._prepared[44:46] = self._msg[0]
 
 
 class ReadTagServiceRequestPacket(SendUnitDataRequestPacket):
     __log = logging.getLogger(f'{__module__}.{__qualname__}')
     type_ = 'read'
+    can_pipeline = True
     _response_class = ReadTagServiceResponsePacket
 
     def __init__(self, plc):
@@ -175,7 +293,7 @@ class ReadTagServiceRequestPacket(SendUnitDataRequestPacket):
         self.tag = tag
         self.elements = elements
         self.tag_info = tag_info
-        request_path = _create_tag_rp(self.tag, self._plc.tags, self._plc.use_instance_ids)
+        request_path = self._plc._tag_request_path(self.tag)
         if request_path is None:
             self.error = 'Invalid Tag Request Path'
 
@@ -185,12 +303,17 @@ class ReadTagServiceRequestPacket(SendUnitDataRequestPacket):
             Pack.uint(self.elements),
         )
 
-    def send(self):
+    def _make_response(self, reply):
+        return ReadTagServiceResponsePacket(reply, elements=self.elements, tag_info=self.tag_info, tag=self.tag,
+                                            numpy_arrays=self._plc._cfg.get('numpy_arrays', False))
+
+    def send(self, timeout: Optional[float] = None):
+        if timeout is not None:
+            self.timeout = timeout
         if not self.error:
-            self._send(self._build_request())
-            self.__log.debug(f'Sent: {self!r}')
+            self._send_request()
             reply = self._receive()
-            response = ReadTagServiceResponsePacket(reply, elements=self.elements, tag_info=self.tag_info, tag=self.tag)
+            response = self._make_response(reply)
         else:
             response = ReadTagServiceResponsePacket(tag=self.tag)
             response._error = self.error
@@ -217,11 +340,16 @@ class ReadTagFragmentedServiceRequestPacket(SendUnitDataRequestPacket):
         self.tag = tag
         self.elements = elements
         self.tag_info = tag_info
-        self.request_path = _create_tag_rp(self.tag, self._plc.tags, self._plc.use_instance_ids)
+        self.request_path = self._plc._tag_request_path(self.tag)
         if self.request_path is None:
             self.error = 'Invalid Tag Request Path'
 
-    def send(self):
+    def send(self, timeout: Optional[float] = None):
+        if timeout is not None:
+            self.timeout = timeout
+        return self._send_messages(self._messages())
+
+    def _messages(self):
         if not self.error:
             offset = 0
             responses = []
@@ -230,10 +358,10 @@ class ReadTagFragmentedServiceRequestPacket(SendUnitDataRequestPacket):
                                  self.request_path,
                                  Pack.uint(self.elements),
                                  Pack.dint(offset)])
-                self._send(self._build_request())
                 self.__log.debug(f'Sent: {self!r} (offset={offset})')
-                reply = self._receive()
-                response = ReadTagFragmentedServiceResponsePacket(reply, self.tag_info, self.elements)
+                reply = yield self._build_request()
+                response = ReadTagFragmentedServiceResponsePacket(reply, self.tag_info, self.elements,
+                                                                  numpy_arrays=self._plc._cfg.get('numpy_arrays', False))
                 self.__log.debug(f'Received: {response!r}')
                 responses.append(response)
                 if response.service_status == INSUFFICIENT_PACKETS:
@@ -260,6 +388,7 @@ class ReadTagFragmentedServiceRequestPacket(SendUnitDataRequestPacket):
 class WriteTagServiceRequestPacket(SendUnitDataRequestPacket):
     __log = logging.getLogger(f'{__module__}.{__qualname__}')
     type_ = 'write'
+    can_pipeline = True
     _response_class = WriteTagServiceResponsePacket
 
     def __init__(self, plc):
@@ -275,7 +404,7 @@ class WriteTagServiceRequestPacket(SendUnitDataRequestPacket):
         self.elements = elements
         self.tag_info = tag_info
         self.value = value
-        request_path = _create_tag_rp(self.tag, self._plc.tags, self._plc.use_instance_ids)
+        request_path = self._plc._tag_request_path(self.tag)
         if request_path is None:
             self.error = 'Invalid Tag Request Path'
             
@@ -316,21 +445,26 @@ class WriteTagFragmentedServiceRequestPacket(SendUnitDataRequestPacket):
                 self._packed_type = STRUCTURE_READ_REPLY + Pack.uint(tag_info['data_type']['template']['structure_handle'])
                 self.data_type = tag_info['data_type']['name']
             else:
-                self._packed_type = Pack.uint(DataType[self.data_type])
                 self.data_type = tag_info['data_type']
+                self._packed_type = Pack.uint(DataType[self.data_type])
 
             self.tag = tag
             self.value = value
             self.elements = elements
             self.tag_info = tag_info
-            self.request_path = _create_tag_rp(self.tag, self._plc.tags, self._plc.use_instance_ids)
+            self.request_path = self._plc._tag_request_path(self.tag)
             if self.request_path is None:
                 self.error = 'Invalid Tag Request Path'
         except Exception as err:
             self.__log.exception('Failed adding request')
             self.error = err
 
-    def send(self):
+    def send(self, timeout: Optional[float] = None):
+        if timeout is not None:
+            self.timeout = timeout
+        return self._send_messages(self._messages())
+
+    def _messages(self):
         if not self.error:
             responses = []
             segment_size = self._plc.connection_size - (len(self.request_path) + len(self._packed_type)
@@ -354,9 +488,8 @@ class WriteTagFragmentedServiceRequestPacket(SendUnitDataRequestPacket):
                     segment_bytes
                 ))
 
-                self._send(self._build_request())
                 self.__log.debug(f'Sent: {self!r} (part={i} offset={offset})')
-                reply = self._receive()
+                reply = yield self._build_request()
                 response = WriteTagFragmentedServiceResponsePacket(reply)
                 self.__log.debug(f'Received: {response!r}')
                 responses.append(response)
@@ -377,6 +510,7 @@ class WriteTagFragmentedServiceRequestPacket(SendUnitDataRequestPacket):
 class MultiServiceRequestPacket(SendUnitDataRequestPacket):
     __log = logging.getLogger(f'{__module__}.{__qualname__}')
     type_ = 'multi'
+    can_pipeline = True
     _response_class = MultiServiceResponsePacket
 
     def __init__(self, plc):
@@ -391,10 +525,13 @@ class MultiServiceRequestPacket(SendUnitDataRequestPacket):
             b'\x01',  # Instance 1
         ))
         self._message = None
+        self._message_size = sum(len(x) for x in self._msg) + 2  # + 2 for number of services
         self._msg_errors = None
 
     @property
     def message(self) -> bytes:
+        if self._message is None:
+            self._message = self.build_message(self.tags)
         return self._message
 
     def build_message(self, tags):
@@ -412,28 +549,23 @@ class MultiServiceRequestPacket(SendUnitDataRequestPacket):
             offset += len(rp)
 
         msg = self._msg + [Pack.uint(len(rp_list))] + offsets + rp_list
+        self._msg_errors = errors
         return b''.join(msg)
 
     def add_read(self, tag, elements=1, tag_info=None):
 
-        request_path = _create_tag_rp(tag, self._plc.tags, self._plc.use_instance_ids)
+        request_path = self._plc._tag_request_path(tag)
         if request_path is not None:
 
             request_path = TagService.read_tag + request_path + Pack.uint(elements)
             _tag = {'tag': tag, 'elements': elements, 'tag_info': tag_info, 'rp': request_path, 'service': 'read'}
-            message = self.build_message(self.tags + [_tag])
-            if len(message) < self._plc.connection_size:
-                self._message = message
-                self.tags.append(_tag)
-                return True
-            else:
-                return False
+            return self._add_service(_tag)
         else:
             self.__log.error(f'Failed to create request path for {tag}')
             raise RequestError('Failed to create request path')
 
     def add_write(self, tag, value, elements=1, tag_info=None, bits_write=None):
-        request_path = _create_tag_rp(tag, self._plc.tags, self._plc.use_instance_ids)
+        request_path = self._plc._tag_request_path(tag)
         if request_path is not None:
             if bits_write:
                 data_type = tag_info['data_type']
@@ -443,29 +575,57 @@ class MultiServiceRequestPacket(SendUnitDataRequestPacket):
 
             _tag = {'tag': tag, 'elements': elements, 'tag_info': tag_info, 'rp': request_path, 'service': 'write',
                     'value': value, 'data_type': data_type}
-
-            message = self.build_message(self.tags + [_tag])
-            if len(message) < self._plc.connection_size:
-                self._message = message
-                self.tags.append(_tag)
-                return True
-            else:
-                return False
-
+            return self._add_service(_tag)
         else:
             self.__log.error(f'Failed to create request path for {tag}')
             raise RequestError('Failed to create request path')
 
-    def send(self):
-        if not self._msg_errors:
-            request = self._build_request()
-            self._send(request)
-            self.__log.debug(f'Sent: {self!r}')
+    def add_service(self, service: bytes, request_path: bytes, request_data: bytes = b'', name: Any = 'generic'):
+        """
+        Adds a generic service, the reply data is not parsed and is returned as bytes in the ``value``
+        """
+        _tag = {'tag': name, 'elements': 1, 'tag_info': None, 'rp': service + request_path + request_data,
+                'service': 'generic'}
+        return self._add_service(_tag)
+
+    def _add_service(self, _tag):
+        """
+        Adds the service to the request if it will fit in the connection size, the size of the message is tracked
+        as services are added and the message is only built when it is sent.
+        """
+        message_size = self._message_size + len(_tag['rp']) + 2  # + 2 for the offset
+        if message_size < self._plc.connection_size:
+            self._message_size = message_size
+            self._message = None
+            self.tags.append(_tag)
+            return True
+
+        return False
+
+    def _use_connection(self, plc):
+        super()._use_connection(plc)
+        self._message = None  # the message includes the sequence of the previous connection
+
+    def _make_response(self, reply):
+        return MultiServiceResponsePacket(reply, tags=self.tags, numpy_arrays=self._plc._cfg.get('numpy_arrays', False))
+
+    def _send_error(self) -> Optional[str]:
+        if self._message is None:
+            self._message = self.build_message(self.tags)  # finds the services without a request path
+        if self._msg_errors:
+            self.error = f'Failed to create request path for: {", ".join(self._msg_errors)}'
+        return self.error
+
+    def send(self, timeout: Optional[float] = None):
+        if timeout is not None:
+            self.timeout = timeout
+        if not self._send_error():
+            self._send_request()
             reply = self._receive()
-            response = MultiServiceResponsePacket(reply, tags=self.tags)
+            response = self._make_response(reply)
         else:
-            self.error = f'Failed to create request path for: {", ".join(self._msg_errors)}'
-            response = MultiServiceResponsePacket()
+            response = MultiServiceResponsePacket(tags=[{**tag, 'service_status': None, 'error': self.error}
+                                                        for tag in self.tags])
             response._error = self.error
 
         self.__log.debug(f'Received: {response!r}')
@@ -475,8 +635,9 @@ class MultiServiceRequestPacket(SendUnitDataRequestPacket):
 def _make_write_data_tag(tag_info, value, elements, request_path, fragmented=False):
     data_type = tag_info['data_type']
     if tag_info['tag_type'] == 'struct':
-        if not isinstance(value, bytes):
-            raise RequestError('Writing UDTs only supports bytes for value')
+        if not isinstance(value, (bytes, bytearray)):
+            encoder = struct_encoder(tag_info['data_type'])
+            value = encoder.encode_array(value) if elements > 1 else encoder.encode(value)
         _dt_value = b'\xA0\x02' + Pack.uint(tag_info['data_type']['template']['structure_handle'])
         data_type = tag_info['data_type']['name']
 
@@ -495,6 +656,151 @@ def _make_write_data_tag(tag_info, value, elements, request_path, fragmented=Fal
     return request_path, data_type
 
 
+class StructEncoder:
+    """
+    Encodes the value for a structure to its raw data.  The value may be a dict of ``{attribute: value}``, a
+    sequence of the attribute values in order, or a ``str`` for string types.  Attributes missing from the value are
+    written as 0.  Encoders are compiled once from the template of the data type, all the atomic members are
+    packed using a single ``struct.Struct`` and only the BOOL, DWORD, string, and nested structure members need
+    extra steps.
+    """
+    __slots__ = ('data_type', 'size', '_struct', '_packed', '_fields', '_string_len', '_attributes')
+
+    def __init__(self, data_type: dict):
+        self.data_type = data_type
+        self.size = data_type['template']['structure_size']
+        self._string_len = data_type.get('string')
+        self._attributes = data_type['attributes']
+        self._packed = []  # (name, array count or None) in the order packed by _struct
+        self._fields = []  # (name, function to pack the member into the buffer) for all the other members
+
+        fmt, end = ['<'], 0
+        members = ((name, data_type['internal_tags'][name]) for name in data_type['attributes'])
+        for name, member in sorted(members, key=lambda m: m[1]['offset']):
+            datatype, offset = member['data_type'], member['offset']
+            if member['tag_type'] != 'atomic' or datatype in ('BOOL', 'DWORD') or offset < end:
+                self._fields.append((name, _member_packer(member)))
+                continue
+            count = member.get('array') or 1
+            if offset > end:
+                fmt.append(f'{offset - end}x')
+            fmt.append(f'{count}{_ARRAY_FORMATS[datatype]}')
+            self._packed.append((name, member.get('array')))
+            end = offset + count * DataTypeSize[datatype]
+
+        self._struct = Struct(''.join(fmt))
+
+    def encode(self, value) -> bytes:
+        buffer = bytearray(self.size)
+        self.encode_into(buffer, 0, value)
+        return bytes(buffer)
+
+    def encode_array(self, values) -> bytes:
+        buffer = bytearray(self.size * len(values))
+        for i, value in enumerate(values):
+            self.encode_into(buffer, i * self.size, value)
+        return bytes(buffer)
+
+    def encode_into(self, buffer: bytearray, offset: int, value):
+        """
+        Encodes the value into ``buffer`` at ``offset``, the buffer must be zeroed
+        """
+        if self._string_len:
+            return _pack_string_into(buffer, offset, value, self._string_len)
+
+        if isinstance(value, dict):
+            unknown = [name for name in value if name not in self.data_type['internal_tags']]
+            if unknown:
+                raise RequestError(f'{self.data_type["name"]} has no attribute(s): {", ".join(unknown)}')
+            values = value
+        else:
+            values = dict(zip(self._attributes, value))
+
+        args = []
+        for name, array in self._packed:
+            if array:
+                args.extend(_array_values(values.get(name), array))
+            else:
+                args.append(values.get(name, 0))
+        self._struct.pack_into(buffer, offset, *args)
+
+        for name, pack_into in self._fields:
+            member_value = values.get(name)
+            if member_value is not None:
+                pack_into(buffer, offset, member_value)
+
+
+def _array_values(value, count):
+    if value is None:
+        return (0, ) * count
+    if len(value) < count:
+        raise RequestError(f'Insufficient data for array, expected {count} and got {len(value)}')
+    return value[:count]
+
+
+def _member_packer(member):
+    datatype, member_offset, array = member['data_type'], member['offset'], member.get('array')
+
+    if member['tag_type'] == 'struct':
+        encoder = struct_encoder(datatype)
+        if array:
+            def _pack_struct_array(buffer, offset, value):
+                for i, element in enumerate(_array_values(value, array)):
+                    encoder.encode_into(buffer, offset + member_offset + i * encoder.size, element)
+            return _pack_struct_array
+
+        return lambda buffer, offset, value: encoder.encode_into(buffer, offset + member_offset, value)
+
+    if datatype == 'BOOL' and not array:
+        mask = 1 << member.get('bit', 0)
+
+        def _pack_bit(buffer, offset, value):
+            if value:
+                buffer[offset + member_offset] |= mask
+            else:
+                buffer[offset + member_offset] &= ~mask & 0xFF
+        return _pack_bit
+
+    count = array or 1
+    member_struct = Struct(f'<{count}{_ARRAY_FORMATS[datatype]}')
+    if datatype == 'DWORD':
+        def _pack_dwords(buffer, offset, value):
+            values = [value] if not array and not isinstance(value, (list, tuple)) else value
+            if len(values) == count * 32 and all(isinstance(v, bool) for v in values):  # bools, as they are read
+                values = [sum(1 << bit for bit in range(32) if values[i + bit]) for i in range(0, len(values), 32)]
+            member_struct.pack_into(buffer, offset + member_offset, *_array_values(values, count))
+        return _pack_dwords
+
+    # atomic member overlapping a previous member, packed by itself
+    if array:
+        return lambda buffer, offset, value: member_struct.pack_into(buffer, offset + member_offset,
+                                                                     *_array_values(value, array))
+    return lambda buffer, offset, value: member_struct.pack_into(buffer, offset + member_offset, value)
+
+
+def _pack_string_into(buffer, offset, value, string_len):
+    try:
+        data = value[:string_len].encode('latin-1')
+    except Exception as err:
+        raise RequestError('Failed to pack string') from err
+    buffer[offset:offset + 4] = Pack.dint(len(data))
+    buffer[offset + 4:offset + 4 + len(data)] = data
+
+
+_STRUCT_ENCODERS = util.LRUCache(STRUCT_CODEC_CACHE_SIZE)
+
+
+def struct_encoder(data_type: dict) -> StructEncoder:
+    """
+    Returns the encoder for a structure data type, compiled the first time it is used.
+    """
+    encoder = _STRUCT_ENCODERS.get(id(data_type))
+    if encoder is None or encoder.data_type is not data_type:  # ids may be reused after the data type is deleted
+        encoder = StructEncoder(data_type)
+        _STRUCT_ENCODERS.set(id(data_type), encoder)
+    return encoder
+
+
 def _make_write_data_bit(tag_info, value, request_path):
     mask_size = DataTypeSize.get(tag_info['data_type'])
     if mask_size is None:
@@ -520,6 +826,11 @@ class SendRRDataRequestPacket(RequestPacket):
     def _build_common_packet_format(self, addr_data=None) -> bytes:
         return super()._build_common_packet_format(addr_data=None)
 
+    def _pipeline_key(self):
+        if self.context is None:
+            self.context = Pack.ulint(next(_PIPELINE_CONTEXTS))
+        return self.context
+
 
 class RegisterSessionRequestPacket(RequestPacket):
     __log = logging.getLogger(f'{__module__}.{__qualname__}')
@@ -542,6 +853,21 @@ class UnRegisterSessionRequestPacket(RequestPacket):
         return b''
 
 
+class NOPRequestPacket(RequestPacket):
+    """
+    Encapsulation NOP, the target does not reply to it.  Used to check a connection is still alive.
+    """
+    __log = logging.getLogger(f'{__module__}.{__qualname__}')
+    _encap_command = EncapsulationCommand.nop
+    _response_class = NOPResponsePacket
+
+    def _build_common_packet_format(self, addr_data=None) -> bytes:
+        return b''
+
+    def _receive(self):
+        return b''
+
+
 class ListIdentityRequestPacket(RequestPacket):
     __log = logging.getLogger(f'{__module__}.{__qualname__}')
     _encap_command = EncapsulationCommand.list_identity
@@ -650,6 +976,7 @@ class GenericConnectedRequestPacket(SendUnitDataRequestPacket):
 class GenericUnconnectedRequestPacket(SendRRDataRequestPacket):
     __log = logging.getLogger(f'{__module__}.{__qualname__}')
     _response_class = GenericUnconnectedResponsePacket
+    can_pipeline = True
 
     def __init__(self, plc):
         super().__init__(plc)
@@ -667,7 +994,8 @@ class GenericUnconnectedRequestPacket(SendRRDataRequestPacket):
               request_data: bytes = b'',
               route_path: bytes = b'',
               unconnected_send: bool = False,
-              data_format: DataFormatType = None):
+              data_format: DataFormatType = None,
+              unconnected_send_timeout: Optional[float] = None):
         self._response_kwargs = {'data_format': data_format}
         self.class_code = class_code
         self.instance = instance
@@ -677,20 +1005,20 @@ class GenericUnconnectedRequestPacket(SendRRDataRequestPacket):
         req_path = request_path(class_code, instance, attribute)
 
         if unconnected_send:
-            self.add(wrap_unconnected_send(b''.join((service, req_path, request_data)), route_path))
+            self.add(wrap_unconnected_send(b''.join((service, req_path, request_data)), route_path,
+                                           unconnected_send_timeout))
         else:
             self.add(service, req_path, request_data, route_path)
 
 
-def wrap_unconnected_send(message, route_path):
+def wrap_unconnected_send(message, route_path, timeout: Optional[float] = None):
     rp = request_path(class_code=ClassCode.connection_manager, instance=b'\x01')
     msg_len = len(message)
     return b''.join(
         [
             ConnectionManagerService.unconnected_send,
             rp,
-            PRIORITY,
-            TIMEOUT_TICKS,
+            PRIORITY + TIMEOUT_TICKS if timeout is None else unconnected_send_timeout(timeout),
             Pack.uint(msg_len),
             message,
             b'\x00' if msg_len % 2 else b'',
@@ -699,6 +1027,20 @@ def wrap_unconnected_send(message, route_path):
     )
 
 
+def unconnected_send_timeout(timeout: float) -> bytes:
+    """
+    Encodes a timeout (seconds) as the priority/time tick and timeout ticks of an Unconnected Send,
+    the timeout is ``2 ** time_tick * ticks`` ms, so the smallest time tick that fits is used.
+    """
+    ms = max(1, round(timeout * 1000))
+    for time_tick in range(16):
+        ticks = -(-ms // (1 << time_tick))
+        if ticks <= 0xFF:
+            return Pack.usint(time_tick) + Pack.usint(ticks)
+
+    raise RequestError(f'Unconnected Send timeout too large: {timeout}s')
+
+
 def request_path(class_code: Union[int, bytes], instance: Union[int, bytes],
                  attribute: Union[int, bytes] = b'', data: bytes = b''):
 
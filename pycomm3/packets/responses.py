@@ -24,12 +24,18 @@
 import logging
 from itertools import tee, zip_longest, chain
 from reprlib import repr as _r
+from struct import unpack_from, Struct
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 from . import Packet, DataFormatType
 from .. import util
-from ..bytes_ import Unpack
+from ..bytes_ import Pack, Unpack
 from ..const import (SUCCESS, INSUFFICIENT_PACKETS, TagService, SERVICE_STATUS, EXTEND_CODES, MULTI_PACKET_SERVICES,
-                     DataType, STRUCTURE_READ_REPLY, DataTypeSize, StringTypeLenSize)
+                     DataType, STRUCTURE_READ_REPLY, DataTypeSize, StringTypeLenSize, STRUCT_CODEC_CACHE_SIZE)
 
 
 class ResponsePacket(Packet):
@@ -79,7 +85,7 @@ class ResponsePacket(Packet):
             if self.raw is None:
                 self._error = 'No Reply From PLC'
             else:
-                self.command = self.raw[:2]
+                self.command = bytes(self.raw[:2])
                 self.command_status = Unpack.dint(self.raw[8:12])  # encapsulation status check
         except Exception as err:
             self._error = f'Failed to parse reply - {err}'
@@ -166,7 +172,7 @@ class GenericConnectedResponsePacket(SendUnitDataResponsePacket):
         super()._parse_reply()
 
         if self.data_format is None:
-            self.value = self.data
+            self.value = bytes(self.data) if self.data is not None else None
         elif self.is_valid():
             try:
                 self.value = _parse_data(self.data, self.data_format)
@@ -187,7 +193,7 @@ class GenericUnconnectedResponsePacket(SendRRDataResponsePacket):
         super()._parse_reply()
 
         if self.data_format is None:
-            self.value = self.data
+            self.value = bytes(self.data) if self.data is not None else None
         elif self.is_valid():
             try:
                 self.value = _parse_data(self.data, self.data_format)
@@ -201,7 +207,7 @@ def _parse_data(data, fmt):
     start = 0
     for name, typ in fmt:
         if isinstance(typ, int):
-            value = data[start: start + typ]
+            value = bytes(data[start: start + typ])
             start += typ
         else:
             typ, cnt = util.get_array_index(typ)
@@ -230,19 +236,22 @@ def _parse_data(data, fmt):
 class ReadTagServiceResponsePacket(SendUnitDataResponsePacket):
     __log = logging.getLogger(f'{__module__}.{__qualname__}')
 
-    def __init__(self, raw_data: bytes = None, tag_info=None, elements=1, tag=None, *args,  **kwargs):
+    def __init__(self, raw_data: bytes = None, tag_info=None, elements=1, tag=None, *args,
+                 numpy_arrays: bool = False, **kwargs):
         self.value = None
         self.elements = elements
         self.data_type = None
         self.tag_info = tag_info
         self.tag = tag
+        self.numpy_arrays = numpy_arrays
         super().__init__(raw_data, *args, **kwargs)
 
     def _parse_reply(self):
         try:
             super()._parse_reply()
             if self.is_valid():
-                self.value, self.data_type = parse_read_reply(self.data, self.tag_info, self.elements)
+                self.value, self.data_type = parse_read_reply(self.data, self.tag_info, self.elements,
+                                                              self.numpy_arrays)
             else:
                 self.value, self.data_type = None, None
         except Exception as err:
@@ -257,28 +266,30 @@ class ReadTagServiceResponsePacket(SendUnitDataResponsePacket):
 class ReadTagFragmentedServiceResponsePacket(SendUnitDataResponsePacket):
     __log = logging.getLogger(f'{__module__}.{__qualname__}')
 
-    def __init__(self, raw_data: bytes = None, tag_info=None, elements=1, *args,  **kwargs):
+    def __init__(self, raw_data: bytes = None, tag_info=None, elements=1, *args,
+                 numpy_arrays: bool = False, **kwargs):
         self.value = None
         self.elements = elements
         self.data_type = None
         self.tag_info = tag_info
         self.bytes_ = None
+        self.numpy_arrays = numpy_arrays
         super().__init__(raw_data, *args, **kwargs)
 
     def _parse_reply(self):
         super()._parse_reply()
         if self.data[:2] == STRUCTURE_READ_REPLY:
             self.bytes_ = self.data[4:]
-            self._data_type = self.data[:4]
+            self._data_type = bytes(self.data[:4])
         else:
             self.bytes_ = self.data[2:]
-            self._data_type = self.data[:2]
+            self._data_type = bytes(self.data[:2])
 
     def parse_bytes(self):
         try:
             if self.is_valid():
                 self.value, self.data_type = parse_read_reply(self._data_type + self.bytes_,
-                                                          self.tag_info, self.elements)
+                                                              self.tag_info, self.elements, self.numpy_arrays)
             else:
                 self.value, self.data_type = None, None
         except Exception as err:
@@ -305,9 +316,10 @@ class WriteTagFragmentedServiceResponsePacket(SendUnitDataResponsePacket):
 class MultiServiceResponsePacket(SendUnitDataResponsePacket):
     __log = logging.getLogger(f'{__module__}.{__qualname__}')
 
-    def __init__(self, raw_data: bytes = None, tags=None, *args, **kwargs):
+    def __init__(self, raw_data: bytes = None, tags=None, *args, numpy_arrays: bool = False, **kwargs):
         self.tags = tags
         self.values = None
+        self.numpy_arrays = numpy_arrays
         self.request_statuses = None
         super().__init__(raw_data, *args, **kwargs)
 
@@ -330,13 +342,16 @@ class MultiServiceResponsePacket(SendUnitDataResponsePacket):
 
             if TagService.get(TagService.from_reply(service)) == TagService.read_tag:
                 if service_status == SUCCESS:
-                    value, dt = parse_read_reply(data[4:], tag['tag_info'], tag['elements'])
+                    value, dt = parse_read_reply(data[4:], tag['tag_info'], tag['elements'], self.numpy_arrays)
                 else:
                     value, dt = None, None
 
                 values.append(value)
                 tag['value'] = value
                 tag['data_type'] = dt
+            elif tag.get('service') == 'generic' and service_status == SUCCESS:
+                tag['value'] = data[4 + data[3] * 2:]  # skip the extended status
+                tag['data_type'] = None
             else:
                 tag['value'] = None
                 tag['data_type'] = None
@@ -384,6 +399,13 @@ class UnRegisterSessionResponsePacket(ResponsePacket):
         return 'UnRegisterSessionResponsePacket()'
 
 
+class NOPResponsePacket(UnRegisterSessionResponsePacket):
+    __log = logging.getLogger(f'{__module__}.{__qualname__}')
+
+    def __repr__(self):
+        return 'NOPResponsePacket()'
+
+
 class ListIdentityResponsePacket(ResponsePacket):
     __log = logging.getLogger(f'{__module__}.{__qualname__}')
     _data_format = (
@@ -392,6 +414,7 @@ class ListIdentityResponsePacket(ResponsePacket):
         ('encap_protocol_version', 'UINT'),
         ('_socket_address_struct', 16),
         ('vendor_id', 'UINT'),
+        ('device_type', 'UINT'),
         ('product_code', 'UINT'),
         ('revision_major', 'USINT'),
         ('revision_minor', 'USINT'),
@@ -408,7 +431,7 @@ class ListIdentityResponsePacket(ResponsePacket):
     def _parse_reply(self):
         try:
             super()._parse_reply()
-            self.data = self.raw[28:]
+            self.data = self.raw[26:]
             self.identity = _parse_data(self.data, self._data_format)
         except Exception as err:
             self.__log.exception('Failed to parse response')
@@ -424,26 +447,23 @@ class ListIdentityResponsePacket(ResponsePacket):
         return f'{self.__class__.__name__}(identity={self.identity!r}, error={self.error!r})'
 
 
-def parse_read_reply(data, data_type, elements):
+def parse_read_reply(data, data_type, elements, numpy_arrays=False):
     if data[:2] == STRUCTURE_READ_REPLY:
         data = data[4:]
-        size = data_type['data_type']['template']['structure_size']
+        decoder = struct_decoder(data_type['data_type'])
         dt_name = data_type['data_type']['name']
         if elements > 1:
-            value = [parse_read_reply_struct(data[i: i + size], data_type['data_type'])
-                     for i in range(0, len(data), size)]
+            value = decoder.decode_array(data)
         else:
-            value = parse_read_reply_struct(data, data_type['data_type'])
+            value = decoder(data)
     else:
         datatype = DataType[Unpack.uint(data[:2])]
         dt_name = datatype
         if elements > 1:
-            func = Unpack[datatype]
-            size = DataTypeSize[datatype]
-            data = data[2:]
-            value = [func(data[i:i + size]) for i in range(0, len(data), size)]
-            if datatype == 'DWORD':
-                value = list(chain.from_iterable(dword_to_bool_array(val) for val in value))
+            if numpy_arrays:
+                value = unpack_ndarray(datatype, data[2:])
+            else:
+                value = unpack_array(datatype, data[2:])
         else:
             value = Unpack[datatype](data[2:])
             if datatype == 'DWORD':
@@ -458,50 +478,7 @@ def parse_read_reply(data, data_type, elements):
 
 
 def parse_read_reply_struct(data, data_type):
-    values = {}
-
-    if data_type.get('string'):
-        return parse_string(data)
-
-    for tag, type_def in data_type['internal_tags'].items():
-        datatype = type_def['data_type']
-        array = type_def.get('array')
-        offset = type_def['offset']
-        if type_def['tag_type'] == 'atomic':
-            dt_len = DataTypeSize[datatype]
-            func = Unpack[datatype]
-            if array:
-                ary_data = data[offset:offset + (dt_len * array)]
-                value = [func(ary_data[i:i + dt_len]) for i in range(0, array * dt_len, dt_len)]
-                if datatype == 'DWORD':
-                    value = list(chain.from_iterable(dword_to_bool_array(val) for val in value))
-            else:
-                if datatype == 'BOOL':
-                    bit = type_def.get('bit', 0)
-                    value = bool(data[offset] & (1 << bit))
-                else:
-                    value = func(data[offset:offset + dt_len])
-                    if datatype == 'DWORD':
-                        value = dword_to_bool_array(value)
-
-            values[tag] = value
-        elif datatype.get('string'):
-            str_size = datatype['template']['structure_size']
-            if array:
-                array_data = data[offset:offset + (str_size * array)]
-                values[tag] = [parse_string(array_data[i:i+str_size]) for i in range(0, len(array_data), str_size)]
-            else:
-                values[tag] = parse_string(data[offset:offset + str_size])
-        else:
-            struct_size = datatype['template']['structure_size']
-            if array:
-                ary_data = data[offset:offset + (struct_size * array)]
-                values[tag] = [parse_read_reply_struct(ary_data[i:i + struct_size], datatype) for i in
-                               range(0, len(ary_data), struct_size)]
-            else:
-                values[tag] = parse_read_reply_struct(data[offset:offset + struct_size], datatype)
-
-    return {k: v for k, v in values.items() if k in data_type['attributes']}
+    return struct_decoder(data_type)(data)
 
 
 def parse_string(data):
@@ -510,11 +487,183 @@ def parse_string(data):
     return ''.join(chr(v + 256) if v < 0 else chr(v) for v in str_data)
 
 
+_VALUE, _SLICE, _GETTER = range(3)
+
+
+class StructDecoder:
+    """
+    Decodes the raw data of a structure to a dict of its attributes.  Decoders are compiled once from the template
+    of the data type, all the atomic members are unpacked using a single ``struct.Struct`` and only the BOOL, string,
+    and nested structure members need extra steps.
+    """
+    __slots__ = ('data_type', 'size', '_struct', '_fields', '_string_size')
+
+    def __init__(self, data_type: dict):
+        self.data_type = data_type
+        self.size = data_type['template']['structure_size']
+        self._string_size = self.size if data_type.get('string') else None
+        self._fields = []
+
+        fmt, index, end = ['<'], 0, 0
+        members = ((name, data_type['internal_tags'][name]) for name in data_type['attributes'])
+        packed = {}  # name -> (start, stop) index in the unpacked values
+        for name, member in sorted(members, key=lambda m: m[1]['offset']):
+            datatype, offset = member['data_type'], member['offset']
+            if member['tag_type'] != 'atomic' or datatype in ('BOOL', 'DWORD') or offset < end:
+                continue
+            count = member.get('array') or 1
+            if offset > end:
+                fmt.append(f'{offset - end}x')
+            fmt.append(f'{count}{_ARRAY_FORMATS[datatype]}')
+            packed[name] = (index, index + count if member.get('array') else None)
+            index += count
+            end = offset + count * DataTypeSize[datatype]
+
+        self._struct = Struct(''.join(fmt))
+
+        for name in data_type['attributes']:
+            if name in packed:
+                start, stop = packed[name]
+                self._fields.append((name, _VALUE if stop is None else _SLICE, start, stop))
+            else:
+                self._fields.append((name, _GETTER, _member_getter(data_type['internal_tags'][name]), None))
+
+    def __call__(self, data: bytes, offset: int = 0):
+        if self._string_size is not None:
+            return _decode_string(data, offset, self._string_size)
+
+        values = self._struct.unpack_from(data, offset)
+        result = {}
+        for name, kind, a, b in self._fields:
+            if kind == _VALUE:
+                result[name] = values[a]
+            elif kind == _SLICE:
+                result[name] = list(values[a:b])
+            else:
+                result[name] = a(data, offset)
+        return result
+
+    def decode_array(self, data: bytes, offset: int = 0, count: int = None):
+        """
+        Decodes ``count`` structures (default all in ``data``), returns a list of the decoded values
+        """
+        if count is None:
+            count = (len(data) - offset) // self.size
+        return [self(data, offset + i * self.size) for i in range(count)]
+
+
+def _member_getter(member):
+    datatype, member_offset, array = member['data_type'], member['offset'], member.get('array')
+
+    if member['tag_type'] == 'struct':
+        decoder = struct_decoder(datatype)
+        if array:
+            return lambda data, offset: decoder.decode_array(data, offset + member_offset, array)
+        return lambda data, offset: decoder(data, offset + member_offset)
+
+    if datatype == 'BOOL' and not array:
+        mask = 1 << member.get('bit', 0)
+        return lambda data, offset: bool(data[offset + member_offset] & mask)
+
+    size = DataTypeSize[datatype] * (array or 1)
+    if datatype == 'DWORD':
+        return lambda data, offset: dwords_to_bool_array(data[offset + member_offset:offset + member_offset + size])
+
+    # atomic member overlapping a previous member, unpacked by itself
+    member_struct = Struct(f'<{array or 1}{_ARRAY_FORMATS[datatype]}')
+    if array:
+        return lambda data, offset: list(member_struct.unpack_from(data, offset + member_offset))
+    return lambda data, offset: member_struct.unpack_from(data, offset + member_offset)[0]
+
+
+def _decode_string(data, offset, size):
+    length = max(0, min(unpack_from('<i', data, offset)[0], size - 4))
+    return bytes(data[offset + 4:offset + 4 + length]).decode('latin-1')
+
+
+_STRUCT_DECODERS = util.LRUCache(STRUCT_CODEC_CACHE_SIZE)
+
+
+def struct_decoder(data_type: dict) -> StructDecoder:
+    """
+    Returns the decoder for a structure data type, compiled the first time it is used.
+    """
+    decoder = _STRUCT_DECODERS.get(id(data_type))
+    if decoder is None or decoder.data_type is not data_type:  # ids may be reused after the data type is deleted
+        decoder = StructDecoder(data_type)
+        _STRUCT_DECODERS.set(id(data_type), decoder)
+    return decoder
+
+
 def dword_to_bool_array(dword):
-    bits = [x == '1' for x in bin(dword)[2:]]
-    bools = [False for _ in range(32 - len(bits))] + bits
-    bools.reverse()
-    return bools
+    return dwords_to_bool_array(Pack.udint(dword))
+
+
+# bits of each byte value, least significant bit first
+_BYTE_BITS = [tuple(bool(byte & (1 << bit)) for bit in range(8)) for byte in range(256)]
+
+_ARRAY_FORMATS = {
+    'BOOL': '?',
+    'SINT': 'b',
+    'USINT': 'B',
+    'BYTE': 'b',
+    'INT': 'h',
+    'UINT': 'H',
+    'WORD': 'H',
+    'DINT': 'i',
+    'UDINT': 'I',
+    'DWORD': 'I',
+    'REAL': 'f',
+    'LINT': 'q',
+    'ULINT': 'Q',
+    'LWORD': 'Q',
+}
+
+_NUMPY_DTYPES = {
+    'BOOL': 'bool',
+    'SINT': 'i1',
+    'USINT': 'u1',
+    'BYTE': 'i1',
+    'INT': '<i2',
+    'UINT': '<u2',
+    'WORD': '<u2',
+    'DINT': '<i4',
+    'UDINT': '<u4',
+    'REAL': '<f4',
+    'LINT': '<i8',
+    'ULINT': '<u8',
+    'LWORD': '<u8',
+}
+
+
+def dwords_to_bool_array(data):
+    """
+    Converts the raw bytes of one or more DWORDs to a list of bools, 32 per DWORD least significant bit first
+    """
+    return list(chain.from_iterable(_BYTE_BITS[byte] for byte in data))
+
+
+def unpack_array(datatype, data):
+    """
+    Unpacks all the elements of an atomic array at once, DWORD arrays are returned as a list of bools
+    """
+    if datatype == 'DWORD':
+        return dwords_to_bool_array(data)
+    fmt = _ARRAY_FORMATS[datatype]
+    count = len(data) // DataTypeSize[datatype]
+    return list(unpack_from(f'<{count}{fmt}', data))
+
+
+def unpack_ndarray(datatype, data):
+    """
+    Unpacks an atomic array to a numpy ndarray, DWORD arrays are returned as an array of bools
+    """
+    if numpy is None:
+        raise ImportError('numpy is required to read arrays as ndarrays')
+    if datatype == 'DWORD':
+        return numpy.unpackbits(numpy.frombuffer(data, dtype='u1'), bitorder='little').astype(bool)
+    size = DataTypeSize[datatype]
+    return numpy.frombuffer(data, dtype=_NUMPY_DTYPES[datatype], count=len(data) // size)
 
 
 def get_service_status(status):
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+#
+# planner.py - Planners for grouping tag reads into multi-service request packets
+#
+# Copyright (c) 2020 Ian Ottoway <ian@ottoway.dev>
+# Copyright (c) 2014 Agostino Ruscito <ruscito@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""
+Planners for grouping tag reads into multi-service request packets.
+
+A planner is a function that takes a list of :class:`ReadPlanItem` and the connection size and returns a list of
+:class:`PacketPlan`, each packet plan becomes a single multi-service request.  Planners are selected by name using
+:attr:`LogixDriver.read_planner <pycomm3.LogixDriver.read_planner>`, or a custom planner function may be used instead.
+"""
+
+__all__ = ['ReadPlanItem', 'PacketPlan', 'plan_in_order', 'plan_first_fit_decreasing', 'READ_PLANNERS', ]
+
+from typing import List, NamedTuple, Callable
+
+from .const import MULTISERVICE_READ_OVERHEAD, MULTISERVICE_REQUEST_OVERHEAD
+
+
+class ReadPlanItem(NamedTuple):
+    tag_data: dict  # the parsed tag request
+    request_size: int  # bytes added to the request, including the offset
+    response_size: int  # bytes added to the reply, including the offset
+
+
+class PacketPlan:
+    """
+    Tracks the request and reply size of a single multi-service request packet
+    """
+
+    def __init__(self, connection_size: int):
+        self.connection_size = connection_size
+        self.items = []
+        self.request_size = MULTISERVICE_REQUEST_OVERHEAD
+        self.response_size = MULTISERVICE_READ_OVERHEAD
+
+    def __len__(self):
+        return len(self.items)
+
+    def fits(self, item: ReadPlanItem) -> bool:
+        """
+        True if both the request and reply will still fit in the connection size with the item added.
+        An empty packet will accept any item.
+        """
+        return not self.items or (self.request_size + item.request_size < self.connection_size and
+                                  self.response_size + item.response_size < self.connection_size)
+
+    def add(self, item: ReadPlanItem):
+        self.items.append(item)
+        self.request_size += item.request_size
+        self.response_size += item.response_size
+
+    @property
+    def wasted(self) -> int:
+        """
+        Unused bytes in the reply
+        """
+        return max(self.connection_size - self.response_size, 0)
+
+
+def plan_in_order(items: List[ReadPlanItem], connection_size: int) -> List[PacketPlan]:
+    """
+    Packs the items in the order they were requested, starting a new packet when an item does not fit in the current one
+    """
+    packets = []
+    packet = None
+    for item in items:
+        if packet is None or not packet.fits(item):
+            packet = PacketPlan(connection_size)
+            packets.append(packet)
+        packet.add(item)
+
+    return packets
+
+
+def plan_first_fit_decreasing(items: List[ReadPlanItem], connection_size: int) -> List[PacketPlan]:
+    """
+    Sorts the items largest first and adds each to the first packet it fits in,
+    usually requires fewer packets than :func:`plan_in_order`.
+    """
+    packets = []
+    for item in sorted(items, key=lambda i: max(i.response_size, i.request_size), reverse=True):
+        for packet in packets:
+            if packet.fits(item):
+                packet.add(item)
+                break
+        else:
+            packet = PacketPlan(connection_size)
+            packet.add(item)
+            packets.append(packet)
+
+    return packets
+
+
+READ_PLANNERS = {
+    'in_order': plan_in_order,
+    'first_fit_decreasing': plan_first_fit_decreasing,
+}
+
+ReadPlannerType = Callable[[List[ReadPlanItem], int], List[PacketPlan]]
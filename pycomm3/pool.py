@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020 Ian Ottoway <ian@ottoway.dev>
+# Copyright (c) 2014 Agostino Ruscito <ruscito@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""
+A thread-safe pool of open drivers for applications that communicate with many controllers.
+
+Instead of each thread creating its own driver (and connection), drivers are checked out of the pool for a target
+and returned when finished, so the connections and anything uploaded when creating the driver (like the tag list
+of a :class:`~pycomm3.LogixDriver`) are reused.  Idle connections are checked with an encapsulation NOP before being
+handed out again and broken connections are reconnected without creating a new driver.  If a target cannot be
+reached, new connections to it are not attempted again until a backoff delay has passed, doubling with each failure,
+to prevent every thread from retrying at once after a network outage.
+
+::
+
+    from pycomm3 import ConnectionPool
+
+    pool = ConnectionPool(max_connections=2, init_program_tags=True)
+
+    with pool.connection('10.20.30.100') as plc:
+        plc.read('Tag1', 'Tag2')
+"""
+
+__all__ = ['ConnectionPool', ]
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional, Type
+
+from .async_ import AsyncCIPDriver
+from .cip_base import CIPDriver
+from .clx import LogixDriver
+from .exceptions import CommError
+
+
+class _PoolTarget:
+    """
+    The drivers and reconnect state for a single target
+    """
+    __slots__ = ('idle', 'size', 'failures', 'retry_at')
+
+    def __init__(self):
+        self.idle = deque()  # (driver, time returned, broken)
+        self.size = 0  # number of drivers created, idle or in use
+        self.failures = 0  # consecutive failed connection attempts
+        self.retry_at = 0.0  # monotonic time when a new connection may be attempted
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of drivers, keeping open connections to one or many targets.
+    """
+    __log = logging.getLogger(f'{__module__}.{__qualname__}')
+
+    def __init__(self, driver: Type[CIPDriver] = LogixDriver, max_connections: int = 1,
+                 health_check_interval: float = 10.0, reconnect_delay: float = 1.0, max_reconnect_delay: float = 60.0,
+                 **driver_kwargs):
+        """
+        :param driver: the driver class to create for each connection
+        :param max_connections: max number of connections (drivers) to each target
+        :param health_check_interval: seconds a driver can be idle before its connection is checked on checkout,
+                                      0 to always check it
+        :param reconnect_delay: seconds to wait before trying to connect to a target again after the first failure,
+                                doubled after each consecutive failure
+        :param max_reconnect_delay: max seconds to wait before trying to connect again
+        :param driver_kwargs: keyword arguments for creating the drivers, e.g. ``init_program_tags=True``
+        """
+        if max_connections < 1:
+            raise ValueError('max_connections must be 1 or greater')
+        if issubclass(driver, AsyncCIPDriver):
+            raise TypeError(f'{driver.__name__} is an async driver, the pool only supports sync drivers')
+
+        self._driver = driver
+        self._driver_kwargs = driver_kwargs
+        self._max_connections = max_connections
+        self._health_check_interval = health_check_interval
+        self._reconnect_delay = reconnect_delay
+        self._max_reconnect_delay = max_reconnect_delay
+        self._targets: Dict[str, _PoolTarget] = {}
+        self._checked_out: Dict[int, str] = {}  # id(driver): path
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(driver={self._driver.__name__}, targets={list(self._targets)})'
+
+    @contextmanager
+    def connection(self, path: str, timeout: Optional[float] = None):
+        """
+        Context manager to checkout a driver for ``path`` and return it to the pool when finished.  If a ``CommError``
+        is raised while using it, the connection is marked as broken and will be reconnected on the next checkout.
+        """
+        driver = self.checkout(path, timeout)
+        broken = False
+        try:
+            yield driver
+        except CommError:
+            broken = True
+            raise
+        finally:
+            self.checkin(driver, broken)
+
+    def checkout(self, path: str, timeout: Optional[float] = None) -> CIPDriver:
+        """
+        Returns a connected driver for the target, the driver must be returned to the pool using :meth:`checkin`.
+
+        :param path: CIP path of the target
+        :param timeout: max seconds to wait for a driver if all the connections to the target are in use,
+                        ``None`` to wait forever
+        :raises CommError: if a connection to the target could not be (re)opened, the target is waiting for the
+                           reconnect delay to pass, or no connection became available before the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._available:
+            while True:
+                if self._closed:
+                    raise CommError('connection pool is closed')
+
+                target = self._targets.setdefault(path, _PoolTarget())
+                if target.idle:
+                    driver, returned, broken = target.idle.pop()
+                    break
+
+                if target.size < self._max_connections:
+                    self._check_retry(path, target)
+                    target.size += 1
+                    driver, returned, broken = None, None, False
+                    break
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise CommError(f'timed out waiting for an available connection to {path}')
+                self._available.wait(remaining)
+
+        if driver is None:
+            driver = self._connect(path, target)
+        elif broken or time.monotonic() - returned >= self._health_check_interval:
+            self._check_health(path, target, driver, broken)
+
+        with self._lock:
+            self._checked_out[id(driver)] = path
+        return driver
+
+    def checkin(self, driver: CIPDriver, broken: bool = False):
+        """
+        Returns a driver to the pool, set ``broken`` if the connection failed while using it
+        """
+        with self._available:
+            path = self._checked_out.pop(id(driver), None)
+            if path is None:
+                raise ValueError('driver was not checked out from this pool')
+
+            target = self._targets[path]
+            if self._closed:
+                target.size -= 1
+            else:
+                target.idle.append((driver, time.monotonic(), broken))
+                self._available.notify()
+                return
+
+        self._close_driver(driver)
+
+    def close(self):
+        """
+        Closes all the idle drivers, drivers still checked out are closed when they are returned
+        """
+        with self._available:
+            self._closed = True
+            drivers = []
+            for target in self._targets.values():
+                drivers.extend(driver for driver, _, _ in target.idle)
+                target.size -= len(target.idle)
+                target.idle.clear()
+            self._available.notify_all()
+
+        for driver in drivers:
+            self._close_driver(driver)
+
+    def _check_retry(self, path: str, target: _PoolTarget):
+        now = time.monotonic()
+        if now < target.retry_at:
+            raise CommError(f'{path} is unavailable, next connection attempt in {target.retry_at - now:.1f}s')
+
+    def _connect(self, path: str, target: _PoolTarget) -> CIPDriver:
+        """
+        Creates a new driver and opens the connection
+        """
+        driver = None
+        try:
+            driver = self._driver(path, **self._driver_kwargs)
+            driver.open()
+        except Exception as err:
+            if driver is not None:
+                self._close_driver(driver)
+            self._connection_failed(path, target)
+            raise CommError(f'failed to connect to {path}') from err
+
+        self._connection_succeeded(target)
+        return driver
+
+    def _check_health(self, path: str, target: _PoolTarget, driver: CIPDriver, broken: bool):
+        """
+        Checks the connection of an idle driver, reconnecting it if broken.  If waiting for the reconnect delay, the
+        driver is returned to the pool still marked as broken.  If it cannot be reconnected, the driver is closed and
+        removed from the pool.
+        """
+        if not broken and driver.check_connection():
+            return
+
+        with self._available:
+            now = time.monotonic()
+            if now < target.retry_at:
+                target.idle.appendleft((driver, now, True))
+                self._available.notify()
+                raise CommError(f'{path} is unavailable, next connection attempt in {target.retry_at - now:.1f}s')
+
+        self.__log.info(f'Connection to {path} is broken, reconnecting')
+        try:
+            driver.reconnect()
+        except Exception as err:
+            self._close_driver(driver)
+            self._connection_failed(path, target)
+            raise CommError(f'failed to reconnect to {path}') from err
+
+        self._connection_succeeded(target)
+
+    def _connection_failed(self, path: str, target: _PoolTarget):
+        """
+        Removes the failed driver from the pool and delays the next connection attempt
+        """
+        with self._available:
+            target.size -= 1
+            self._available.notify()
+            delay = min(self._reconnect_delay * 2 ** target.failures, self._max_reconnect_delay)
+            delay *= random.uniform(0.5, 1.0)  # jitter, so many pools do not all retry at the same time
+            target.failures += 1
+            target.retry_at = time.monotonic() + delay
+        self.__log.warning(f'Failed to connect to {path}, next attempt in {delay:.1f}s')
+
+    def _connection_succeeded(self, target: _PoolTarget):
+        with self._lock:
+            target.failures = 0
+            target.retry_at = 0.0
+
+    def _close_driver(self, driver: CIPDriver):
+        try:
+            driver.close()
+        except Exception as err:
+            self.__log.warning(f'Error closing driver - {err}')
@@ -0,0 +1,1406 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020 Ian Ottoway <ian@ottoway.dev>
+# Copyright (c) 2014 Agostino Ruscito <ruscito@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""
+A small, pure-Python EtherNet/IP target for testing drivers without any hardware.
+
+It implements the subset of the encapsulation protocol and CIP services used by the :class:`~pycomm3.LogixDriver`
+and :class:`~pycomm3.SLCDriver`, backed by an in-memory tag database that can be seeded from a dict or an L5X export.
+"""
+
+import logging
+import math
+import re
+import socket
+import socketserver
+import struct
+import threading
+import time
+import xml.etree.ElementTree as ET
+import zlib
+from typing import Dict, Optional, Tuple, Any, Union
+
+from .bytes_ import Pack, Unpack
+from .const import (EncapsulationCommand, ConnectionManagerService, CommonService, TagService, ClassCode, DataType,
+                    KEYSWITCH, STRUCTURE_READ_REPLY, SUCCESS, INSUFFICIENT_PACKETS, BASE_TAG_BIT, PCCC_DATA_TYPE,
+                    PCCC_DATA_SIZE, SLC_FNC_READ, SLC_FNC_WRITE, SLC_FNC_MASKED_WRITE, SEC_TO_US, ENIP_PORT)
+
+__all__ = ['PLCSimulator', ]
+
+
+_ATOMIC_FORMATS = {
+    'BOOL': 'B',
+    'SINT': 'b',
+    'INT': 'h',
+    'DINT': 'i',
+    'LINT': 'q',
+    'USINT': 'B',
+    'UINT': 'H',
+    'UDINT': 'I',
+    'ULINT': 'Q',
+    'REAL': 'f',
+    'LREAL': 'd',
+    'DWORD': 'I',
+}
+
+_ATOMIC_SIZES = {typ: struct.calcsize(fmt) for typ, fmt in _ATOMIC_FORMATS.items()}
+
+_BUILTIN_TYPES = {
+    'STRING': {'LEN': 'DINT', 'DATA': 'SINT[82]'},
+    'TIMER': [
+        {'name': 'ZZZZZZZZZZTIMER0', 'type': 'DINT', 'hidden': True},
+        {'name': 'PRE', 'type': 'DINT'},
+        {'name': 'ACC', 'type': 'DINT'},
+        {'name': 'EN', 'type': 'BIT', 'target': 'ZZZZZZZZZZTIMER0', 'bit': 31},
+        {'name': 'TT', 'type': 'BIT', 'target': 'ZZZZZZZZZZTIMER0', 'bit': 30},
+        {'name': 'DN', 'type': 'BIT', 'target': 'ZZZZZZZZZZTIMER0', 'bit': 29},
+    ],
+    'COUNTER': [
+        {'name': 'ZZZZZZZZZZCOUNTER0', 'type': 'DINT', 'hidden': True},
+        {'name': 'PRE', 'type': 'DINT'},
+        {'name': 'ACC', 'type': 'DINT'},
+        {'name': 'CU', 'type': 'BIT', 'target': 'ZZZZZZZZZZCOUNTER0', 'bit': 31},
+        {'name': 'CD', 'type': 'BIT', 'target': 'ZZZZZZZZZZCOUNTER0', 'bit': 30},
+        {'name': 'DN', 'type': 'BIT', 'target': 'ZZZZZZZZZZCOUNTER0', 'bit': 29},
+        {'name': 'OV', 'type': 'BIT', 'target': 'ZZZZZZZZZZCOUNTER0', 'bit': 28},
+        {'name': 'UN', 'type': 'BIT', 'target': 'ZZZZZZZZZZCOUNTER0', 'bit': 27},
+    ],
+    'CONTROL': [
+        {'name': 'ZZZZZZZZZZCONTROL0', 'type': 'DINT', 'hidden': True},
+        {'name': 'LEN', 'type': 'DINT'},
+        {'name': 'POS', 'type': 'DINT'},
+        {'name': 'EN', 'type': 'BIT', 'target': 'ZZZZZZZZZZCONTROL0', 'bit': 31},
+        {'name': 'EU', 'type': 'BIT', 'target': 'ZZZZZZZZZZCONTROL0', 'bit': 30},
+        {'name': 'DN', 'type': 'BIT', 'target': 'ZZZZZZZZZZCONTROL0', 'bit': 29},
+        {'name': 'EM', 'type': 'BIT', 'target': 'ZZZZZZZZZZCONTROL0', 'bit': 28},
+        {'name': 'ER', 'type': 'BIT', 'target': 'ZZZZZZZZZZCONTROL0', 'bit': 27},
+        {'name': 'UL', 'type': 'BIT', 'target': 'ZZZZZZZZZZCONTROL0', 'bit': 26},
+        {'name': 'IN', 'type': 'BIT', 'target': 'ZZZZZZZZZZCONTROL0', 'bit': 25},
+        {'name': 'FD', 'type': 'BIT', 'target': 'ZZZZZZZZZZCONTROL0', 'bit': 24},
+    ],
+}
+
+_KEYSWITCH_STATUS = {name: bytes((byte0, byte1))
+                     for byte0, modes in KEYSWITCH.items()
+                     for byte1, name in reversed(list(modes.items()))}
+
+_HIDDEN_HOST_PREFIX = 'ZZZZZZZZZZ'
+_TEMPLATE_INSTANCE_START = 0x100
+_TEMPLATE_READ_OVERHEAD = 21  # the driver requests (object definition size * 4) - 21 bytes
+_SYMBOL_STRUCT = 0b_1000_0000_0000_0000
+_SYMBOL_SYSTEM = 0b_0001_0000_0000_0000
+_UNCONNECTED_SIZE = 504
+_MAX_STANDARD_CONNECTION_SIZE = 511
+_SERVICE_REPLY = 0x80
+_GENERAL_ERROR = 0xFF
+_PCCC_ILLEGAL_COMMAND = 0x10
+_PCCC_DIAGNOSTIC_STATUS = 0x06
+_ENCAP_INVALID_SESSION = 0x64
+_ENCAP_INVALID_COMMAND = 0x01
+
+
+class _ServiceError(Exception):
+    """
+    Raised by the service handlers to return a CIP error reply
+    """
+
+    def __init__(self, status: int, *extended: int):
+        super().__init__(status, extended)
+        self.status = status
+        self.extended = extended
+
+
+class PLCSimulator:
+    """
+    A local EtherNet/IP target that emulates a Logix controller and the PCCC data table of an SLC/MicroLogix.
+    Intended for testing, it serves the services used by the drivers in this package:
+
+    - RegisterSession, UnRegisterSession and ListIdentity
+    - (Large) Forward Open, Forward Close and Unconnected Send
+    - Identity object, controller name and wall clock time
+    - the attribute lists of the Symbol and Template objects and reading template definitions
+    - Read/Write Tag (fragmented), Read Modify Write Tag and the Multiple Service Packet
+    - PCCC typed reads and writes and the diagnostic status command
+    - ListIdentity over UDP, for discovery
+
+    Tags are defined with a ``{name: (data type, value)}`` dict, using data types like ``'DINT'``, ``'REAL[10]'``
+    or ``'STRING'``, or loaded from an exported L5X file using :meth:`from_l5x`.  UDTs are defined with
+    ``{name: {member: data type}}`` in the order of the members.
+
+    >>> with PLCSimulator(tags={'count': ('DINT', 5)}) as sim:
+    ...     with LogixDriver(sim.path) as plc:
+    ...         plc.read('count')
+
+    .. note::
+
+        Use ``port=0`` to listen on any free port, like when running multiple simulators at once, the
+        :attr:`path` includes the port the simulator is listening on.
+
+    """
+    __log = logging.getLogger(f'{__module__}.{__qualname__}')
+
+    def __init__(self, host: str = '127.0.0.1', port: int = ENIP_PORT, *,
+                 tags: Optional[Dict[str, Any]] = None,
+                 programs: Optional[Dict[str, Dict[str, Any]]] = None,
+                 data_types: Optional[Dict[str, Any]] = None,
+                 data_files: Optional[Dict[str, Any]] = None,
+                 name: str = 'PYCOMM3_SIM',
+                 product_name: str = '1756-L83E/B',
+                 product_type: int = 14,
+                 product_code: int = 166,
+                 revision: Tuple[int, int] = (32, 11),
+                 serial: int = 0x00C0_FFEE,
+                 keyswitch: str = 'REMOTE RUN',
+                 processor_type: str = '1766-LEC',
+                 latency: float = 0.0,
+                 connection_size: int = 4002,
+                 large_forward_open: bool = True,
+                 modules: Optional[Dict[int, Dict[str, Any]]] = None):
+        """
+        :param host: address to listen on
+        :param port: TCP and UDP port to listen on, 0 for any free port
+        :param tags: controller-scoped tags, ``{name: (data type, value)}``, value is optional and may be
+                     a value, list of values, dict for structures or the raw bytes of the tag
+        :param programs: program-scoped tags, ``{program: {name: (data type, value)}}``
+        :param data_types: UDT definitions, ``{name: {member: data type}}``
+        :param data_files: PCCC data files, ``{'N7': [values] or number of elements}``
+        :param name: name of the controller, returned by ``get_plc_name``
+        :param product_name: product name returned by the Identity object and ListIdentity
+        :param revision: firmware revision (major, minor), external access attributes are included for v18+
+        :param keyswitch: reported keyswitch position (``'RUN'``, ``'REMOTE RUN'``, ``'PROG'``, ``'REMOTE PROG'``)
+        :param processor_type: catalog number returned by the PCCC diagnostic status command
+        :param latency: seconds to wait before sending each reply
+        :param connection_size: the largest connection size accepted by a Forward Open, also limits the reply size
+        :param large_forward_open: ``False`` to reject the Large Forward Open service, like older controllers
+        :param modules: the modules in the chassis, ``{slot: identity}``, where identity overrides any of the
+                        ``product_name``, ``product_type``, ``product_code``, ``revision`` or ``serial`` of the
+                        controller.  Identity requests routed to a slot return the identity of its module and any
+                        message routed to an empty slot times out.  If ``None``, every slot is the controller.
+        """
+        self._address = (host, port)
+        self.name = name
+        self.product_name = product_name
+        self.product_type = product_type
+        self.product_code = product_code
+        self.revision = revision
+        self.serial = serial
+        self.keyswitch = keyswitch
+        self.processor_type = processor_type
+        self.latency = latency
+        self.connection_size = connection_size
+        self.large_forward_open = large_forward_open
+        self.modules = modules
+
+        self._lock = threading.RLock()
+        self._server = None
+        self._thread = None
+        self._udp_server = None
+        self._udp_thread = None
+        self._clients = set()
+        self._clock_offset = 0
+        self._change_counter = 0
+        self._next_session = 1
+        self._next_cid = 1
+
+        self._type_defs = {**_BUILTIN_TYPES, **(data_types or {})}
+        self._data_types = {}
+        self._next_template_instance = _TEMPLATE_INSTANCE_START
+        self._next_symbol_instance = 1
+        self._tags = {}  # lower-case name -> tag
+        self._programs = {}  # lower-case program name -> {'name', 'instance_id', 'tags'}
+        self._instances = {}  # symbol instance id -> tag
+        self._data_files = {}
+
+        for tag_name, spec in (tags or {}).items():
+            self.add_tag(tag_name, *_tag_spec(spec))
+
+        for program, program_tags in (programs or {}).items():
+            self.add_program(program)
+            for tag_name, spec in program_tags.items():
+                self.add_tag(tag_name, *_tag_spec(spec), program=program)
+
+        for file, value in (data_files or {}).items():
+            self.add_data_file(file, value)
+
+    @classmethod
+    def from_l5x(cls, filename: str, **kwargs) -> 'PLCSimulator':
+        """
+        Creates a simulator with the data types, Add-On Instructions and tags (controller and program scoped)
+        from an L5X file.  Tag values are loaded from the exported data, the decorated data is used for types
+        whose layout is not reproduced exactly by the simulator (like AOIs).
+        """
+        controller = ET.parse(filename).getroot().find('Controller')
+        if controller is None:
+            raise ValueError(f'No controller found in {filename}')
+
+        data_types = {}
+        for data_type in controller.iterfind('DataTypes/DataType'):
+            data_types[data_type.get('Name')] = [_l5x_member(member) for member in data_type.iterfind('Members/Member')]
+
+        for aoi in controller.iterfind('AddOnInstructionDefinitions/AddOnInstructionDefinition'):
+            data_types[aoi.get('Name')] = _l5x_aoi_members(aoi)
+
+        kwargs.setdefault('name', controller.get('Name'))
+        if controller.get('ProcessorType'):
+            kwargs.setdefault('product_name', controller.get('ProcessorType'))
+
+        sim = cls(data_types={**data_types, **kwargs.pop('data_types', {})}, **kwargs)
+
+        for tag in controller.iterfind('Tags/Tag'):
+            sim._add_l5x_tag(tag)
+
+        for program in controller.iterfind('Programs/Program'):
+            program_name = program.get('Name')
+            sim.add_program(program_name)
+            for tag in program.iterfind('Tags/Tag'):
+                sim._add_l5x_tag(tag, program_name)
+
+        return sim
+
+    def _add_l5x_tag(self, tag, program=None):
+        if tag.get('TagType', 'Base') == 'Alias' or tag.get('DataType') is None:
+            return
+
+        dims = [int(d) for d in tag.get('Dimensions', '').split()]
+        data_type = tag.get('DataType') + (f'[{",".join(str(d) for d in dims)}]' if dims else '')
+        raw, decorated = None, None
+        for data in tag.iterfind('Data'):
+            fmt = data.get('Format')
+            if fmt is None and data.text:
+                raw = bytes.fromhex(data.text)
+            elif fmt == 'String':
+                decorated = _l5x_string(data.text)
+            elif fmt == 'Decorated' and len(data):
+                decorated = _l5x_value(data[0])
+
+        access = {'Read Only': 2, 'None': 3}.get(tag.get('ExternalAccess'), 0)
+        self.add_tag(tag.get('Name'), data_type, raw, program=program, fallback=decorated, external_access=access)
+
+    @property
+    def path(self) -> str:
+        """
+        The path to use for the drivers to connect to the simulator, includes the port if it is not 44818
+        """
+        host, port = self.address
+        return host if port == ENIP_PORT else f'{host}:{port}'
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """
+        The (host, port) the simulator is listening on
+        """
+        if self._server is not None:
+            return self._server.server_address
+        return self._address
+
+    @property
+    def data_types(self) -> Dict[str, dict]:
+        """
+        The data types used by the tags in the simulator
+        """
+        return self._data_types
+
+    def add_program(self, program: str):
+        """
+        Adds a program to the controller, program-scoped tags can then be added by passing ``program`` to
+        :meth:`add_tag`.
+        """
+        with self._lock:
+            if program.lower() not in self._programs:
+                self._programs[program.lower()] = {
+                    'name': program,
+                    'instance_id': self._new_symbol_instance(),
+                    'tags': {}
+                }
+                self._change_counter += 1
+
+    def add_tag(self, name: str, data_type: str, value: Any = None, *, program: Optional[str] = None,
+                fallback: Any = None, external_access: int = 0):
+        """
+        Adds (or replaces) a tag.
+
+        :param name: name of the tag
+        :param data_type: data type with any array dimensions, e.g. ``'DINT'``, ``'INT[10]'`` or ``'REAL[2,5]'``
+        :param value: initial value, raw bytes or value(s) to be encoded. ``None`` leaves the tag zeroed.
+        :param program: name of the program for program-scoped tags
+        :param fallback: value to use if ``value`` is raw bytes of the wrong length
+        :param external_access: value of the external access attribute, 0 = Read/Write
+        """
+        type_name, dims = _parse_data_type(data_type)
+        with self._lock:
+            typ = self._get_data_type(type_name)
+            if typ == 'BOOL' and dims:  # BOOL arrays are stored as DWORDs
+                typ, dims = 'DWORD', [math.ceil(dims[0] / 32)] + dims[1:]
+
+            count = _prod(dims)
+            size = _sizeof(typ) * count
+            data = bytearray(size)
+            if isinstance(value, (bytes, bytearray)) and len(value) != size:
+                self.__log.debug(f'{name}: data length {len(value)} != {size}, using decorated value')
+                value = fallback
+            if value is not None:
+                data[:] = _encode(typ, value, count)
+
+            if program is not None:
+                self.add_program(program)
+                scope = self._programs[program.lower()]['tags']
+            else:
+                scope = self._tags
+
+            old = scope.get(name.lower())
+            tag = {
+                'name': name,
+                'data_type': typ,
+                'dims': dims,
+                'data': data,
+                'external_access': external_access,
+                'instance_id': old['instance_id'] if old else self._new_symbol_instance(),
+            }
+            scope[name.lower()] = tag
+            self._instances[tag['instance_id']] = tag
+            self._change_counter += 1
+
+    def remove_tag(self, name: str, *, program: Optional[str] = None):
+        """
+        Removes a tag, if it is added again it will have a new instance id like after a download.
+
+        :param name: name of the tag
+        :param program: name of the program for program-scoped tags
+        """
+        with self._lock:
+            scope = self._programs[program.lower()]['tags'] if program is not None else self._tags
+            tag = scope.pop(name.lower())
+            del self._instances[tag['instance_id']]
+            self._change_counter += 1
+
+    def add_data_file(self, file: str, value: Any):
+        """
+        Adds a PCCC data file, e.g. ``add_data_file('N7', [1, 2, 3])`` or ``add_data_file('F8', 10)``.
+
+        :param file: file type and number
+        :param value: number of elements or a list of values (or raw bytes) to initialize the file with
+        """
+        match = re.fullmatch(r'(?P<file_type>[A-Z]+)(?P<file_number>\d+)', file.upper())
+        if match is None or match['file_type'] not in PCCC_DATA_SIZE:
+            raise ValueError(f'Invalid data file: {file}')
+
+        file_type, file_number = match['file_type'], int(match['file_number'])
+        element_size = PCCC_DATA_SIZE[file_type]
+        if isinstance(value, int):
+            data = bytes(element_size * value)
+        elif isinstance(value, (bytes, bytearray)):
+            data = bytes(value)
+        else:
+            pack_func = Pack[f'pccc_{file_type.lower()}']
+            data = b''.join(val if isinstance(val, bytes) else pack_func(val) for val in value)
+
+        with self._lock:
+            self._data_files[(file_type, file_number)] = bytearray(data)
+
+    def read_data_file(self, file: str) -> bytes:
+        """
+        Returns the raw contents of a PCCC data file
+        """
+        match = re.fullmatch(r'(?P<file_type>[A-Z]+)(?P<file_number>\d+)', file.upper())
+        with self._lock:
+            return bytes(self._data_files[(match['file_type'], int(match['file_number']))])
+
+    def read_tag_bytes(self, tag: str) -> bytes:
+        """
+        Returns the raw contents of a tag, member or array element (e.g. ``'udt.array[1]'``)
+        """
+        path = []
+        for part in tag.split('.'):
+            base, _, index = part.partition('[')
+            path.append(('symbol', base))
+            if index:
+                path += [('element', int(i)) for i in index.rstrip(']').split(',')]
+        with self._lock:
+            data, typ, offset, count, bit = self._resolve(path)
+            if path[-1][0] == 'element':
+                count = 1
+            return bytes(data[offset: offset + _sizeof(typ) * count])
+
+    def start(self) -> 'PLCSimulator':
+        """
+        Starts listening for connections in a background thread
+        """
+        if self._server is None:
+            self._server = _Server(self._address, _RequestHandler, self)
+            self._address = self._server.server_address  # keep the same port when restarted, if it was 0
+            self._thread = threading.Thread(target=self._server.serve_forever,
+                                            name=f'PLCSimulator({self.path})', daemon=True)
+            self._thread.start()
+            self._udp_server = _UDPServer(self._address, _ListIdentityHandler, self)
+            self._udp_thread = threading.Thread(target=self._udp_server.serve_forever,
+                                                name=f'PLCSimulator({self.path})-udp', daemon=True)
+            self._udp_thread.start()
+            self.__log.info(f'Simulator listening on {self.address}')
+        return self
+
+    def stop(self):
+        """
+        Stops the server and disconnects any clients
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            for client in list(self._clients):
+                try:
+                    client.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    ...
+            self._thread.join()
+            self._server = None
+            self._thread = None
+            self._udp_server.shutdown()
+            self._udp_server.server_close()
+            self._udp_thread.join()
+            self._udp_server = None
+            self._udp_thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(host={self._address[0]!r}, port={self._address[1]!r}, name={self.name!r})'
+
+
+    # --- data types ---------------------------------------------------------------------------------------------------
+
+    def _get_data_type(self, type_name: str) -> Union[str, dict]:
+        if type_name.upper() in _ATOMIC_FORMATS:
+            return type_name.upper()
+
+        if type_name not in self._data_types:
+            definition = self._type_defs.get(type_name)
+            if definition is None:
+                raise ValueError(f'Unknown data type: {type_name}')
+            self._data_types[type_name] = self._layout(type_name, _normalize_members(definition))
+
+        return self._data_types[type_name]
+
+    def _layout(self, type_name, definition):
+        """
+        Calculates the offset of each member the same way Logix does, members are aligned to their own size (structs
+        to 4 bytes), BOOLs are packed into hidden SINTs and BOOL arrays are stored as DWORDs.
+        """
+        members = {}
+        offset, align, host = 0, 4, None
+        for i, member in enumerate(definition):
+            name, member_type, dim = member['name'], member['type'], member.get('dim', 0)
+
+            if member_type.upper() == 'BOOL' and not dim:
+                if host is None or host[1] == 8:
+                    host_name = f'{_HIDDEN_HOST_PREFIX}{type_name}{i}'
+                    members[host_name] = _member(host_name, 'SINT', offset, hidden=True)
+                    host = [host_name, 0]
+                    offset += 1
+                member = {**member, 'type': 'BIT', 'target': host[0], 'bit': host[1]}
+                host[1] += 1
+            else:
+                host = None
+
+            if member['type'].upper() == 'BIT':
+                target = members[member['target']]
+                bit = member['bit']
+                members[name] = _member(name, 'BOOL', target['offset'] + bit // 8, bit=bit % 8)
+                continue
+
+            typ = self._get_data_type(member_type)
+            if typ == 'BOOL':
+                typ, dim = 'DWORD', math.ceil(dim / 32)
+
+            member_align = _alignof(typ)
+            align = max(align, member_align)
+            offset = _round_up(offset, member_align)
+            members[name] = _member(name, typ, offset, array=dim, hidden=member.get('hidden', False))
+            offset += _sizeof(typ) * max(dim, 1)
+
+        data_type = {
+            'name': type_name,
+            'members': members,
+            'lookup': {name.lower(): member for name, member in members.items()},
+            'size': _round_up(offset, align),
+            'align': align,
+            'instance_id': self._next_template_instance,
+        }
+        self._next_template_instance += 1
+        data_type['template'] = _template_data(data_type)
+        data_type['handle'] = zlib.crc32(data_type['template']) & 0xFFFF
+        data_type['string'] = (list(members) == ['LEN', 'DATA'] and members['DATA']['data_type'] == 'SINT'
+                               and members['DATA']['array'])
+
+        return data_type
+
+    def _new_symbol_instance(self):
+        instance_id = self._next_symbol_instance
+        self._next_symbol_instance += 1
+        return instance_id
+
+    # --- request handling ---------------------------------------------------------------------------------------------
+
+    def _handle(self, client: dict, packet: bytes) -> Optional[bytes]:
+        """
+        Processes an encapsulated request, returns the reply or ``None`` if no reply is to be sent.
+        """
+        command = packet[:2]
+        session = Unpack.udint(packet[4:8])
+        context = packet[12:20]
+        data = packet[24:]
+
+        if command == EncapsulationCommand.register_session:
+            with self._lock:
+                client['session'] = self._next_session
+                self._next_session += 1
+            return _encap_reply(command, data[:4], client['session'], context=context)
+
+        if command == EncapsulationCommand.list_identity:
+            return _encap_reply(command, self._list_identity_item(client), context=context)
+
+        if command in (EncapsulationCommand.unregister_session, EncapsulationCommand.nop):
+            if command == EncapsulationCommand.unregister_session:
+                client['session'] = None
+            return None
+
+        if command not in (EncapsulationCommand.send_rr_data, EncapsulationCommand.send_unit_data):
+            return _encap_reply(command, b'', session, _ENCAP_INVALID_COMMAND, context)
+
+        if session != client['session']:
+            return _encap_reply(command, b'', session, _ENCAP_INVALID_SESSION, context)
+
+        items = _parse_cpf(data[6:])
+        if command == EncapsulationCommand.send_rr_data:
+            reply = self._handle_message(client, items[-1][1], None)
+            cpf = [(b'\x00\x00', b''), (b'\xb2\x00', reply)]
+        else:
+            cid = items[0][1]
+            connection = client['connections'].get(cid)
+            sequence, message = items[-1][1][:2], items[-1][1][2:]
+            if connection is None:
+                reply = _service_reply(message[0], 0x01, 0x0107)  # connection not found
+                cpf = [(b'\xa1\x00', cid), (b'\xb1\x00', sequence + reply)]
+            else:
+                reply = self._handle_message(client, message, connection)
+                cpf = [(b'\xa1\x00', connection['t_o_cid']), (b'\xb1\x00', sequence + reply)]
+
+        return _encap_reply(command, _build_cpf(cpf), session, context=context)
+
+    def _handle_message(self, client, message, connection):
+        """
+        Dispatches a Message Router request to the handler for the service, connection is ``None`` for unconnected
+        messages.  Returns the Message Router reply.
+        """
+        service = message[0]
+        try:
+            path_len = message[1] * 2
+            path = _parse_path(message[2:2 + path_len])
+            data = message[2 + path_len:]
+            limit = connection['size'] if connection else _UNCONNECTED_SIZE
+            class_code = next((value for kind, value in path if kind == 'class'), None)
+            instance = next((value for kind, value in path if kind == 'instance'), None)
+            key = (Pack.usint(service), Pack.usint(class_code) if class_code is not None else None)
+
+            with self._lock:
+                if key[1] == ClassCode.connection_manager:
+                    if key[0] in (ConnectionManagerService.forward_open, ConnectionManagerService.large_forward_open):
+                        return _service_reply(service, data=self._forward_open(client, service, data))
+                    if key[0] == ConnectionManagerService.forward_close:
+                        return _service_reply(service, data=self._forward_close(client, data))
+                    if key[0] == ConnectionManagerService.unconnected_send:
+                        msg_len = Unpack.uint(data[2:4])
+                        message = data[4:4 + msg_len]
+                        if self.modules is not None:
+                            route = data[4 + msg_len + msg_len % 2:]
+                            slot = route[3] if route[2:3] == b'\x01' else None  # port 1 is the backplane
+                            if slot not in self.modules:
+                                raise _ServiceError(0x01, 0x0204)  # unconnected send timed out
+                            identity_class = ('class', Unpack.usint(ClassCode.identity_object))
+                            if (message[:1] == CommonService.get_attributes_all
+                                    and identity_class in _parse_path(message[2:2 + message[1] * 2])):
+                                return _service_reply(message[0], data=self._identity(self.modules[slot]))
+                        return self._handle_message(client, message, None)
+
+                handler = self._services.get(key)
+                if handler is None and class_code in (None, Unpack.usint(ClassCode.symbol_object)):
+                    handler = self._services.get((key[0], None))
+                if handler is None:
+                    raise _ServiceError(0x08)  # service not supported
+
+                status, reply_data = handler(self, client, path, instance, data, limit)
+
+        except _ServiceError as err:
+            return _service_reply(service, err.status, *err.extended)
+        except Exception:
+            self.__log.exception(f'Error handling service 0x{service:02x}')
+            return _service_reply(service, 0x04)  # path segment error
+
+        return _service_reply(service, status, data=reply_data)
+
+    def _list_identity_item(self, client):
+        host, port = client['address']
+        item = b''.join((
+            Pack.uint(1),  # encapsulation protocol version
+            struct.pack('>HH', socket.AF_INET, port),
+            socket.inet_aton(host),
+            bytes(8),
+            self._identity(),
+            b'\x03',  # state
+        ))
+        return Pack.uint(1) + Pack.uint(0x0C) + Pack.uint(len(item)) + item
+
+    def _identity(self, module: Optional[Dict[str, Any]] = None):
+        identity = {'product_type': self.product_type, 'product_code': self.product_code, 'revision': self.revision,
+                    'serial': self.serial, 'product_name': self.product_name, **(module or {})}
+        return b''.join((
+            Pack.uint(1),  # Rockwell Automation/Allen-Bradley
+            Pack.uint(identity['product_type']),
+            Pack.uint(identity['product_code']),
+            Pack.usint(identity['revision'][0]),
+            Pack.usint(identity['revision'][1]),
+            _KEYSWITCH_STATUS.get(self.keyswitch, b'\x00\x00'),
+            Pack.udint(identity['serial']),
+            Pack.short_string(identity['product_name']),
+        ))
+
+    def _forward_open(self, client, service, data):
+        large = Pack.usint(service) == ConnectionManagerService.large_forward_open
+        if large and not self.large_forward_open:
+            raise _ServiceError(0x08)
+
+        if large:
+            size = Unpack.udint(data[26:30]) & 0xFFFF
+            t_o_rpi = data[30:34]
+        else:
+            size = Unpack.uint(data[26:28]) & 0x01FF
+            t_o_rpi = data[28:32]
+
+        max_size = self.connection_size if large else min(self.connection_size, _MAX_STANDARD_CONNECTION_SIZE)
+        if size > max_size:
+            raise _ServiceError(0x01, 0x0109)  # invalid connection size
+
+        o_t_cid = Pack.udint(self._next_cid)
+        self._next_cid += 1
+        client['connections'][o_t_cid] = {
+            'size': size,
+            't_o_cid': data[6:10],
+            'serial': data[10:18],
+        }
+
+        return b''.join((o_t_cid, data[6:10], data[10:18], data[22:26], t_o_rpi, b'\x00\x00'))
+
+    def _forward_close(self, client, data):
+        serial = data[2:10]
+        for cid, connection in list(client['connections'].items()):
+            if connection['serial'] == serial:
+                del client['connections'][cid]
+                return serial + b'\x00\x00'
+
+        raise _ServiceError(0x01, 0x0107)  # connection not found
+
+    def _get_attributes_all(self, client, path, instance, data, limit):
+        return SUCCESS, self._identity()
+
+    def _get_controller_name(self, client, path, instance, data, limit):
+        return SUCCESS, _attribute_list(data, {1: Pack.string(self.name)})
+
+    def _get_change_counters(self, client, path, instance, data, limit):
+        counter = Pack.udint(self._change_counter)
+        return SUCCESS, _attribute_list(data, {attr: counter for attr in (1, 2, 3, 4, 0x0A)})
+
+    def _get_wall_clock(self, client, path, instance, data, limit):
+        microseconds = int(time.time() * SEC_TO_US) + self._clock_offset
+        return SUCCESS, _attribute_list(data, {0x0B: Pack.ulint(microseconds), 6: Pack.ulint(microseconds)})
+
+    def _set_wall_clock(self, client, path, instance, data, limit):
+        count = Unpack.uint(data)
+        reply = [Pack.uint(count)]
+        idx = 2
+        for _ in range(count):
+            attr = Unpack.uint(data[idx:])
+            if attr in (6, 0x0B):
+                self._clock_offset = Unpack.ulint(data[idx + 2:]) - int(time.time() * SEC_TO_US)
+                reply.append(Pack.uint(attr) + Pack.uint(SUCCESS))
+                idx += 10
+            else:
+                reply.append(Pack.uint(attr) + Pack.uint(0x14))  # attribute not supported
+                break
+        return SUCCESS, b''.join(reply)
+
+    def _get_instance_attribute_list(self, client, path, instance, data, limit):
+        program = next((value for kind, value in path if kind == 'symbol'), None)
+        if program is not None:
+            program = self._programs.get(program.lower().replace('program:', '', 1))
+            if program is None:
+                raise _ServiceError(0x05)
+            symbols = [(tag['instance_id'], tag['name'], tag) for tag in program['tags'].values()]
+        else:
+            symbols = [(tag['instance_id'], tag['name'], tag) for tag in self._tags.values()]
+            symbols += [(prog['instance_id'], f'Program:{prog["name"]}', None) for prog in self._programs.values()]
+
+        count = Unpack.uint(data)
+        attributes = [Unpack.uint(data[i:]) for i in range(2, 2 + count * 2, 2)]
+
+        reply, size, status = [], 0, SUCCESS
+        for instance_id, name, tag in sorted(symbol for symbol in symbols if symbol[0] >= (instance or 0)):
+            entry = Pack.udint(instance_id) + b''.join(self._symbol_attribute(attr, name, tag)
+                                                         for attr in attributes)
+            if size + len(entry) > limit - 4:
+                status = INSUFFICIENT_PACKETS
+                break
+            reply.append(entry)
+            size += len(entry)
+
+        return status, b''.join(reply)
+
+    def _symbol_attribute(self, attribute, name, tag):
+        if attribute == 1:
+            return Pack.uint(len(name)) + name.encode()
+        if attribute == 2:
+            if tag is None:
+                return Pack.uint(_SYMBOL_SYSTEM | 0x68)
+            typ = tag['data_type']
+            symbol_type = DataType[typ] if isinstance(typ, str) else _SYMBOL_STRUCT | typ['instance_id']
+            return Pack.uint(symbol_type | (len(tag['dims']) << 13))
+        if attribute in (3, 5):
+            return Pack.udint(tag['instance_id'] << 8 if tag else 0)
+        if attribute == 6:
+            return Pack.udint(BASE_TAG_BIT)
+        if attribute == 8:
+            dims = (tag['dims'] if tag else []) + [0, 0, 0]
+            return b''.join(Pack.udint(d) for d in dims[:3])
+        if attribute == 10:
+            return Pack.usint(tag['external_access'] if tag else 0)
+        raise _ServiceError(0x14)  # attribute not supported
+
+    def _get_template_attribute_list(self, client, path, instance, data, limit):
+        data_type = self._template(instance)
+        attributes = {
+            1: Pack.uint(data_type['handle']),
+            2: Pack.uint(len(data_type['members'])),
+            4: Pack.udint(math.ceil((len(data_type['template']) + _TEMPLATE_READ_OVERHEAD) / 4)),
+            5: Pack.udint(data_type['size']),
+        }
+        return SUCCESS, _attribute_list(data, attributes)
+
+    def _read_template(self, client, path, instance, data, limit):
+        template = self._template(instance)['template']
+        offset, length = Unpack.udint(data), Unpack.uint(data[4:])
+        chunk = template[offset: offset + min(length, limit - 4)]
+        status = SUCCESS if offset + len(chunk) >= len(template) else INSUFFICIENT_PACKETS
+        return status, chunk
+
+    def _template(self, instance):
+        for data_type in self._data_types.values():
+            if data_type['instance_id'] == instance:
+                return data_type
+        raise _ServiceError(0x05)
+
+    def _read_tag(self, client, path, instance, data, limit):
+        elements = Unpack.uint(data)
+        return self._read_data(self._resolve(path), elements, 0, limit)
+
+    def _read_tag_fragmented(self, client, path, instance, data, limit):
+        elements, offset = Unpack.uint(data), Unpack.udint(data[2:])
+        return self._read_data(self._resolve(path), elements, offset, limit)
+
+    def _read_data(self, ref, elements, offset, limit):
+        data, typ, start, count, bit = ref
+        if elements > count:
+            raise _ServiceError(_GENERAL_ERROR, 0x2105)  # access beyond end of object
+
+        if bit is not None:
+            type_header = Pack.uint(DataType.bool)
+            value = b'\x01' if data[start] & (1 << bit) else b'\x00'
+        else:
+            type_header = _type_header(typ)
+            value = data[start: start + _sizeof(typ) * elements]
+
+        # like the controller, a (non-fragmented) read that is too large returns a partial reply
+        chunk = value[offset: offset + limit - 4 - len(type_header)]
+        status = SUCCESS if offset + len(chunk) >= len(value) else INSUFFICIENT_PACKETS
+        return status, type_header + bytes(chunk)
+
+    def _write_tag(self, client, path, instance, data, limit):
+        typ_len = 4 if data[:2] == STRUCTURE_READ_REPLY else 2
+        elements = Unpack.uint(data[typ_len:])
+        self._write_data(self._resolve(path), data[:typ_len], elements, 0, data[typ_len + 2:], fragmented=False)
+        return SUCCESS, b''
+
+    def _write_tag_fragmented(self, client, path, instance, data, limit):
+        typ_len = 4 if data[:2] == STRUCTURE_READ_REPLY else 2
+        elements = Unpack.uint(data[typ_len:])
+        offset = Unpack.udint(data[typ_len + 2:])
+        self._write_data(self._resolve(path), data[:typ_len], elements, offset, data[typ_len + 6:], fragmented=True)
+        return SUCCESS, b''
+
+    def _write_data(self, ref, type_header, elements, offset, value, fragmented):
+        data, typ, start, count, bit = ref
+
+        if bit is not None:
+            if type_header != Pack.uint(DataType.bool) or elements != 1:
+                raise _ServiceError(_GENERAL_ERROR, 0x2107)  # type mismatch
+            if value[0]:
+                data[start] |= 1 << bit
+            else:
+                data[start] &= ~(1 << bit) & 0xFF
+            return
+
+        if type_header != _type_header(typ):
+            raise _ServiceError(_GENERAL_ERROR, 0x2107)
+        if elements > count:
+            raise _ServiceError(_GENERAL_ERROR, 0x2105)
+
+        size = _sizeof(typ) * elements
+        if offset + len(value) > size:
+            raise _ServiceError(0x15)  # too much data
+        if not fragmented and len(value) < size:
+            raise _ServiceError(0x13)  # not enough data
+
+        data[start + offset: start + offset + len(value)] = value
+
+    def _read_modify_write(self, client, path, instance, data, limit):
+        data_, typ, start, count, bit = self._resolve(path)
+        mask_size = Unpack.uint(data)
+        if bit is not None or mask_size != _sizeof(typ):
+            raise _ServiceError(_GENERAL_ERROR, 0x2107)
+
+        or_mask = int.from_bytes(data[2:2 + mask_size], 'little')
+        and_mask = int.from_bytes(data[2 + mask_size:2 + mask_size * 2], 'little')
+        value = int.from_bytes(data_[start:start + mask_size], 'little')
+        data_[start: start + mask_size] = ((value & and_mask) | or_mask).to_bytes(mask_size, 'little')
+        return SUCCESS, b''
+
+    def _multiple_service_request(self, client, path, instance, data, limit):
+        count = Unpack.uint(data)
+        offsets = [Unpack.uint(data[i:]) for i in range(2, 2 + count * 2, 2)] + [len(data)]
+        replies = [self._handle_message(client, data[start:end], {'size': limit})
+                   for start, end in zip(offsets, offsets[1:])]
+
+        reply_offset = 2 + count * 2
+        reply_offsets = []
+        for reply in replies:
+            reply_offsets.append(Pack.uint(reply_offset))
+            reply_offset += len(reply)
+
+        status = SUCCESS if all(reply[2] in (SUCCESS, INSUFFICIENT_PACKETS) for reply in replies) else 0x1E
+        return status, Pack.uint(count) + b''.join(reply_offsets) + b''.join(replies)
+
+    def _resolve(self, path):
+        """
+        Finds the data referenced by the request path.
+
+        :return: (tag data, data type, offset, elements available, bit)
+        """
+        path = [seg for seg in path if seg[0] != 'class']
+        kind, value = path[0]
+        scope = self._tags
+        if kind == 'symbol' and value.lower().startswith('program:') and len(path) > 1:
+            program = self._programs.get(value[8:].lower())
+            if program is None:
+                raise _ServiceError(0x05)
+            scope = program['tags']
+            path = path[1:]
+            kind, value = path[0]
+
+        tag = scope.get(value.lower()) if kind == 'symbol' else self._instances.get(value)
+        if tag is None:
+            raise _ServiceError(0x05)
+
+        typ, dims, offset, bit = tag['data_type'], tag['dims'], 0, None
+        count = _prod(dims)
+        i = 1
+        while i < len(path):
+            kind, value = path[i]
+            if kind == 'element':
+                indexes = []
+                while i < len(path) and path[i][0] == 'element':
+                    indexes.append(path[i][1])
+                    i += 1
+                if not dims or len(indexes) > len(dims) or any(x >= d for x, d in zip(indexes, dims)):
+                    raise _ServiceError(_GENERAL_ERROR, 0x2105)
+                index = 0
+                for d, x in zip(dims, indexes + [0] * (len(dims) - len(indexes))):
+                    index = index * d + x
+                offset += index * _sizeof(typ)
+                count -= index
+                dims = []
+                continue
+
+            if kind != 'symbol' or isinstance(typ, str) or bit is not None:
+                raise _ServiceError(0x05)
+            member = typ['lookup'].get(value.lower())
+            if member is None:
+                raise _ServiceError(0x05)
+            offset += member['offset']
+            typ, bit = member['data_type'], member['bit']
+            dims = [member['array']] if member['array'] else []
+            count = member['array'] or 1
+            i += 1
+
+        return tag['data'], typ, offset, count, bit
+
+    def _pccc(self, client, path, instance, data, limit):
+        requestor = data[:data[0]]
+        request = data[data[0]:]
+        command, tns, function = request[0], request[2:4], request[4:5]
+
+        try:
+            if command == _PCCC_DIAGNOSTIC_STATUS:
+                reply = bytes(5) + self.processor_type.ljust(11)[:11].encode() + bytes(8)
+            elif function in (SLC_FNC_READ, SLC_FNC_WRITE, SLC_FNC_MASKED_WRITE):
+                size, idx = request[5], 6
+                file_number, idx = _pccc_address_field(request, idx)
+                file_type = PCCC_DATA_TYPE.get(request[idx:idx + 1])
+                element, idx = _pccc_address_field(request, idx + 1)
+                sub_element, idx = _pccc_address_field(request, idx)
+                file = self._data_files.get((file_type, file_number))
+                if file is None:
+                    raise _ServiceError(_PCCC_ILLEGAL_COMMAND)
+
+                start = element * PCCC_DATA_SIZE[file_type] + sub_element * 2
+                if start + size > len(file):
+                    raise _ServiceError(_PCCC_ILLEGAL_COMMAND)
+
+                if function == SLC_FNC_READ:
+                    reply = bytes(file[start:start + size])
+                elif function == SLC_FNC_WRITE:
+                    _pccc_write(file, start, size, request[idx:])
+                    reply = b''
+                else:
+                    _pccc_masked_write(file, start, size, request[idx:])
+                    reply = b''
+            else:
+                raise _ServiceError(_PCCC_ILLEGAL_COMMAND)
+            status = SUCCESS
+        except _ServiceError as err:
+            reply, status = b'', err.status
+
+        return SUCCESS, requestor + bytes((command | 0x40, status)) + tns + reply
+
+    _services = {
+        (CommonService.get_attributes_all, ClassCode.identity_object): _get_attributes_all,
+        (CommonService.get_attribute_list, ClassCode.program_name): _get_controller_name,
+        (CommonService.get_attribute_list, ClassCode.controller_change): _get_change_counters,
+        (CommonService.get_attribute_list, ClassCode.wall_clock_time): _get_wall_clock,
+        (CommonService.set_attribute_list, ClassCode.wall_clock_time): _set_wall_clock,
+        (CommonService.multiple_service_request, ClassCode.message_router): _multiple_service_request,
+        (TagService.get_instance_attribute_list, ClassCode.symbol_object): _get_instance_attribute_list,
+        (CommonService.get_attribute_list, ClassCode.template_object): _get_template_attribute_list,
+        (TagService.read_tag, ClassCode.template_object): _read_template,
+        (TagService.read_tag, None): _read_tag,
+        (TagService.read_tag_fragmented, None): _read_tag_fragmented,
+        (TagService.write_tag, None): _write_tag,
+        (TagService.write_tag_fragmented, None): _write_tag_fragmented,
+        (TagService.read_modify_write, None): _read_modify_write,
+        (b'\x4b', b'\x67'): _pccc,  # Execute PCCC, PCCC object
+    }
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, handler, simulator):
+        self.simulator = simulator
+        super().__init__(address, handler)
+
+
+class _UDPServer(socketserver.ThreadingUDPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, handler, simulator):
+        self.simulator = simulator
+        super().__init__(address, handler)
+
+
+class _ListIdentityHandler(socketserver.BaseRequestHandler):
+    """
+    Replies to ListIdentity requests sent over UDP, other commands are ignored
+    """
+
+    def handle(self):
+        packet, sock = self.request
+        if packet[:2] == EncapsulationCommand.list_identity and len(packet) >= 24:
+            simulator = self.server.simulator
+            reply = _encap_reply(EncapsulationCommand.list_identity,
+                                 simulator._list_identity_item({'address': self.server.server_address}),
+                                 context=packet[12:20])
+            sock.sendto(reply, self.client_address)
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    __log = logging.getLogger(f'{__module__}.{__qualname__}')
+
+    def handle(self):
+        simulator = self.server.simulator
+        client = {'session': None, 'connections': {}, 'address': self.server.server_address}
+        simulator._clients.add(self.request)
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            while True:
+                header = self._recv(24)
+                if header is None:
+                    break
+                payload = self._recv(Unpack.uint(header[2:4]))
+                if payload is None:
+                    break
+                packet = header + payload
+                self.__log.debug(f'Received: {packet!r}')
+                reply = simulator._handle(client, packet)
+                if client['session'] is None and packet[:2] == EncapsulationCommand.unregister_session:
+                    break
+                if reply is not None:
+                    if simulator.latency:
+                        time.sleep(simulator.latency)
+                    self.request.sendall(reply)
+        except OSError:
+            ...
+        finally:
+            simulator._clients.discard(self.request)
+
+    def _recv(self, size):
+        data = b''
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+
+def _encap_reply(command, data, session=0, status=SUCCESS, context=b'\x00' * 8):
+    return b''.join((command, Pack.uint(len(data)), Pack.udint(session), Pack.udint(status), context,
+                     b'\x00\x00\x00\x00', data))
+
+
+def _parse_cpf(data):
+    count = Unpack.uint(data)
+    items, idx = [], 2
+    for _ in range(count):
+        length = Unpack.uint(data[idx + 2:])
+        items.append((data[idx:idx + 2], data[idx + 4: idx + 4 + length]))
+        idx += 4 + length
+    return items
+
+
+def _build_cpf(items):
+    return b''.join((
+        b'\x00\x00\x00\x00',  # interface handle
+        b'\x00\x00',  # timeout
+        Pack.uint(len(items)),
+        *(typ + Pack.uint(len(data)) + data for typ, data in items)
+    ))
+
+
+def _service_reply(service, status=SUCCESS, *extended, data=b''):
+    return b''.join((
+        bytes((service | _SERVICE_REPLY, 0, status, len(extended))),
+        *(Pack.uint(ext) for ext in extended),
+        data
+    ))
+
+
+def _parse_path(path):
+    """
+    Parses a padded EPATH into a list of (segment type, value) tuples
+    """
+    segments = []
+    idx = 0
+    while idx < len(path):
+        segment = path[idx]
+        if segment == 0x91:
+            length = path[idx + 1]
+            segments.append(('symbol', path[idx + 2: idx + 2 + length].decode()))
+            idx += 2 + length + (length % 2)
+            continue
+
+        kind = {0x20: 'class', 0x24: 'instance', 0x28: 'element', 0x30: 'attribute'}[segment & 0b1111_1100]
+        fmt = segment & 0b11
+        if fmt == 0:
+            value, idx = path[idx + 1], idx + 2
+        elif fmt == 1:
+            value, idx = Unpack.uint(path[idx + 2:]), idx + 4
+        else:
+            value, idx = Unpack.udint(path[idx + 2:]), idx + 6
+        segments.append((kind, value))
+
+    return segments
+
+
+def _attribute_list(request, attributes):
+    count = Unpack.uint(request)
+    reply = [Pack.uint(count)]
+    for i in range(2, 2 + count * 2, 2):
+        attr = Unpack.uint(request[i:])
+        value = attributes.get(attr)
+        if value is None:
+            reply.append(Pack.uint(attr) + Pack.uint(0x14))  # attribute not supported
+        else:
+            reply.append(Pack.uint(attr) + Pack.uint(SUCCESS) + value)
+    return b''.join(reply)
+
+
+def _pccc_address_field(data, idx):
+    if data[idx] == 0xFF:
+        return Unpack.uint(data[idx + 1:]), idx + 3
+    return data[idx], idx + 1
+
+
+def _pccc_write(file, start, size, value):
+    if len(value) != size:
+        raise _ServiceError(_PCCC_ILLEGAL_COMMAND)
+    file[start:start + size] = value
+
+
+def _pccc_masked_write(file, start, size, value):
+    """
+    The data of a masked write is the mask followed by the value, each ``size`` bytes.  Only the bits set in the mask
+    are changed.
+    """
+    if len(value) != size * 2:
+        raise _ServiceError(_PCCC_ILLEGAL_COMMAND)
+    mask = int.from_bytes(value[:size], 'little')
+    data = int.from_bytes(value[size:], 'little')
+    current = int.from_bytes(file[start:start + size], 'little')
+    file[start:start + size] = ((current & ~mask) | (data & mask)).to_bytes(size, 'little')
+
+
+def _type_header(typ):
+    if isinstance(typ, str):
+        return Pack.uint(DataType[typ])
+    return STRUCTURE_READ_REPLY + Pack.uint(typ['handle'])
+
+
+def _template_data(data_type):
+    """
+    Builds the template definition, as returned by reading the Template object:
+    the member info (array size or bit, data type, offset) for each member, followed by the NULL terminated
+    names of the template and the members.
+    """
+    info, names = [], []
+    for name, member in data_type['members'].items():
+        typ = member['data_type']
+        if member['bit'] is not None:
+            type_info, type_code = member['bit'], DataType.bool
+        elif isinstance(typ, str):
+            type_info, type_code = member['array'], DataType[typ] | (0x2000 if member['array'] else 0)
+        else:
+            type_info, type_code = member['array'], _SYMBOL_STRUCT | typ['instance_id']
+        info.append(Pack.uint(type_info) + Pack.uint(type_code) + Pack.udint(member['offset']))
+        names.append(name.encode() + b'\x00')
+
+    template_name = 'ASCIISTRING82' if data_type['name'] == 'STRING' else data_type['name']
+    return b''.join(info) + f'{template_name};n'.encode() + b'\x00' + b''.join(names)
+
+
+def _member(name, data_type, offset, array=0, bit=None, hidden=False):
+    return {'name': name, 'data_type': data_type, 'offset': offset, 'array': array, 'bit': bit, 'hidden': hidden}
+
+
+def _normalize_members(definition):
+    """
+    Converts the ``{member: data type}`` form of a UDT definition into a list of member dicts
+    """
+    if not isinstance(definition, dict):
+        return definition
+
+    members = []
+    for name, data_type in definition.items():
+        type_name, dims = _parse_data_type(data_type)
+        members.append({'name': name, 'type': type_name, 'dim': dims[0] if dims else 0})
+    return members
+
+
+def _parse_data_type(data_type):
+    match = re.fullmatch(r'\s*(?P<type>[\w:]+)\s*(\[(?P<dims>[\d,\s]+)\])?\s*', data_type)
+    if match is None:
+        raise ValueError(f'Invalid data type: {data_type}')
+    dims = [int(d) for d in match['dims'].split(',')] if match['dims'] else []
+    return match['type'], dims
+
+
+def _tag_spec(spec):
+    if isinstance(spec, str):
+        return spec, None
+    data_type, *value = spec
+    return data_type, (value[0] if value else None)
+
+
+def _sizeof(typ):
+    return _ATOMIC_SIZES[typ] if isinstance(typ, str) else typ['size']
+
+
+def _alignof(typ):
+    return _ATOMIC_SIZES[typ] if isinstance(typ, str) else typ['align']
+
+
+def _round_up(value, align):
+    return -(-value // align) * align
+
+
+def _prod(dims):
+    return math.prod(dims) if dims else 1
+
+
+def _encode(typ, value, count=1):
+    """
+    Encodes a value (or list of values for arrays) into the bytes for the data type
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return value
+
+    if count > 1 or isinstance(value, (list, tuple)):
+        values = list(value)
+        if typ == 'DWORD' and values and isinstance(values[0], bool):
+            values = [sum(1 << i for i, bit in enumerate(values[j:j + 32]) if bit) for j in range(0, len(values), 32)]
+        values += [None] * (count - len(values))
+        return b''.join(_encode(typ, val) for val in values[:count])
+
+    size = _sizeof(typ)
+    if value is None:
+        return bytes(size)
+
+    if isinstance(typ, str):
+        if typ == 'BOOL':
+            return b'\x01' if value else b'\x00'
+        if isinstance(value, str):
+            value = ord(value) if len(value) == 1 else 0
+        fmt = _ATOMIC_FORMATS[typ]
+        if fmt in 'bhiq' and not isinstance(value, float):  # values from binary/hex radix may be unsigned
+            bits = size * 8
+            value = value & ((1 << bits) - 1)
+            value = value - (1 << bits) if value >= 1 << (bits - 1) else value
+        return struct.pack(f'<{fmt}', value)
+
+    data = bytearray(size)
+    if isinstance(value, str) and typ['string']:
+        value = {'LEN': len(value), 'DATA': value}
+    for name, val in value.items():
+        member = typ['lookup'].get(name.lower())
+        if member is None:
+            continue
+        if member['bit'] is not None:
+            if val:
+                data[member['offset']] |= 1 << member['bit']
+            continue
+        if isinstance(val, str) and member['array']:
+            val = val.encode('latin-1')[:member['array']].ljust(member['array'], b'\x00')
+        encoded = _encode(member['data_type'], val, member['array'] or 1)
+        data[member['offset']: member['offset'] + len(encoded)] = encoded
+    return bytes(data)
+
+
+def _l5x_member(member):
+    return {
+        'name': member.get('Name'),
+        'type': member.get('DataType'),
+        'dim': int(member.get('Dimension', 0)),
+        'hidden': member.get('Hidden') == 'true',
+        'target': member.get('Target'),
+        'bit': int(member.get('BitNumber', 0)),
+    }
+
+
+def _l5x_aoi_members(aoi):
+    """
+    AOIs store their BOOL parameters and local tags as bits in hidden DINTs, followed by the other parameters and
+    local tags. InOut parameters are references and do not take any space in the simulator.
+    """
+    name = aoi.get('Name')
+    tags = [tag for tag in aoi.iterfind('Parameters/Parameter') if tag.get('Usage') != 'InOut']
+    tags += list(aoi.iterfind('LocalTags/LocalTag'))
+
+    bools = [tag.get('Name') for tag in tags if tag.get('DataType') == 'BOOL' and not tag.get('Dimensions')]
+    members = []
+    for i in range(0, len(bools), 32):
+        host = f'{_HIDDEN_HOST_PREFIX}{name}{i // 32}'
+        members.append({'name': host, 'type': 'DINT', 'hidden': True})
+        members += [{'name': bool_name, 'type': 'BIT', 'target': host, 'bit': bit}
+                    for bit, bool_name in enumerate(bools[i:i + 32])]
+
+    for tag in tags:
+        if tag.get('Name') not in bools:
+            members.append({'name': tag.get('Name'), 'type': tag.get('DataType'),
+                            'dim': int(tag.get('Dimensions', 0))})
+
+    return members
+
+
+def _l5x_value(element):
+    """
+    Converts the decorated data of a tag into python values
+    """
+    if element.tag in ('Structure', 'StructureMember'):
+        return {child.get('Name'): _l5x_value(child) for child in element}
+
+    if element.tag in ('Array', 'ArrayMember'):
+        return [_l5x_value(child[0]) if len(child) else _l5x_scalar(child.get('Value'), element.get('DataType'))
+                for child in element]
+
+    if element.get('Value') is None:  # string data
+        return _l5x_string(element.text)
+
+    return _l5x_scalar(element.get('Value'), element.get('DataType'))
+
+
+def _l5x_scalar(value, data_type):
+    value = value.replace('_', '')
+    if data_type in ('REAL', 'LREAL'):
+        try:
+            return float(value)
+        except ValueError:
+            return 0.0
+
+    if value.startswith("'"):
+        return ord(_l5x_string(value) or '\x00')
+
+    radix, _, digits = value.rpartition('#')
+    return int(digits, int(radix)) if radix else int(digits)
+
+
+def _l5x_string(text):
+    text = (text or '').strip()
+    if text.startswith("'") and text.endswith("'"):
+        text = text[1:-1]
+
+    escapes = {'$': '$', "'": "'", 'L': '\n', 'N': '\n', 'P': '\f', 'R': '\r', 'T': '\t'}
+    chars, idx = [], 0
+    while idx < len(text):
+        char = text[idx]
+        if char == '$' and idx + 1 < len(text):
+            if text[idx + 1].upper() in escapes:
+                chars.append(escapes[text[idx + 1].upper()])
+                idx += 2
+            else:
+                chars.append(chr(int(text[idx + 1:idx + 3], 16)))
+                idx += 3
+        else:
+            chars.append(char)
+            idx += 1
+    return ''.join(chars)
@@ -25,14 +25,15 @@
 __all__ = ['SLCDriver', ]
 
 import logging
-import math
 import re
-from typing import List, Tuple, Optional, Union
+from typing import List, Tuple, Optional, Union, NamedTuple
 
+from . import util
 from .bytes_ import Pack, Unpack
 from .cip_base import CIPDriver, with_forward_open
 from .const import (CLASS_TYPE, SUCCESS, PCCC_CT, PCCC_DATA_TYPE, PCCC_DATA_SIZE, PCCC_ERROR_CODE,
-                    SLC_CMD_CODE, SLC_FNC_READ, SLC_FNC_WRITE, SLC_REPLY_START, PCCC_PATH)
+                    SLC_CMD_CODE, SLC_FNC_READ, SLC_FNC_WRITE, SLC_FNC_MASKED_WRITE, SLC_REPLY_START, SLC_MAX_DATA_SIZE, PCCC_PATH,
+                    SLC_ADDRESS_CACHE_SIZE)
 from .exceptions import DataError, RequestError
 from .tag import Tag
 from .packets.requests import wrap_unconnected_send
@@ -73,23 +74,95 @@ class SLCDriver(CIPDriver):
         Reads data file addresses. To read multiple words add the word count to the address using curly braces,
         e.g. ``N120:10{10}``.
 
-        Does not track request/response size like the CLXDriver.
+        Addresses in the same data file are combined into reads of contiguous ranges of elements, each read limited
+        to the max size of a typed read.  If a combined read fails, its addresses are read separately.  The reads
+        are sent using the :attr:`pipeline_window`, so targets that support more than one outstanding request can
+        have many reads in flight at once.
 
         :param addresses: one or many data file addresses to read
         :return: a single or list of ``Tag`` objects
         """
-        results = [self._read_tag(tag) for tag in addresses]
+        parsed_tags = []
+        for tag in addresses:
+            _tag = parse_tag(tag)
+            if _tag is None:
+                raise RequestError(f"Error parsing the tag passed to read() - {tag}")
+            parsed_tags.append(_tag)
+
+        ranges, tag_ranges = _merge_read_ranges(parsed_tags)
+        self._read_ranges(ranges)
+        self._read_separately(parsed_tags, tag_ranges)
+        results = [self._read_result(_tag, tag_range) for _tag, tag_range in zip(parsed_tags, tag_ranges)]
 
         if len(results) == 1:
             return results[0]
 
         return results
 
-    def _read_tag(self, tag) -> Tag:
-        _tag = parse_tag(tag)
-        if _tag is None:
-            raise RequestError(f"Error parsing the tag passed to read() - {tag}")
+    def _read_ranges(self, ranges):
+        """
+        Reads the data for each range, splitting ranges larger than a single read into multiple requests
+        """
+        requests = {}
+        for _range in ranges:
+            for element, count in _range_chunks(_range):
+                request = self._new_pccc_request(SLC_FNC_READ, _range, element, count)
+                requests[request] = (_range, element, count)
+
+        for request, response in self._send_pipelined(requests):
+            _range, element, count = requests[request]
+            if _range['error'] is not None:
+                continue
+
+            if isinstance(response, Exception):
+                _range['error'] = str(response)
+                continue
+
+            status = request_status(response.raw)
+            data = response.raw[SLC_REPLY_START:]
+            size = _range['data_size'] * count
+            if status is None and len(data) < size:
+                status = 'Insufficient data in reply'
+
+            if status is not None:
+                _range['error'] = status
+            else:
+                offset = (element - _range['element']) * _range['data_size']
+                _range['data'][offset:offset + size] = data[:size]
+
+    def _read_separately(self, parsed_tags, tag_ranges):
+        """
+        Reads separately the addresses in combined ranges that failed, so an invalid address (or one past the end of
+        the data file) only fails its own read.  ``tag_ranges`` is updated with the ranges of the separate reads.
+        """
+        separate = {}
+        for i, (_range, offset, size) in enumerate(tag_ranges):
+            if _range['error'] is not None and _range['merge'] and size < len(_range['data']):
+                separate[i] = _merge_read_ranges([parsed_tags[i]])
+
+        if not separate:
+            return
+        self.__log.info(f'Combined read failed, reading {len(separate)} address(es) separately')
+        self._read_ranges([_range for ranges, _ in separate.values() for _range in ranges])
+        for i, (_, (tag_range, )) in separate.items():
+            tag_ranges[i] = tag_range
+
+    def _read_result(self, _tag, tag_range) -> Tag:
+        _range, offset, size = tag_range
+        if _range['error'] is not None:
+            return Tag(_tag.tag, None, _tag.file_type, _range['error'])
 
+        try:
+            self.__log.debug(f"SLC read_tag({_tag.tag})")
+            return _parse_read_reply(_tag, bytes(_range['data'][offset:offset + size]))
+        except DataError as err:
+            self.__log.exception(f'Failed to parse read reply for {_tag.tag}')
+            return Tag(_tag.tag, None, _tag.file_type, str(err))
+
+    def _new_pccc_request(self, function, _range, element, count, value=b''):
+        """
+        Creates the request for a protected typed logical read or write of ``count`` elements
+        """
         message_request = [
             self._msg_start(),
 
@@ -97,28 +170,18 @@ class SLCDriver(CIPDriver):
             SLC_CMD_CODE,  # request command code
             b'\x00',  # status code
             Pack.uint(self._sequence),  # transaction identifier
-            SLC_FNC_READ,  # function code
-            Pack.usint(PCCC_DATA_SIZE[_tag['file_type']] * _tag['element_count']),  # byte size
-            Pack.usint(int(_tag['file_number'])),
-            PCCC_DATA_TYPE[_tag['file_type']],
-            Pack.usint(int(_tag['element_number'])),
-            Pack.usint(int(_tag.get('pos_number', 0)))  # sub-element number
+            function,  # function code
+            Pack.usint(_range['data_size'] * count),  # byte size
+            _range['file_address'],  # file number and type
+            _pccc_address(element),
+            _pccc_address(_range['pos_number'] or 0),  # sub-element number
+            value,
         ]
 
         request = self.new_request('send_unit_data')
         request.add(b''.join(message_request))
-        response = request.send()
-        self.__log.debug(f"SLC read_tag({tag})")
-
-        status = request_status(response.raw)
-        if status is not None:
-            return Tag(_tag['tag'], None, _tag['file_type'], status)
-
-        try:
-            return _parse_read_reply(_tag, response.raw[SLC_REPLY_START:])
-        except DataError as err:
-            self.__log.exception(f'Failed to parse read reply for {_tag["tag"]}')
-            return Tag(_tag['tag'], None, _tag['file_type'], str(err))
+        request.can_pipeline = True
+        return request
 
     @with_forward_open
     def write(self, *address_values: Tuple[str, TagValueType]) -> ReadWriteReturnType:
@@ -126,57 +189,60 @@ class SLCDriver(CIPDriver):
         Write values to data file addresses.  To write to multiple words in a file use curly braces in the address
         to indicate the number of words, then set the value to a list of values to write e.g. ``('N120:10{10}', [1, 2, ...])``.
 
-        Does not track request/response size like the CLXDriver.
-
+        Writes to contiguous elements in the same data file are combined into a single write (split to fit the max
+        size of a typed write), unless any of the writes to that file overlap, then they are all written separately
+        in the order given.  Bit and sub-element (like ``T4:0.PRE``) writes are always written separately using a
+        masked write.  Like :meth:`read`, writes are sent using the :attr:`pipeline_window`.
 
         :param address_values: one or many 2-element tuples of (address, value)
-        :return: a single or list of ``Tag`` objects
+        :return: a single or list of ``Tag`` objects, the result of a combined write is the result for each address
         """
-        results = [self._write_tag(tag, value) for tag, value in address_values]
+        parsed_tags = []
+        for tag, value in address_values:
+            _tag = parse_tag(tag)
+            if _tag is None:
+                raise RequestError(f"Error parsing the tag passed to write() - {tag}")
+            parsed_tags.append((_tag, value))
+
+        ranges, tag_ranges = _merge_write_ranges(parsed_tags)
+        self._write_ranges(ranges)
+        results = [self._write_result(_tag, value, _range) for (_tag, value), _range in zip(parsed_tags, tag_ranges)]
 
         if len(results) == 1:
             return results[0]
 
         return results
 
-    def _write_tag(self, tag: str, value: TagValueType) -> Tag:
-        """ write tag from a connected plc
-        Possible combination can be passed to this method:
-            c.write_tag('N7:0', [-30, 32767, -32767])
-            c.write_tag('N7:0', 21)
-            c.read_tag('N7:0', 10)
-        It is not possible to write status bit
-        :return: None is returned in case of error
+    def _write_ranges(self, ranges):
         """
-        _tag = parse_tag(tag)
-        if _tag is None:
-            raise RequestError(f"Error parsing the tag passed to write() - {tag}")
-
-        _tag['data_size'] = PCCC_DATA_SIZE[_tag['file_type']]
-
-        message_request = [
-            self._msg_start(),
-
-            SLC_CMD_CODE,
-            b'\x00',
-            Pack.uint(self._sequence),
-            SLC_FNC_WRITE,
-            Pack.usint(_tag['data_size'] * _tag['element_count']),
-            Pack.usint(int(_tag['file_number'])),
-            PCCC_DATA_TYPE[_tag['file_type']],
-            Pack.usint(int(_tag['element_number'])),
-            Pack.usint(int(_tag.get('pos_number', 0))),
-            writeable_value(_tag, value),
-        ]
-        request = self.new_request('send_unit_data')
-        request.add(b''.join(message_request))
-        response = request.send()
+        Writes the data for each range, splitting ranges larger than a single write into multiple requests
+        """
+        requests = {}
+        for _range in ranges:
+            for element, count in _range_chunks(_range):
+                if _range['merge']:
+                    offset = (element - _range['element']) * _range['data_size']
+                    data = _range['data'][offset:offset + count * _range['data_size']]
+                else:
+                    data = _range['data']
+                function = SLC_FNC_MASKED_WRITE if _range['masked'] else SLC_FNC_WRITE
+                request = self._new_pccc_request(function, _range, element, count, bytes(data))
+                requests[request] = _range
+
+        for request, response in self._send_pipelined(requests):
+            _range = requests[request]
+            if _range['error'] is None:
+                if isinstance(response, Exception):
+                    _range['error'] = str(response)
+                else:
+                    _range['error'] = request_status(response.raw)
 
-        status = request_status(response.raw)
-        if status is not None:
-            return Tag(_tag['tag'], None, _tag['file_type'], status)
+    def _write_result(self, _tag, value, _range) -> Tag:
+        self.__log.debug(f"SLC write_tag({_tag.tag})")
+        if _range['error'] is not None:
+            return Tag(_tag.tag, None, _tag.file_type, _range['error'])
 
-        return Tag(_tag['tag'], value, _tag['file_type'], None)
+        return Tag(_tag.tag, value, _tag.file_type, None)
 
     @with_forward_open
     def get_processor_type(self):
@@ -195,7 +261,7 @@ class SLCDriver(CIPDriver):
         response = request.send()
         if response:
             try:
-                typ = response.raw[SLC_REPLY_START:][5:16].decode('utf-8').strip()
+                typ = bytes(response.raw[SLC_REPLY_START:][5:16]).decode('utf-8').strip()
             except Exception as err:
                 self.__log.exception('failed getting processor type')
                 typ = None
@@ -294,6 +360,138 @@ class SLCDriver(CIPDriver):
         return file0_data
 
 
+def _merge_read_ranges(parsed_tags) -> Tuple[List[dict], List[tuple]]:
+    """
+    Combines the reads for addresses in the same data file into ranges of contiguous (or overlapping) elements.
+    Returns the ranges and, for each address, a tuple of ``(range, byte offset, byte size)`` for its data in
+    the range.  I/O addresses include a word position within the element, so they are always read by themselves.
+    """
+    groups = {}
+    ranges = []
+    tag_ranges = [None] * len(parsed_tags)
+    for i, _tag in enumerate(parsed_tags):
+        count = _tag.element_count if _tag.address_field == 2 else 1
+        if _tag.pos_number is not None:
+            _range = _new_range(_tag, _tag.element_number, count, _tag.pos_number, merge=False)
+            ranges.append(_range)
+            tag_ranges[i] = (_range, 0, count * _tag.data_size)
+        else:
+            groups.setdefault(_tag.file_address, []).append((_tag.element_number, count, i))
+
+    for tags in groups.values():
+        tags.sort(key=lambda t: t[0])
+        _range = None
+        for element, count, i in tags:
+            if _range is None or element > _range['element'] + _range['count']:
+                _range = _new_range(parsed_tags[i], element, count)
+                ranges.append(_range)
+            else:
+                _range['count'] = max(_range['count'], element + count - _range['element'])
+            data_size = _range['data_size']
+            tag_ranges[i] = (_range, (element - _range['element']) * data_size, count * data_size)
+
+    for _range in ranges:
+        _range['data'] = bytearray(_range['count'] * _range['data_size'])
+
+    return ranges, tag_ranges
+
+
+def _merge_write_ranges(parsed_tags) -> Tuple[List[dict], List[dict]]:
+    """
+    Combines the writes for addresses in the same data file into ranges of contiguous elements, the data of each
+    range is the writeable values of the addresses in it.  If any writes to a data file overlap, none of the writes
+    to that file are combined so they are still written in order.  Bit, sub-element and I/O writes are never
+    combined, see :func:`_single_write_range`.  Returns the ranges and the range for each address.
+    """
+    groups = {}
+    ranges = []
+    tag_ranges = [None] * len(parsed_tags)
+    for i, (_tag, value) in enumerate(parsed_tags):
+        data = writeable_value(_tag, value)
+        if _tag.pos_number is not None:
+            _range = _single_write_range(_tag, data)
+            ranges.append(_range)
+            tag_ranges[i] = _range
+        else:
+            count = 1 if _tag.address_field == 3 else _tag.element_count
+            groups.setdefault(_tag.file_address, []).append((_tag.element_number, count, i, data))
+
+    for tags in groups.values():
+        ordered = sorted(tags, key=lambda t: t[0])
+        overlapping = any(prev[0] + prev[1] > next_[0] for prev, next_ in zip(ordered, ordered[1:]))
+        _range = None
+        for element, count, i, data in (tags if overlapping else ordered):
+            _tag = parsed_tags[i][0]
+            if _tag.address_field == 3:
+                tag_ranges[i] = _single_write_range(_tag, data)
+                ranges.append(tag_ranges[i])
+                _range = None
+                continue
+
+            if overlapping or _range is None or element != _range['element'] + _range['count']:
+                _range = _new_range(_tag, element, count)
+                _range['data'] = bytearray(data)
+                ranges.append(_range)
+            else:
+                _range['count'] += count
+                _range['data'] += data
+            tag_ranges[i] = _range
+
+    return ranges, tag_ranges
+
+
+def _single_write_range(_tag, data):
+    """
+    Creates the range for a write that is not combined with others, bit and sub-element writes are masked writes
+    of the word containing them
+    """
+    if _tag.address_field == 3:
+        sub_element, size = _masked_write_word(_tag)
+        _range = _new_range(_tag, _tag.element_number, 1, sub_element, merge=False, masked=True)
+        _range['data_size'] = size
+    else:
+        _range = _new_range(_tag, _tag.element_number, _tag.element_count, _tag.pos_number, merge=False)
+    _range['data'] = data
+    return _range
+
+
+def _new_range(_tag, element, count, pos_number=None, merge=True, masked=False):
+    return {
+        'file_type': _tag.file_type,
+        'file_address': _tag.file_address,
+        'data_size': _tag.data_size,
+        'element': element,
+        'pos_number': pos_number,
+        'count': count,
+        'merge': merge,
+        'masked': masked,
+        'data': None,
+        'error': None,
+    }
+
+
+def _range_chunks(_range):
+    """
+    Yields ``(element, count)`` for each read/write needed for the range to fit in the max data size,
+    ranges that are not merged are always a single read/write.
+    """
+    if not _range['merge']:
+        yield _range['element'], _range['count']
+        return
+
+    max_count = max(1, SLC_MAX_DATA_SIZE // _range['data_size'])
+    end = _range['element'] + _range['count']
+    for element in range(_range['element'], end, max_count):
+        yield element, min(max_count, end - element)
+
+
+def _pccc_address(value: int) -> bytes:
+    """
+    Packs an address field, values 255 and greater are packed as ``0xFF`` followed by a UINT
+    """
+    return Pack.usint(value) if value < 255 else b'\xff' + Pack.uint(value)
+
+
 def _parse_file0(sys0_info, data):
     num_data_files = data[52]
     num_lad_files = data[46]
@@ -366,227 +564,168 @@ def _get_sys0_info(plc_type):
 
 def _parse_read_reply(tag, data) -> Tag:
     try:
-        bit_read = tag.get('address_field', 0) == 3
-        bit_position = int(tag.get('sub_element') or 0)
-        data_size = PCCC_DATA_SIZE[tag['file_type']]
-        unpack_func = Unpack[f'pccc_{tag["file_type"].lower()}']
+        bit_read = tag.address_field == 3
+        bit_position = tag.sub_element or 0
+        data_size = tag.data_size
+        unpack_func = Unpack[f'pccc_{tag.file_type.lower()}']
         if bit_read:
             new_value = 0
-            if tag['file_type'] in {'T', 'C'}:
+            if tag.file_type in {'T', 'C'}:
                 if bit_position == PCCC_CT['PRE']:
-                    return Tag(tag['tag'],
+                    return Tag(tag.tag,
                                unpack_func(data[new_value + 2:new_value + 2 + data_size]),
-                               tag['file_type'],
+                               tag.file_type,
                                None)
 
                 elif bit_position == PCCC_CT['ACC']:
-                    return Tag(tag['tag'],
+                    return Tag(tag.tag,
                                unpack_func(data[new_value + 4:new_value + 4 + data_size]),
-                               tag['file_type'],
+                               tag.file_type,
                                None)
 
             tag_value = unpack_func(data[new_value:new_value + data_size])
-            return Tag(tag['tag'],
+            return Tag(tag.tag,
                        get_bit(tag_value, bit_position),
-                       tag['file_type'],
+                       tag.file_type,
                        None)
 
         else:
             values_list = [unpack_func(data[i: i + data_size])
                            for i in range(0, len(data), data_size)]
             if len(values_list) > 1:
-                return Tag(tag['tag'], values_list, tag['file_type'], None)
+                return Tag(tag.tag, values_list, tag.file_type, None)
             else:
-                return Tag(tag['tag'], values_list[0], tag['file_type'], None)
+                return Tag(tag.tag, values_list[0], tag.file_type, None)
     except Exception as err:
         raise DataError('Failed parsing tag read reply') from err
 
 
-def parse_tag(tag: str) -> Optional[dict]:
-    t = re.search(r"(?P<file_type>[CT])(?P<file_number>\d{1,3})"
-                  r"(:)(?P<element_number>\d{1,3})"
-                  r"(.)(?P<sub_element>ACC|PRE|EN|DN|TT|CU|CD|DN|OV|UN|UA)",
-                  tag, flags=re.IGNORECASE)
-    if (
-            t
-            and (1 <= int(t.group('file_number')) <= 255)
-            and (0 <= int(t.group('element_number')) <= 255)
-    ):
-        return {'file_type': t.group('file_type').upper(),
-                'file_number': t.group('file_number'),
-                'element_number': t.group('element_number'),
-                'sub_element': PCCC_CT[t.group('sub_element').upper()],
-                'address_field': 3,
-                'element_count': 1,
-                'tag': t.group(0)}
-
-    t = re.search(r"(?P<file_type>[LFBN])(?P<file_number>\d{1,3})"
-                  r"(:)(?P<element_number>\d{1,3})"
-                  r"(/(?P<sub_element>\d{1,2}))?"
-                  r"(?P<_elem_cnt_token>{(?P<element_count>\d+)})?",
-                  tag, flags=re.IGNORECASE)
-    if t:
-        _cnt = t.group('_elem_cnt_token')
-        tag_name = t.group(0).replace(_cnt, '') if _cnt else t.group(0)
-
-        if t.group('sub_element') is not None:
-            if (
-                    (1 <= int(t.group('file_number')) <= 255)
-                    and (0 <= int(t.group('element_number')) <= 255)
-                    and (0 <= int(t.group('sub_element')) <= 15)
-            ):
-                element_count = t.group('element_count')
-                return {'file_type': t.group('file_type').upper(),
-                        'file_number': t.group('file_number'),
-                        'element_number': t.group('element_number'),
-                        'sub_element': t.group('sub_element'),
-                        'address_field': 3,
-                        'element_count': int(element_count) if element_count is not None else 1,
-                        'tag': tag_name}
-        else:
-            if (
-                    (1 <= int(t.group('file_number')) <= 255)
-                    and (0 <= int(t.group('element_number')) <= 255)
-            ):
-                element_count = t.group('element_count')
-                return {'file_type': t.group('file_type').upper(),
-                        'file_number': t.group('file_number'),
-                        'element_number': t.group('element_number'),
-                        'sub_element': t.group('sub_element'),
-                        'address_field': 2,
-                        'element_count': int(element_count) if element_count is not None else 1,
-                        'tag': tag_name}
-
-    t = re.search(r"(?P<file_type>[IO])(:)(?P<element_number>\d{1,3})"
-                  r"(.)(?P<position_number>\d{1,3})"
-                  r"(/(?P<sub_element>\d{1,2}))?"
-                  r"(?P<_elem_cnt_token>{(?P<element_count>\d+)})?",
-                  tag, flags=re.IGNORECASE)
-    if t:
-        _cnt = t.group('_elem_cnt_token')
-        tag_name = t.group(0).replace(_cnt, '') if _cnt else t.group(0)
-        if t.group('sub_element') is not None:
-            if (
-                    (0 <= int(t.group('file_number')) <= 255)
-                    and (0 <= int(t.group('element_number')) <= 255)
-                    and (0 <= int(t.group('sub_element')) <= 15)
-            ):
-                element_count = t.group('element_count')
-                return {'file_type': t.group('file_type').upper(),
-                        'file_number': '0' if t.group('file_type').upper() == 'O' else '1',
-                        'element_number': t.group('element_number'),
-                        'pos_number': t.group('position_number'),
-                        'sub_element': t.group('sub_element'),
-                        'address_field': 3,
-                        'element_count': int(element_count) if element_count is not None else 1,
-                        'tag': tag_name}
-        else:
-            if 0 <= int(t.group('element_number')) <= 255:
-                element_count = t.group('element_count')
-                return {'file_type': t.group('file_type').upper(),
-                        'file_number': '0' if t.group('file_type').upper() == 'O' else '1',
-                        'element_number': t.group('element_number'),
-                        'pos_number': t.group('position_number'),
-                        'address_field': 2,
-                        'element_count': int(element_count) if element_count is not None else 1,
-                        'tag': tag_name}
-
-    t = re.search(r"(?P<file_type>ST)(?P<file_number>\d{1,3})"
-                  r"(:)(?P<element_number>\d{1,4})"
-                  r"(?P<_elem_cnt_token>{(?P<element_count>[12])})?",
-                  tag, flags=re.IGNORECASE)
-    if (
-            t
-            and (1 <= int(t.group('file_number')) <= 255)
-            and (0 <= int(t.group('element_number')) <= 255)
-    ):
-        _cnt = t.group('_elem_cnt_token')
-        tag_name = t.group(0).replace(_cnt, '') if _cnt else t.group(0)
-        element_number = int(t.group('element_number'))
-        element_count = t.group('element_count')
-        return {'file_type': t.group('file_type').upper(),
-                'file_number': t.group('file_number'),
-                'element_number': element_number,
-                'address_field':  2,
-                'element_count': int(element_count) if element_count is not None else 1,
-                'tag': tag_name}
-
-    t = re.search(r"(?P<file_type>A)(?P<file_number>\d{1,3})"
-                  r"(:)(?P<element_number>\d{1,4})"
-                  r"(?P<_elem_cnt_token>{(?P<element_count>\d+)})?",
-                  tag, flags=re.IGNORECASE)
-    if (
-            t
-            and (1 <= int(t.group('file_number')) <= 255)
-            and (0 <= int(t.group('element_number')) <= 255)
-    ):
-        _cnt = t.group('_elem_cnt_token')
-        tag_name = t.group(0).replace(_cnt, '') if _cnt else t.group(0)
-        element_number = int(t.group('element_number'))
-        element_count = t.group('element_count')
-        return {'file_type': t.group('file_type').upper(),
-                'file_number': t.group('file_number'),
-                'element_number': element_number,
-                'address_field': 2,
-                'element_count': int(element_count) if element_count is not None else 1,
-                'tag': tag_name}
-
-    t = re.search(r"(?P<file_type>S)"
-                  r"(:)(?P<element_number>\d{1,3})"
-                  r"(/(?P<sub_element>\d{1,2}))?"
-                  r"(?P<_elem_cnt_token>{(?P<element_count>\d+)})?",
-                  tag, flags=re.IGNORECASE)
-    if t:
-        _cnt = t.group('_elem_cnt_token')
-        tag_name = t.group(0).replace(_cnt, '') if _cnt else t.group(0)
-        element_count = t.group('element_count')
-        if t.group('sub_element') is not None:
-            if (
-                    (0 <= int(t.group('element_number')) <= 255)
-                    and (0 <= int(t.group('sub_element')) <= 15)
-            ):
-                return {'file_type': t.group('file_type').upper(),
-                        'file_number': '2',
-                        'element_number': t.group('element_number'),
-                        'sub_element': t.group('sub_element'),
-                        'address_field': 3,
-                        'element_count': int(element_count) if element_count is not None else 1,
-                        'tag': t.group(0)}
-        else:
-            if 0 <= int(t.group('element_number')) <= 255:
-                return {'file_type': t.group('file_type').upper(),
-                        'file_number': '2',
-                        'element_number': t.group('element_number'),
-                        'address_field': 2,
-                        'element_count': int(element_count) if element_count is not None else 1,
-                        'tag': tag_name}
-
-    t = re.search(r"(?P<file_type>B)(?P<file_number>\d{1,3})"
-                  r"(/)(?P<element_number>\d{1,4})"
-                  r"(?P<_elem_cnt_token>{(?P<element_count>\d+)})?",
-                  tag, flags=re.IGNORECASE)
-    if (
-            t
-            and (1 <= int(t.group('file_number')) <= 255)
-            and (0 <= int(t.group('element_number')) <= 4095)
-    ):
-        _cnt = t.group('_elem_cnt_token')
-        tag_name = t.group(0).replace(_cnt, '') if _cnt else t.group(0)
-        bit_position = int(t.group('element_number'))
-        element_number = bit_position / 16
-        sub_element = bit_position - (element_number * 16)
-        element_count = t.group('element_count')
-        return {'file_type': t.group('file_type').upper(),
-                'file_number': t.group('file_number'),
-                'element_number': element_number,
-                'sub_element': sub_element,
-                'address_field': 3,
-                'element_count': int(element_count) if element_count is not None else 1,
-                'tag': tag_name}
-
-
-
-    return None
+class PCCCAddress(NamedTuple):
+    """
+    A parsed data file address, the parsed addresses are cached and shared so they must not be modified
+    """
+    tag: str  #: the address without the element count
+    file_type: str
+    file_number: int
+    element_number: int
+    sub_element: Optional[int]  #: bit number or the ``PCCC_CT`` code for timer and counter sub-elements
+    pos_number: Optional[int]  #: word within the slot for I/O addresses
+    address_field: int  #: 2 for element addresses, 3 for bit and sub-element addresses
+    element_count: int
+    data_size: int  #: size of an element in the data file
+    file_address: bytes  #: file number and type fields of the read/write request
+
+
+def parse_tag(tag: str) -> Optional[PCCCAddress]:
+    """
+    Parses a data file address, returns ``None`` if the address is invalid.  Addresses are usually read
+    or written repeatedly, so the parsed addresses are cached.
+    """
+    address = _ADDRESS_CACHE.get(tag)
+    if address is None:
+        for pattern, make_address in _ADDRESS_PATTERNS:
+            match = pattern.search(tag)
+            if match:
+                address = make_address(match)
+                if address is not None:
+                    _ADDRESS_CACHE.set(tag, address)
+                    break
+
+    return address
+
+
+def _new_address(match, file_number, element_number, sub_element=None, pos_number=None, address_field=2):
+    file_type = match['file_type'].upper()
+    count_token = match.groupdict().get('_elem_cnt_token')
+    return PCCCAddress(
+        tag=match[0].replace(count_token, '') if count_token else match[0],
+        file_type=file_type,
+        file_number=file_number,
+        element_number=element_number,
+        sub_element=sub_element,
+        pos_number=pos_number,
+        address_field=address_field,
+        element_count=int(match['element_count']) if count_token else 1,
+        data_size=PCCC_DATA_SIZE[file_type],
+        file_address=_pccc_address(file_number) + PCCC_DATA_TYPE[file_type],
+    )
+
+
+def _timer_counter_address(match):
+    file_number, element_number = int(match['file_number']), int(match['element_number'])
+    if 1 <= file_number <= 255 and 0 <= element_number <= 255:
+        return _new_address(match, file_number, element_number, PCCC_CT[match['sub_element'].upper()],
+                            address_field=3)
+
+
+def _data_file_address(match):
+    file_number, element_number = int(match['file_number']), int(match['element_number'])
+    if 1 <= file_number <= 255 and 0 <= element_number <= 255:
+        return _sub_element_address(match, file_number, element_number)
+
+
+def _io_address(match):
+    file_number = 0 if match['file_type'].upper() == 'O' else 1
+    element_number = int(match['element_number'])
+    if 0 <= element_number <= 255:
+        return _sub_element_address(match, file_number, element_number, int(match['position_number']))
+
+
+def _status_address(match):
+    element_number = int(match['element_number'])
+    if 0 <= element_number <= 255:
+        return _sub_element_address(match, 2, element_number)
+
+
+def _sub_element_address(match, file_number, element_number, pos_number=None):
+    sub_element = match.groupdict().get('sub_element')
+    if sub_element is None:
+        return _new_address(match, file_number, element_number, pos_number=pos_number)
+
+    sub_element = int(sub_element)
+    if 0 <= sub_element <= 15:
+        return _new_address(match, file_number, element_number, sub_element, pos_number, address_field=3)
+
+
+def _bit_address(match):
+    file_number, bit_number = int(match['file_number']), int(match['element_number'])
+    if 1 <= file_number <= 255 and 0 <= bit_number <= 4095:
+        return _new_address(match, file_number, bit_number // 16, bit_number % 16, address_field=3)
+
+
+_ELEMENT_COUNT = r"(?P<_elem_cnt_token>{(?P<element_count>\d+)})?"
+
+# patterns are tried in order, the first to match and create a valid address is used
+_ADDRESS_PATTERNS = [
+    (re.compile(r"(?P<file_type>[CT])(?P<file_number>\d{1,3})"
+                r"(:)(?P<element_number>\d{1,3})"
+                r"(.)(?P<sub_element>ACC|PRE|EN|DN|TT|CU|CD|OV|UN|UA)", flags=re.IGNORECASE),
+     _timer_counter_address),
+    (re.compile(r"(?P<file_type>[LFBN])(?P<file_number>\d{1,3})"
+                r"(:)(?P<element_number>\d{1,3})"
+                r"(/(?P<sub_element>\d{1,2}))?" + _ELEMENT_COUNT, flags=re.IGNORECASE),
+     _data_file_address),
+    (re.compile(r"(?P<file_type>[IO])(:)(?P<element_number>\d{1,3})"
+                r"(.)(?P<position_number>\d{1,3})"
+                r"(/(?P<sub_element>\d{1,2}))?" + _ELEMENT_COUNT, flags=re.IGNORECASE),
+     _io_address),
+    (re.compile(r"(?P<file_type>ST)(?P<file_number>\d{1,3})"
+                r"(:)(?P<element_number>\d{1,4})"
+                r"(?P<_elem_cnt_token>{(?P<element_count>[12])})?", flags=re.IGNORECASE),
+     _data_file_address),
+    (re.compile(r"(?P<file_type>A)(?P<file_number>\d{1,3})"
+                r"(:)(?P<element_number>\d{1,4})" + _ELEMENT_COUNT, flags=re.IGNORECASE),
+     _data_file_address),
+    (re.compile(r"(?P<file_type>S)"
+                r"(:)(?P<element_number>\d{1,3})"
+                r"(/(?P<sub_element>\d{1,2}))?" + _ELEMENT_COUNT, flags=re.IGNORECASE),
+     _status_address),
+    (re.compile(r"(?P<file_type>B)(?P<file_number>\d{1,3})"
+                r"(/)(?P<element_number>\d{1,4})" + _ELEMENT_COUNT, flags=re.IGNORECASE),
+     _bit_address),
+]
+
+_ADDRESS_CACHE = util.LRUCache(SLC_ADDRESS_CACHE_SIZE)
 
 
 def get_bit(value: int, idx: int) -> bool:
@@ -594,13 +733,13 @@ def get_bit(value: int, idx: int) -> bool:
     return (value & (1 << idx)) != 0
 
 
-def writeable_value(tag: dict, value: Union[bytes, TagValueType]) -> bytes:
+def writeable_value(tag: PCCCAddress, value: Union[bytes, TagValueType]) -> bytes:
     if isinstance(value, bytes):
         return value
-    bit_field = tag.get('address_field', 0) == 3
-    bit_position = int(tag.get('sub_element') or 0) if bit_field else 0
+    bit_field = tag.address_field == 3
+    bit_position = (tag.sub_element or 0) if bit_field else 0
 
-    element_count = tag.get('element_count') or 1
+    element_count = tag.element_count
     if element_count > 1:
         if len(value) < element_count:
             raise RequestError(
@@ -609,35 +748,45 @@ def writeable_value(tag: dict, value: Union[bytes, TagValueType]) -> bytes:
             value = value[:element_count]
 
     try:
-        pack_func = Pack[f'pccc_{tag["file_type"].lower()}']
+        pack_func = Pack[f'pccc_{tag.file_type.lower()}']
 
         if element_count > 1:
             _value = b''.join(pack_func(val) for val in value)
         else:
-            if bit_field:
-                tag['data_size'] = 2
-
-                if tag['file_type'] in ['T', 'C'] and bit_position in {
+            if bit_field:  # the mask followed by the value of a masked write
+                if tag.file_type in ['T', 'C'] and bit_position in {
                     PCCC_CT['PRE'],
                     PCCC_CT['ACC'],
                 }:
                     _value = b'\xff\xff' + pack_func(value)
                 else:
+                    pack_word = Pack.uint if _masked_write_word(tag)[1] == 2 else Pack.udint
                     if value > 0:
-                        _value = Pack.uint(math.pow(2, bit_position)) + Pack.uint(math.pow(2, bit_position))
+                        _value = pack_word(1 << bit_position) + pack_word(1 << bit_position)
                     else:
-                        _value = Pack.uint(math.pow(2, bit_position)) + Pack.uint(0)
+                        _value = pack_word(1 << bit_position) + pack_word(0)
 
             else:
                 _value = pack_func(value)
 
     except Exception as err:
-        raise RequestError(f'Failed to create a writeable value for {tag["tag"]} from {value}') from err
+        raise RequestError(f'Failed to create a writeable value for {tag.tag} from {value}') from err
 
     else:
         return _value
 
 
+def _masked_write_word(tag: PCCCAddress) -> Tuple[int, int]:
+    """
+    Returns the sub-element number and byte size of the word changed by a bit or sub-element (masked) write
+    """
+    if tag.file_type in ('T', 'C'):
+        if tag.sub_element in (PCCC_CT['PRE'], PCCC_CT['ACC']):
+            return tag.sub_element, 2
+        return 0, 2  # the status bits are in the control word
+    return tag.pos_number or 0, tag.data_size
+
+
 def request_status(data) -> Optional[str]:
     try:
         _status_code = int(data[58])
@@ -23,30 +23,92 @@
 #
 
 import logging
+import select
 import socket
 import struct
+from typing import NamedTuple, Optional, Tuple, Union
 
 from .exceptions import CommError
 from .const import HEADER_SIZE
 
+__all__ = ['Socket', 'SocketOptions']
+
+
+class SocketOptions(NamedTuple):
+    """
+    Options for the TCP socket to the target, passed to the drivers using the ``socket_options`` argument.
+    Options left as ``None`` use the OS default.
+    """
+    connect_timeout: Optional[float] = None  #: seconds to wait for the connection, the driver's timeout if None
+    nodelay: bool = True  #: disable Nagle's algorithm, so small requests are sent without waiting
+    keepalive: bool = True  #: enable TCP keepalive probes
+    keepalive_idle: Optional[int] = None  #: seconds the connection is idle before the first keepalive probe
+    keepalive_interval: Optional[int] = None  #: seconds between keepalive probes
+    keepalive_count: Optional[int] = None  #: number of failed keepalive probes before the connection is dropped
+    recv_buffer_size: Optional[int] = None  #: size of the receive buffer (SO_RCVBUF) in bytes
+    send_buffer_size: Optional[int] = None  #: size of the send buffer (SO_SNDBUF) in bytes
+    source_address: Optional[Union[str, Tuple[str, int]]] = None  #: local address (or (address, port)) to bind to
+
+
+_KEEPALIVE_OPTIONS = (
+    ('keepalive_idle', ('TCP_KEEPIDLE', 'TCP_KEEPALIVE')),  # TCP_KEEPALIVE is the idle time on macOS
+    ('keepalive_interval', ('TCP_KEEPINTVL', )),
+    ('keepalive_count', ('TCP_KEEPCNT', )),
+)
+
 
 class Socket:
     __log = logging.getLogger(f'{__module__}.{__qualname__}')
 
-    def __init__(self, timeout=5.0):
+    def __init__(self, timeout=5.0, options: Optional[SocketOptions] = None):
+        """
+        :param timeout: default seconds to wait for a send or receive to complete
+        :param options: socket options, defaults to ``SocketOptions()``
+        """
+        self.options = options or SocketOptions()
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._timeout = check_timeout(timeout)
+        self._sock_timeout = timeout  # timeout currently set on the socket, only changed when needed
         self.sock.settimeout(timeout)
-        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        apply_socket_options(self.sock, self.options)
+        self._header = bytearray(HEADER_SIZE)  # reused for every reply, only the payload buffer is allocated
+        self._header_view = memoryview(self._header)
+
+    @property
+    def timeout(self) -> float:
+        """
+        Default seconds to wait for a send or receive to complete
+        """
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self, value: float):
+        self._timeout = check_timeout(value)
+        self._settimeout(value)
+
+    def _settimeout(self, timeout):
+        if timeout != self._sock_timeout:
+            self.sock.settimeout(timeout)
+            self._sock_timeout = timeout
 
     def connect(self, host, port):
         try:
+            if self.options.source_address is not None:
+                source = self.options.source_address
+                self.sock.bind((source, 0) if isinstance(source, str) else tuple(source))
+            if self.options.connect_timeout is not None:
+                self._settimeout(check_timeout(self.options.connect_timeout, 'connect_timeout'))
             self.sock.connect((host, port))
         except socket.timeout:
             raise CommError("Socket timeout during connection.")
+        finally:
+            self._settimeout(self._timeout)
 
-    def send(self, msg, timeout=0):
-        if timeout != 0:
-            self.sock.settimeout(timeout)
+    def send(self, msg, timeout: Optional[float] = None):
+        """
+        Sends the whole message, ``timeout`` overrides the default timeout for this send only
+        """
+        self._settimeout(self._timeout if timeout is None else check_timeout(timeout))
         total_sent = 0
         while total_sent < len(msg):
             try:
@@ -58,18 +120,84 @@ class Socket:
                 raise CommError("socket connection broken.") from err
         return total_sent
 
-    def receive(self, timeout=0):
+    def receive(self, timeout: Optional[float] = None) -> memoryview:
+        """
+        Receives a single encapsulated message.  The 24-byte header is read first, then exactly the number of
+        bytes declared in the header's length field are read into a buffer sized for the whole message.
+
+        :param timeout: overrides the default timeout for this receive only
+        :return: a memoryview of the complete message (header + data), each message has its own buffer so
+                 the view remains valid after further calls to ``receive``
+        """
+        self._settimeout(self._timeout if timeout is None else check_timeout(timeout))
         try:
-            if timeout != 0:
-                self.sock.settimeout(timeout)
-            data = self.sock.recv(4096)
-            data_len = struct.unpack_from('<H', data, 2)[0]
-            while len(data) - HEADER_SIZE < data_len:
-                data += self.sock.recv(4096)
+            self._recv_into(self._header_view)
+            data_len = struct.unpack_from('<H', self._header, 2)[0]
+            frame = bytearray(HEADER_SIZE + data_len)
+            frame[:HEADER_SIZE] = self._header
+            data = memoryview(frame)
+            self._recv_into(data[HEADER_SIZE:])
 
             return data
         except socket.error as err:
             raise CommError('socket connection broken') from err
 
+    def _recv_into(self, buffer: memoryview):
+        """
+        Fills ``buffer`` completely, reading directly from the socket into it
+        """
+        received, size = 0, len(buffer)
+        while received < size:
+            count = self.sock.recv_into(buffer[received:], size - received)
+            if count == 0:
+                raise CommError('socket connection broken')
+            received += count
+
+    def has_data(self) -> bool:
+        """
+        Returns True if there is data waiting to be received or the other end has closed the connection
+        """
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+        except (OSError, ValueError) as err:
+            raise CommError('socket connection broken') from err
+        return bool(readable)
+
     def close(self):
         self.sock.close()
+
+
+def check_timeout(timeout: float, name: str = 'timeout') -> float:
+    """
+    Returns the timeout if it is greater than 0, else raises a ``ValueError``.  A timeout of 0 would make the socket
+    non-blocking, failing any receive for a reply that has not already arrived.
+    """
+    if timeout <= 0:
+        raise ValueError(f'{name} must be greater than 0')
+    return timeout
+
+
+def apply_socket_options(sock: socket.socket, options: SocketOptions):
+    """
+    Sets the options on the socket, keepalive options not supported by the OS are logged and ignored
+    """
+    if options.nodelay:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    if options.recv_buffer_size is not None:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, options.recv_buffer_size)
+
+    if options.send_buffer_size is not None:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, options.send_buffer_size)
+
+    if options.keepalive:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        for option, names in _KEEPALIVE_OPTIONS:
+            value = getattr(options, option)
+            if value is None:
+                continue
+            opt = next((getattr(socket, name) for name in names if hasattr(socket, name)), None)
+            if opt is None:
+                logging.getLogger(__name__).warning(f'Socket option {option} is not supported on this platform')
+            else:
+                sock.setsockopt(socket.IPPROTO_TCP, opt, value)
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020 Ian Ottoway <ian@ottoway.dev>
+# Copyright (c) 2014 Agostino Ruscito <ruscito@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""
+Persistent storage and sharing of the tag and data type definitions uploaded from a controller.
+
+Uploading the tag list from a large controller can take a long time, so :class:`~pycomm3.LogixDriver` can store the
+definitions in a cache file and reuse them the next time it connects to the same controller, see the ``tag_cache``
+argument of :class:`~pycomm3.LogixDriver`. The file is gzip compressed JSON and may hold entries for many controllers,
+each entry is keyed by the controller serial number, program name and firmware revision and is only used if the change
+indicator read from the controller still matches the one stored with it.
+
+Drivers created with ``share_tags=True`` also share their definitions using :data:`tag_registry`, so the tag list is
+only uploaded by the first connection to a controller and the other connections in the process reuse the same
+definitions instead of keeping their own copies.
+"""
+
+__all__ = ['tag_cache_key', 'load_tag_cache', 'save_tag_cache', 'TAG_CACHE_VERSION', 'TagRegistry', 'TagRegistryEntry',
+           'tag_registry', 'next_generation']
+
+import gzip
+import itertools
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Optional, Dict, Any
+
+TAG_CACHE_VERSION = 1
+
+_INFO_KEYS = ('programs', 'tasks', 'modules')
+
+_log = logging.getLogger(__name__)
+
+_GENERATIONS = itertools.count(1)
+
+
+def next_generation() -> int:
+    """
+    Returns a new generation number for a set of tag definitions, numbers are unique within the process
+    """
+    return next(_GENERATIONS)
+
+
+def tag_cache_key(info: dict) -> Optional[str]:
+    """
+    Returns the key identifying the controller in the cache file or ``None`` if the required
+    information (serial, name and revision) has not been read from the controller.
+    """
+    try:
+        return f"{info['serial']}/{info['name']}/{info['revision']}"
+    except KeyError:
+        return None
+
+
+def load_tag_cache(filename: str, key: str, change_indicator: Optional[str], scope: Optional[str]) -> Optional[dict]:
+    """
+    Loads the cached definitions for a controller, returns ``None`` if there is no entry for ``key`` or it
+    is no longer valid.  Otherwise returns a dict containing the ``tags`` (keyed by name), ``data_types`` and the
+    ``programs``, ``tasks``, and ``modules`` info fields.
+
+    :param filename: path to the cache file
+    :param key: key for the controller, see :func:`tag_cache_key`
+    :param change_indicator: the current change indicator from the controller, ``None`` if not supported
+    :param scope: the scope of the tag list, same as the ``program`` argument of ``get_tag_list``
+    """
+    entry = _read_file(filename).get(key)
+    if entry is None:
+        _log.info(f'No cached tag list found for {key}')
+        return None
+
+    if entry['change_indicator'] != change_indicator or entry['scope'] != scope:
+        _log.info(f'Cached tag list for {key} is out of date')
+        return None
+
+    data_types = entry['data_types']
+    for data_type in data_types.values():
+        for member in data_type['internal_tags'].values():
+            _link_data_type(member, data_types)
+
+    tags = {}
+    for tag in entry['tags']:
+        _link_data_type(tag, data_types)
+        tags[tag['tag_name']] = tag
+
+    for module in entry['modules'].values():
+        module['slots'] = {int(slot): value for slot, value in module['slots'].items()}
+
+    return {'tags': tags, 'data_types': data_types, **{k: entry[k] for k in _INFO_KEYS}}
+
+
+def save_tag_cache(filename: str, key: str, change_indicator: Optional[str], scope: Optional[str],
+                   tags: Dict[str, dict], data_types: Dict[str, dict], info: dict):
+    """
+    Stores the definitions for a controller in the cache file, replacing any existing entry for ``key``.
+    Entries for other controllers in the file are kept.  Arguments are the same as :func:`load_tag_cache`, with the
+    ``tags``, ``data_types`` and ``info`` properties of the driver.
+    """
+    cache = _read_file(filename)
+    cache[key] = {
+        'change_indicator': change_indicator,
+        'scope': scope,
+        'tags': [_unlink_data_type(tag) for tag in tags.values()],
+        'data_types': {
+            name: {**data_type,
+                   'internal_tags': {member: _unlink_data_type(member_info)
+                                     for member, member_info in data_type['internal_tags'].items()}}
+            for name, data_type in data_types.items()
+        },
+        **{k: info.get(k, {}) for k in _INFO_KEYS}
+    }
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+            json.dump({'version': TAG_CACHE_VERSION, 'controllers': cache}, f, separators=(',', ':'))
+        os.replace(tmp, filename)  # replace in one step so other processes never read a partial file
+    except Exception:
+        os.remove(tmp)
+        raise
+
+
+class TagRegistryEntry:
+    """
+    The shared definitions for a controller.  ``generation`` changes every time the definitions are registered, so
+    drivers using them can tell when they were replaced or updated by another driver.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.lock = threading.RLock()  #: held while checking for, uploading or updating the definitions
+        self.users = 0
+        self.generation = 0
+        self.change_indicator = None
+        self.scope = None
+        self.definitions = None
+
+    def get(self, change_indicator: Optional[str], scope: Optional[str]) -> Optional[dict]:
+        """
+        Returns the definitions or ``None`` if there are none or they are out of date.
+        Arguments are the same as :func:`load_tag_cache`.
+        """
+        if self.definitions is None or self.change_indicator != change_indicator or self.scope != scope:
+            return None
+        return self.definitions
+
+    def register(self, change_indicator: Optional[str], scope: Optional[str], definitions: dict) -> dict:
+        """
+        Registers (or replaces) the definitions and returns them.
+        """
+        self.change_indicator = change_indicator
+        self.scope = scope
+        self.definitions = definitions
+        self.generation = next_generation()
+        return definitions
+
+
+class TagRegistry:
+    """
+    A thread-safe registry of the tag definitions for each controller, keyed the same way as the cache file.
+    Definitions are a dict of the ``tags``, ``data_types`` and the ``programs``, ``tasks``, and ``modules`` info fields.
+    Drivers :meth:`acquire` the entry for a controller to use the definitions and :meth:`release` it when closed, the
+    entry is removed when it is released by the last driver using it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def acquire(self, key: str) -> TagRegistryEntry:
+        """
+        Returns the entry for a controller, creating it if needed, it must be released when no longer used
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = TagRegistryEntry(key)
+            entry.users += 1
+            return entry
+
+    def release(self, entry: TagRegistryEntry):
+        """
+        Releases an entry returned by :meth:`acquire`, it is removed once released by all of its users
+        """
+        with self._lock:
+            entry.users -= 1
+            if entry.users <= 0 and self._entries.get(entry.key) is entry:
+                del self._entries[entry.key]
+
+
+#: The registry used by all drivers created with ``share_tags=True``
+tag_registry = TagRegistry()
+
+
+def _read_file(filename: str) -> Dict[str, Any]:
+    try:
+        with gzip.open(filename, 'rt', encoding='utf-8') as f:
+            cache = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError, EOFError):
+        _log.warning(f'Ignoring invalid tag cache file: {filename}')
+        return {}
+
+    if not isinstance(cache, dict) or cache.get('version') != TAG_CACHE_VERSION:
+        _log.warning(f'Ignoring tag cache file with unsupported version: {filename}')
+        return {}
+
+    return cache['controllers']
+
+
+def _unlink_data_type(tag: dict) -> dict:
+    # struct definitions are shared between tags, store only the name and relink them when loading
+    if tag['tag_type'] == 'struct' and isinstance(tag.get('data_type'), dict):
+        return {**tag, 'data_type': tag['data_type']['name']}
+    return tag
+
+
+def _link_data_type(tag: dict, data_types: Dict[str, dict]):
+    if tag['tag_type'] == 'struct' and tag.get('data_type') is not None:
+        tag['data_type'] = data_types[tag['data_type']]
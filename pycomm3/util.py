@@ -29,7 +29,9 @@
 Various utility functions.
 """
 
-from typing import Tuple
+from collections import OrderedDict
+from threading import Lock
+from typing import Tuple, Any, Hashable
 
 
 def strip_array(tag: str) -> str:
@@ -57,3 +59,59 @@ def get_array_index(tag: str) -> Tuple[str, int]:
         idx = 0
 
     return tag, idx
+
+
+class LRUCache:
+    """
+    A simple size-bounded cache, when full the least recently used entry is discarded.
+    Keeps count of the lookups that were found (hits) or not (misses).  Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+                self._data.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes all entries, the hit and miss counts are kept
+        """
+        with self._lock:
+            self._data.clear()
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
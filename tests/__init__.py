@@ -1,5 +1,17 @@
+import socket
+
+
 def tag_only(tag):
     if '{' in tag:
         return tag[:tag.find('{')]
     else:
-        return tag
\ No newline at end of file
+        return tag
+
+
+def unused_address():
+    """
+    Returns a ``127.0.0.1:port`` address nothing is listening on
+    """
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return f'127.0.0.1:{sock.getsockname()[1]}'
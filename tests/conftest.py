@@ -3,10 +3,12 @@ from pycomm3 import LogixDriver
 import os
 
 
-PATH = os.environ['PLCPATH']
+PATH = os.environ.get('PLCPATH')
 
 
 @pytest.fixture(scope='module', autouse=True)
 def plc():
+    if PATH is None:
+        pytest.skip('PLCPATH is not set, these tests require a PLC')
     with LogixDriver(PATH, init_program_tags=True) as plc_:
         yield plc_
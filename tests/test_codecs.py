@@ -0,0 +1,111 @@
+import os
+import struct
+import pytest
+from pycomm3 import LogixDriver, RequestError
+from pycomm3.const import DataType
+from pycomm3.packets.requests import struct_encoder
+from pycomm3.packets.responses import (parse_read_reply, unpack_array, unpack_ndarray, dwords_to_bool_array,
+                                     struct_decoder)
+from pycomm3.simulator import PLCSimulator
+
+
+L5X = os.path.join(os.path.dirname(__file__), 'Pycomm3_Testing.L5X')
+
+
+@pytest.fixture(scope='module')
+def plc():
+    # overrides the autouse fixture connecting to a real PLC
+    with PLCSimulator.from_l5x(L5X, port=0) as sim, LogixDriver(sim.path) as plc_:
+        yield plc_
+
+
+def _reply(datatype, fmt, values):
+    return struct.pack('<H', DataType[datatype]) + struct.pack(f'<{len(values)}{fmt}', *values)
+
+
+@pytest.mark.parametrize('datatype, fmt, values', [
+    ('SINT', 'b', [-128, 0, 127]),
+    ('INT', 'h', [-32768, 1, 32767]),
+    ('DINT', 'i', [-2 ** 31, 2, 2 ** 31 - 1]),
+    ('LINT', 'q', [-2 ** 63, 3, 2 ** 63 - 1]),
+    ('USINT', 'B', [0, 255]),
+    ('UDINT', 'I', [0, 2 ** 32 - 1]),
+    ('REAL', 'f', [1.5, -2.25, 0.0]),
+    ('ULINT', 'Q', [0, 2 ** 64 - 1]),
+])
+def test_parse_atomic_array(datatype, fmt, values):
+    value, type_name = parse_read_reply(_reply(datatype, fmt, values), None, len(values))
+    assert value == values
+    assert type_name == f'{datatype}[{len(values)}]'
+
+    value, type_name = parse_read_reply(_reply(datatype, fmt, values[:1]), None, 1)
+    assert value == values[0] and type_name == datatype
+
+
+def test_parse_dword_array():
+    value, type_name = parse_read_reply(_reply('DWORD', 'I', [0x80000001, 0x2]), None, 2)
+    assert type_name == 'BOOL[64]'
+    assert [i for i, bit in enumerate(value) if bit] == [0, 31, 33]
+
+    value, type_name = parse_read_reply(_reply('DWORD', 'I', [0x5]), None, 1)
+    assert type_name == 'BOOL[32]'
+    assert value == [True, False, True] + [False] * 29
+
+
+def test_unpack_array():
+    data = struct.pack('<4h', 1, -2, 3, -4)
+    assert unpack_array('INT', data) == [1, -2, 3, -4]
+    assert dwords_to_bool_array(b'\xff\x00') == [True] * 8 + [False] * 8
+    assert unpack_array('DWORD', b'\x01\x00\x00\x00') == [True] + [False] * 31
+
+
+def test_unpack_ndarray():
+    numpy = pytest.importorskip('numpy')
+    data = struct.pack('<4i', 1, -2, 3, -4)
+    assert numpy.array_equal(unpack_ndarray('DINT', data), numpy.array([1, -2, 3, -4]))
+    assert numpy.array_equal(unpack_ndarray('DWORD', b'\x05\x00\x00\x00'),
+                             numpy.array([True, False, True] + [False] * 29))
+
+
+def test_read_atomic_arrays(plc):
+    values = plc.read('DINT_ARY1{100}').value
+    assert values == [plc.read(f'DINT_ARY1[{i}]').value for i in range(100)]
+    assert plc.read('DINT_ARY1[10]{5}').value == values[10:15]
+
+
+NESTED_UDT = {
+    'dint': -5,
+    'ints': [1, -2, 3],
+    'string': 'nested',
+    'bool1': False,
+    'real': 2.5,
+    'bool2': True,
+    'udt': {'bool': True, 'sint': -1, 'int': 2, 'dint': 3, 'real': 4.0},
+    'udts': [{'bool': i % 2 == 0, 'sint': i, 'int': -i, 'dint': i * 1000, 'real': i / 2} for i in range(3)],
+}
+
+
+def test_struct_round_trip(plc):
+    data_type = plc.data_types['TestUDT1']
+    encoder, decoder = struct_encoder(data_type), struct_decoder(data_type)
+    data = encoder.encode(NESTED_UDT)
+    assert len(data) == data_type['template']['structure_size']
+    assert decoder(data) == NESTED_UDT
+    assert encoder.encode([NESTED_UDT[name] for name in data_type['attributes']]) == data
+
+    zero = decoder(bytes(len(data)))  # missing attributes are written as 0
+    assert decoder(encoder.encode({'udt': {'dint': 7}})) == {**zero, 'udt': {**zero['udt'], 'dint': 7}}
+
+    values = [NESTED_UDT, {**NESTED_UDT, 'string': 'second', 'udts': NESTED_UDT['udts'][::-1]}]
+    assert decoder.decode_array(encoder.encode_array(values)) == values
+
+    with pytest.raises(RequestError):
+        encoder.encode({'not_an_attribute': 1})
+
+
+def test_struct_round_trip_read_value(plc):
+    value = plc.read('TestUDT1_1').value
+    data_type = plc.data_types['TestUDT1']
+    assert struct_decoder(data_type)(struct_encoder(data_type).encode(value)) == value
+    string_type = plc.data_types['STRING20']
+    assert struct_decoder(string_type)(struct_encoder(string_type).encode('pycomm3')) == 'pycomm3'
@@ -0,0 +1,78 @@
+import os
+import pytest
+from pycomm3 import LogixDriver
+from pycomm3.const import MULTISERVICE_READ_OVERHEAD, MULTISERVICE_REQUEST_OVERHEAD
+from pycomm3.planner import ReadPlanItem, PacketPlan, plan_in_order, plan_first_fit_decreasing
+from pycomm3.simulator import PLCSimulator
+
+
+L5X = os.path.join(os.path.dirname(__file__), 'Pycomm3_Testing.L5X')
+CONNECTION_SIZE = 500
+
+
+@pytest.fixture(scope='module')
+def plc():
+    # overrides the autouse fixture connecting to a real PLC
+    with PLCSimulator.from_l5x(L5X, port=0) as sim, LogixDriver(sim.path, large_packets=False) as plc_:
+        yield plc_
+
+
+def _items(*sizes):
+    return [ReadPlanItem({'tag': f'tag{i}'}, request_size, response_size)
+            for i, (request_size, response_size) in enumerate(sizes)]
+
+
+def _assert_within_limits(packets, items):
+    assert sorted(item.tag_data['tag'] for packet in packets for item in packet.items) == \
+           sorted(item.tag_data['tag'] for item in items)
+    for packet in packets:
+        assert packet.request_size == MULTISERVICE_REQUEST_OVERHEAD + sum(i.request_size for i in packet.items)
+        assert packet.response_size == MULTISERVICE_READ_OVERHEAD + sum(i.response_size for i in packet.items)
+        if len(packet) > 1:
+            assert packet.request_size < CONNECTION_SIZE
+            assert packet.response_size < CONNECTION_SIZE
+
+
+@pytest.mark.parametrize('planner', [plan_in_order, plan_first_fit_decreasing])
+def test_planner_limits(planner):
+    items = _items(*[(10, 300), (10, 150), (10, 200), (10, 100), (10, 40), (10, 250), (10, 60)])
+    _assert_within_limits(planner(items, CONNECTION_SIZE), items)
+
+    items = _items(*[(100, 4)] * 20)  # request size is the limit
+    packets = planner(items, CONNECTION_SIZE)
+    _assert_within_limits(packets, items)
+    assert len(packets) == 5
+
+
+@pytest.mark.parametrize('planner', [plan_in_order, plan_first_fit_decreasing])
+def test_planner_oversized_item(planner):
+    items = _items((10, 2 * CONNECTION_SIZE), (10, 20))
+    packets = planner(items, CONNECTION_SIZE)
+    assert [len(packet) for packet in packets] == [1, 1]  # an empty packet accepts any item
+
+
+def test_first_fit_decreasing_fewer_packets():
+    items = _items(*[(10, 350), (10, 200), (10, 100), (10, 200)])
+    assert len(plan_in_order(items, CONNECTION_SIZE)) == 3
+    assert len(plan_first_fit_decreasing(items, CONNECTION_SIZE)) == 2
+
+
+def test_packet_plan_fits():
+    packet = PacketPlan(CONNECTION_SIZE)
+    item = ReadPlanItem({}, 10, CONNECTION_SIZE - MULTISERVICE_READ_OVERHEAD)
+    assert packet.fits(item)
+    packet.add(ReadPlanItem({}, 10, 10))
+    assert not packet.fits(item)
+    assert packet.wasted == CONNECTION_SIZE - packet.response_size
+
+
+def test_driver_read_planners(plc):
+    tags = [f'DINT_ARY1[{i}]' for i in range(0, 100, 7)] + ['TestUDT1_1', 'DINT1', 'TIMER1', 'TestUDT1_1.string']
+    plc.coalesce_array_reads = False
+    results = {}
+    for planner in ('in_order', 'first_fit_decreasing'):
+        plc.read_planner = planner
+        results[planner] = plc.read(*tags)
+        assert all(results[planner])
+        assert plc.read_plan_stats['packets'] >= 1
+    assert results['in_order'] == results['first_fit_decreasing']
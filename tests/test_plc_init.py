@@ -2,7 +2,7 @@ from pycomm3 import LogixDriver
 import os
 
 
-PATH = os.environ['PLCPATH']
+PATH = os.environ.get('PLCPATH')
 
 
 def test_connect_init_none():
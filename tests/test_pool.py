@@ -0,0 +1,87 @@
+import asyncio
+import os
+import threading
+import pytest
+from pycomm3 import ConnectionPool, CommError, LogixDriver, AsyncLogixDriver
+from pycomm3.simulator import PLCSimulator
+from . import unused_address
+
+
+L5X = os.path.join(os.path.dirname(__file__), 'Pycomm3_Testing.L5X')
+
+
+@pytest.fixture(scope='module')
+def simulator():
+    with PLCSimulator.from_l5x(L5X, port=0) as sim:
+        yield sim
+
+
+@pytest.fixture(scope='module')
+def plc(simulator):
+    # overrides the autouse fixture connecting to a real PLC
+    with LogixDriver(simulator.path, init_tags=False) as plc_:
+        yield plc_
+
+
+def test_pool_checkout(simulator):
+    with ConnectionPool(max_connections=2) as pool:
+        results = []
+
+        def _read():
+            with pool.connection(simulator.path, timeout=10) as plc:
+                results.append(plc.read('DINT1').value)
+
+        threads = [threading.Thread(target=_read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [20] * 8
+        assert pool._targets[simulator.path].size <= 2
+
+
+def test_pool_reconnect(simulator):
+    with ConnectionPool(health_check_interval=0, reconnect_delay=0.1) as pool:
+        with pool.connection(simulator.path) as plc:
+            assert plc.read('DINT1')
+            tags = plc.tags
+
+        simulator.stop()  # drops all the connections
+        simulator.start()
+
+        with pool.connection(simulator.path) as plc_:
+            assert plc_ is plc
+            assert plc.tags is tags  # not initialized again
+            assert plc.read('DINT1')
+
+
+def test_pool_backoff(simulator):
+    address = unused_address()
+    with ConnectionPool(reconnect_delay=60) as pool:
+        with pytest.raises(CommError):
+            pool.checkout(address)
+        with pytest.raises(CommError, match='next connection attempt'):
+            pool.checkout(address)
+
+
+def test_pool_async_driver(simulator):
+    with pytest.raises(TypeError):
+        ConnectionPool(AsyncLogixDriver)
+
+    async def _test():
+        async with AsyncLogixDriver(simulator.path) as plc:
+            assert await plc.check_connection()
+            simulator.stop()  # drops all the connections
+            simulator.start()
+            await asyncio.sleep(0.1)
+            assert not await plc.check_connection()
+            await plc.reconnect()
+            assert await plc.check_connection()
+            assert (await plc.read('DINT1')).value == 20
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(_test())
+    finally:
+        loop.close()
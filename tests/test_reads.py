@@ -127,3 +127,40 @@ def test_udt_read(plc, tag_name, data_type, value):
 
 
 
+
+
+def test_tag_request_cache(plc):
+    tag = atomic_tests[0][0]
+    plc.read(tag)
+    hits = plc.tag_request_cache_info['hits']
+    assert plc.read(tag)
+    assert plc.tag_request_cache_info['hits'] > hits
+
+
+def test_prepared_read(plc):
+    tags = [tag for (tag, _, __) in atomic_tests]
+    group = plc.prepare_read(*tags)
+    for _ in range(2):
+        results = group.read()
+        assert len(results) == len(tags)
+        assert all(results)
+
+
+def test_read_planner_first_fit_decreasing(plc):
+    tags = [tag for (tag, _, __) in atomic_tests]
+    plc.read_planner = 'first_fit_decreasing'
+    try:
+        results = plc.read(*tags)
+        assert len(results) == len(tags)
+        assert all(results)
+        assert plc.read_plan_stats['packets'] >= 1
+    finally:
+        plc.read_planner = 'in_order'
+
+
+def test_coalesced_array_reads(plc):
+    tags = [f'DINT_ARY1[{i}]' for i in range(10, 13)] + ['DINT_ARY1[10]{3}', 'DINT_ARY1[99]']
+    results = plc.read(*tags)
+    assert [r.value for r in results[:3]] == results[3].value == [10000, 11000, 12000]
+    assert results[4].value == 99000
+    assert results[0].type == 'DINT'
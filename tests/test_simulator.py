@@ -0,0 +1,385 @@
+import asyncio
+import inspect
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from pycomm3 import (LogixDriver, AsyncCIPDriver, AsyncLogixDriver, SLCDriver, CIPDriver, SocketOptions, CommError,
+                     DataError, RequestError, Tag)
+from pycomm3 import clx, util
+from pycomm3.clx import _ParallelConnection
+from pycomm3.simulator import PLCSimulator
+from . import unused_address
+
+
+L5X = os.path.join(os.path.dirname(__file__), 'Pycomm3_Testing.L5X')
+
+
+@pytest.fixture(scope='module')
+def simulator():
+    sim = PLCSimulator.from_l5x(L5X, port=0, data_files={'N7': [1, 2, 3], 'F8': [1.5]})
+    with sim:
+        yield sim
+
+
+@pytest.fixture(scope='module')
+def plc(simulator):
+    with LogixDriver(simulator.path, init_program_tags=True) as plc_:
+        yield plc_
+
+
+def test_simulator_init(plc):
+    assert plc.name == 'PLCA'
+    assert 'Pycomm3_Testing' in plc.info['programs']
+    assert 'Program:Pycomm3_Testing._udt1' in plc.tags
+    assert {'SimpleUDT1', 'TestUDT1', 'STRING20', 'TIMER'} <= set(plc.data_types)
+
+
+def test_simulator_read_write(plc):
+    assert plc.read('DINT1').value == 20
+    assert plc.read('TestUDT1_1.string').value == 'Hello World!!!'
+    assert plc.read('TIMER1').value['DN'] is True
+    assert plc.write(('DINT_ARY1{100}', list(range(100))), ('TestUDT1_1.udts[1].dint', 42))
+    assert plc.read('DINT_ARY1{100}').value == list(range(100))
+    assert plc.read('TestUDT1_1.udts[1].dint').value == 42
+
+
+def test_simulator_async_tag_list(simulator, plc):
+    async def _test():
+        async with AsyncLogixDriver(simulator.path, init_program_tags=True) as async_plc:
+            assert async_plc.tags == plc.tags
+            assert (await async_plc.read('TestUDT1_1.string')) == plc.read('TestUDT1_1.string')
+            simulator.add_tag('AsyncDINT', 'DINT', 3)
+            assert (await async_plc.refresh_tag_list())['added'] == ['AsyncDINT']
+            assert (await async_plc.read('AsyncDINT')).value == 3
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(_test())
+    finally:
+        loop.close()
+
+    with pytest.raises(TypeError):
+        with AsyncLogixDriver(simulator.path):
+            pass
+
+    with pytest.raises(ValueError):
+        AsyncLogixDriver(simulator.path, connections=2)
+
+
+def test_async_methods(simulator):
+    # every public method sending requests is a coroutine, none of the sync driver's methods are used
+    names = {name for cls in (CIPDriver, LogixDriver) for name, value in vars(cls).items()
+             if not name.startswith('_') and inspect.isfunction(value)}
+    assert {name for name in names if not asyncio.iscoroutinefunction(getattr(AsyncLogixDriver, name))} == {
+        'new_request'}
+
+    async_plc = AsyncLogixDriver(simulator.path)
+    async_plc._cache = {'id:udt': {}}  # as while uploading the tag list
+    with pytest.raises(DataError):
+        async_plc._get_data_type(0xFFF)  # would need to be uploaded, parsing a template cannot send requests
+
+
+def test_simulator_slc(simulator):
+    with SLCDriver(simulator.path) as slc:
+        assert slc.read('N7:0{3}').value == [1, 2, 3]
+        assert slc.write(('F8:0', 2.5))
+        assert slc.read('F8:0').value == 2.5
+
+
+def test_simulator_slc_merged_reads(simulator):
+    with SLCDriver(simulator.path) as slc:
+        slc.pipeline_window = 4
+        results = slc.read('N7:2', 'N7:0{2}', 'N7:1/1', 'F8:0', 'N9:0')
+        assert [tag.value for tag in results[:3]] == [3, [1, 2], True]
+        assert results[3]
+        assert not results[4]
+
+
+def test_simulator_slc_merged_writes(simulator):
+    with SLCDriver(simulator.path) as slc:
+        results = slc.write(('N7:1', 5), ('N7:0', 4), ('N7:2/0', False), ('N9:0', 1))
+        assert [bool(tag) for tag in results] == [True, True, True, False]
+        assert slc.read('N7:0{3}').value == [4, 5, 2]
+
+
+def test_simulator_lazy_data_types(simulator):
+    with LogixDriver(simulator.path, lazy_data_types=True) as plc:
+        assert plc.tags['TestUDT1_1']['data_type'] is None
+        assert not plc.data_types
+        assert plc.read('TestUDT1_1.string').value == 'Hello World!!!'
+        assert plc.tags['TestUDT1_1']['data_type'] is plc.data_types['TestUDT1']
+
+
+def test_simulator_write_struct_dict(plc):
+    udt = plc.read('TestUDT1_1').value
+    udt.update(dint=123, string='pycomm3', bool2=True)
+    udt['udts'][2]['sint'] = -5
+    assert plc.write(('TestUDT1_1', udt))
+    assert plc.read('TestUDT1_1').value == udt
+    assert plc.write(('TestUDT1_1', {'dint': 7}))
+    assert plc.read('TestUDT1_1.string').value == ''
+
+
+def test_slc_parse_tag():
+    from pycomm3.slc import parse_tag
+    address = parse_tag('B3/37{2}')
+    assert (address.tag, address.element_number, address.sub_element, address.element_count) == ('B3/37', 2, 5, 2)
+    assert parse_tag('B3/37{2}') is address
+    assert parse_tag('I:1.0/3').pos_number == 0
+    assert parse_tag('N7:300') is None
+
+
+def test_simulator_coalesce_split(plc):
+    tags = ['DINT_ARY1[2]', 'DINT_ARY1[5]{3}', 'DINT_ARY1[3]', 'DINT_ARY1[90]', 'DINT_ARY1[4].1', 'DINT1']
+    parsed = plc._parse_requested_tags(tags)
+    requests = plc._coalesce_array_reads(parsed)
+
+    combined = requests['DINT_ARY1[2]{6}']  # [2] to [7], [90] is too far away
+    assert (combined['plc_tag'], combined['elements']) == ('DINT_ARY1[2]', 6)
+    assert {parsed[tag]['coalesced'][1] for tag in tags[:3]} == {0, 3, 1}
+    assert parsed['DINT_ARY1[4].1']['coalesced'] == (('DINT_ARY1[2]', 6), 2)
+    assert 'coalesced' not in parsed['DINT_ARY1[90]'] and 'coalesced' not in parsed['DINT1']
+
+    values = [plc.read(f'DINT_ARY1[{i}]').value for i in range(2, 8)]
+    read_results = {('DINT_ARY1[2]', 6): Tag('DINT_ARY1[2]', values, 'DINT[6]', None)}
+    assert clx._split_coalesced_result(parsed['DINT_ARY1[5]{3}'], read_results) == \
+           Tag('DINT_ARY1[5]', values[3:6], 'DINT[3]', None)
+    assert clx._split_coalesced_result(parsed['DINT_ARY1[3]'], read_results) == \
+           Tag('DINT_ARY1[3]', values[1], 'DINT', None)
+
+    failed = {('DINT_ARY1[2]', 6): Tag('DINT_ARY1[2]', None, None, 'error')}
+    assert clx._split_coalesced_result(parsed['DINT_ARY1[3]'], failed).error == 'error'
+
+    assert plc.read(*tags) == [plc.read(tag) for tag in tags]
+
+
+def test_simulator_coalesced_reads_invalid_element(plc, monkeypatch):
+    tags = ('DINT_ARY1[97]', 'DINT_ARY1[98]', 'DINT_ARY1[99]', 'DINT_ARY1[100]')
+    expected = [plc.read(tag) for tag in tags]
+    assert all(expected[:3]) and not expected[3]
+    assert plc.read(*tags) == expected  # [100] is past the end of the array and is not combined
+
+    with monkeypatch.context() as m:  # array length unknown, the combined read fails and is read separately
+        m.setattr(clx, '_array_length', lambda tag_info: 0)
+        assert plc.read(*tags) == expected
+        assert plc.prepare_read(*tags).read() == expected
+
+
+def test_simulator_pipelined_request_path_error(plc):
+    request = plc.new_request('multi_request')
+    assert request.add_read('DINT1', tag_info=plc.tags['DINT1'])
+    request.tags.append({'tag': 'BadTag', 'elements': 1, 'tag_info': None, 'rp': None, 'service': 'read'})
+
+    [(sent, response)] = plc._send_pipelined([request], window=4)
+    assert sent is request and not response
+    assert 'BadTag' in response.error
+
+    results = {}
+    plc._request_results(request, response, results)
+    assert all(tag.error == response.error for tag in results.values()) and len(results) == 2
+    assert plc.read('DINT1')  # nothing was sent, the connection is still usable
+
+
+def test_simulator_pipelined_no_key(plc):
+    requests = [plc._read_build_single_request(tag_data)
+                for tag_data in plc._parse_requested_tags(['DINT1', 'REAL1']).values()]
+    nop = plc.new_request('nop')
+    nop.can_pipeline = True  # the target does not reply, there is no key to match a reply
+    with pytest.raises(RequestError):
+        list(plc._send_pipelined(requests + [nop], window=4))
+    assert plc.read('DINT1')  # nothing was sent
+
+
+def test_simulator_parallel_connections(simulator):
+    with LogixDriver(simulator.path, large_packets=False, connections=3) as plc:
+        tags = [f'DINT_ARY1[{i}]' for i in range(100)] + ['DINT1', 'TestUDT1_1', 'TIMER1']
+        plc.coalesce_array_reads = False
+        results = plc.read(*tags)
+        assert len(plc._parallel_connections) == 2
+        plc.connections = 1
+        assert plc.read(*tags) == results
+
+
+def test_simulator_parallel_send(simulator, monkeypatch):
+    sent = {}
+    send_pipelined = CIPDriver._send_pipelined
+
+    def _send_pipelined(self, requests, *args, **kwargs):
+        requests = list(requests)
+        assert all(request._plc is self for request in requests)
+        sent.setdefault(id(self), []).extend(requests)
+        return send_pipelined(self, requests, *args, **kwargs)
+
+    monkeypatch.setattr(CIPDriver, '_send_pipelined', _send_pipelined)
+    with LogixDriver(simulator.path, large_packets=False, connections=3) as plc:
+        plc.coalesce_array_reads = False
+        tags = [f'DINT_ARY1[{i}]' for i in range(100)] + ['TestUDT1_1', 'DINT1']
+        expected = [plc.read(tag) for tag in tags]
+
+        sent.clear()
+        group = plc.prepare_read(*tags)
+        for _ in range(3):
+            assert group.read() == expected
+        assert len(sent) == 3  # every connection sent some of the requests
+        assert plc.read(*tags) == expected
+
+
+def test_simulator_request_moved_connection(plc):
+    request = plc.new_request('multi_request')
+    assert request.add_read('DINT1', tag_info=plc.tags['DINT1'])
+    assert request.add_read('REAL1', tag_info=plc.tags['REAL1'])
+    assert not request._send_error()  # builds the message
+
+    connection = _ParallelConnection(plc)
+    try:
+        connection.open()
+        assert connection._forward_open()
+        request._use_connection(connection)
+        connection.timeout = 1  # a reply with the old sequence would not match the request
+        [(_, response)] = connection._send_pipelined([request], window=2)
+        assert response
+    finally:
+        connection.close()
+
+
+def test_lru_cache_threads():
+    cache = util.LRUCache(8)
+    gets = 2000
+
+    def _use_cache(n):
+        for i in range(gets):
+            key = (n + i) % 16
+            if cache.get(key) is None:
+                cache.set(key, key)
+        return True
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert all(executor.map(_use_cache, range(8)))
+    info = cache.info()
+    assert info['hits'] + info['misses'] == 8 * gets
+    assert info['size'] <= 8
+
+
+def test_simulator_parallel_connection_failed(simulator):
+    with LogixDriver(simulator.path, large_packets=False, connections=2) as plc:
+        tags = [f'DINT_ARY1[{i}]' for i in range(100)]
+        plc.coalesce_array_reads = False
+        expected = plc.read(*tags)
+        broken = plc._parallel_connections[0]
+        broken._sock.sock.close()
+
+        results = plc.read(*tags)
+        assert len(results) == len(tags)
+        assert any(tag.error for tag in results) and any(tag for tag in results)
+        assert all(tag == expected[i] for i, tag in enumerate(results) if tag)
+        assert plc._parallel_connections == [] and plc.connections == 2
+
+        assert plc.read(*tags) == expected  # reopened
+        assert plc._parallel_connections and plc._parallel_connections[0] is not broken
+
+
+def test_simulator_parallel_connection_refused(simulator, monkeypatch):
+    with LogixDriver(simulator.path, large_packets=False, connections=3) as plc:
+        tags = [f'DINT_ARY1[{i}]' for i in range(100)]
+        plc.coalesce_array_reads = False
+        with monkeypatch.context() as m:
+            m.setattr(_ParallelConnection, '_forward_open', lambda self: False)
+            expected = plc.read(*tags)
+        assert all(expected)
+        assert plc._parallel_connections == [] and plc.connections == 3
+        assert plc.read(*tags) == expected
+        assert len(plc._parallel_connections) == 2
+
+
+def test_simulator_list_identities(simulator):
+    identities = CIPDriver.list_identities([simulator.path, unused_address()], timeout=0.5)
+    assert len(identities) == 1
+    assert identities[0]['ip_address'] == '127.0.0.1'
+    assert identities[0]['product_name'] == simulator.product_name
+
+    assert CIPDriver.list_identities(simulator.path, timeout=0.5) == identities  # a single ip:port
+
+    simulator._udp_server.socket.close()  # only reachable over TCP
+    try:
+        assert CIPDriver.list_identities([simulator.path], timeout=0.5) == identities
+        assert CIPDriver.list_identities([simulator.path], timeout=0.5, tcp_fallback=False) == []
+    finally:
+        simulator.stop()
+        simulator.start()
+
+
+def test_simulator_rack_info():
+    modules = {0: {}, 2: {'product_name': '1756-EN2T/D', 'product_type': 12, 'revision': (11, 2)}}
+    with PLCSimulator(port=0, modules=modules) as sim, CIPDriver(sim.path) as driver:
+        rack = driver.get_rack_info(slots=4, slot_timeout=0.1)
+        assert list(rack) == [0, 2]
+        assert rack[0]['device_type'] == sim.product_name
+        assert rack[2]['device_type'] == '1756-EN2T/D'
+        assert rack[2]['revision'] == '11.2'
+
+        unreachable = unused_address()
+        survey = CIPDriver.survey([sim.path, unreachable], slots=[2])
+        assert survey == {sim.path: {2: rack[2]}, unreachable: None}
+
+        async def _test():
+            async with AsyncCIPDriver(sim.path) as async_driver:
+                assert await async_driver.get_rack_info(slots=4, slot_timeout=0.1) == rack
+            return await AsyncCIPDriver.survey([sim.path, unreachable], slots=[2])
+
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(_test()) == survey
+        finally:
+            loop.close()
+
+
+def test_simulator_pipelined_timeout(plc, simulator):
+    parsed = plc._parse_requested_tags(['DINT1', 'TestUDT1_1.string'])
+    requests = [plc._read_build_single_request(tag_data) for tag_data in parsed.values()]
+    simulator.latency = 0.2
+    try:
+        for request in requests:
+            request.timeout = 0.05
+        with pytest.raises(CommError):
+            list(plc._send_pipelined(requests, window=2))
+        plc.reconnect()  # late replies would be mistaken for the replies to the next requests
+
+        requests = [plc._read_build_single_request(tag_data) for tag_data in parsed.values()]
+        requests[0].timeout = 0.05  # replies are 0.2s apart, waits for the longest timeout of the pending requests
+        requests[1].timeout = 1.0
+        assert all(response for _, response in plc._send_pipelined(requests, window=2))
+    finally:
+        simulator.latency = 0.0
+
+
+def test_simulator_socket_options(simulator):
+    options = SocketOptions(keepalive_count=3, recv_buffer_size=65536, source_address='127.0.0.1')
+    with CIPDriver(simulator.path, timeout=2.5, socket_options=options) as driver:
+        sock = driver._sock.sock
+        assert sock.gettimeout() == 2.5
+        assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+        assert sock.getsockname()[0] == '127.0.0.1'
+        assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) >= 65536
+
+        simulator.latency = 0.2
+        try:
+            with pytest.raises(CommError):
+                driver.new_request('list_identity').send(timeout=0.05)
+        finally:
+            simulator.latency = 0.0
+
+        with pytest.raises(ValueError):
+            driver.timeout = 0
+
+
+def test_simulator_invalid_timeout(plc):
+    with pytest.raises(ValueError):
+        CIPDriver(plc._cfg['ip address'], timeout=0)
+    with pytest.raises(ValueError):
+        plc.timeout = 0
+    with pytest.raises(ValueError):
+        plc.new_request('nop').send(timeout=0)
+    with pytest.raises(ValueError):
+        plc._sock.receive(timeout=0)
+    assert plc.read('DINT1')  # nothing was sent or received
@@ -0,0 +1,165 @@
+import struct
+import pytest
+from pycomm3 import SLCDriver
+from pycomm3.const import SLC_MAX_DATA_SIZE, SLC_FNC_WRITE
+from pycomm3.simulator import PLCSimulator
+from pycomm3.slc import parse_tag, request_status, _merge_read_ranges, _merge_write_ranges, _range_chunks
+
+N_ELEMENTS = 256
+
+
+@pytest.fixture(scope='module')
+def simulator():
+    with PLCSimulator(port=0, data_files={'N7': list(range(N_ELEMENTS)), 'F8': [0.5 * i for i in range(64)],
+                                          'B3': 4, 'L9': 4, 'T4': 2}) as sim:
+        yield sim
+
+
+@pytest.fixture(scope='module')
+def plc(simulator):
+    # overrides the autouse fixture connecting to a real PLC
+    with SLCDriver(simulator.path) as plc_:
+        yield plc_
+
+
+def _parse(*addresses):
+    return [parse_tag(address) for address in addresses]
+
+
+def test_merge_read_ranges():
+    parsed = _parse('N7:4', 'N7:0{3}', 'N7:2{2}', 'N7:10', 'F8:0', 'N7:3/4', 'I:1.0', 'N9:4')
+    ranges, tag_ranges = _merge_read_ranges(parsed)
+
+    n7 = [r for r in ranges if r['file_address'] == parsed[0].file_address]
+    assert [(r['element'], r['count']) for r in n7] == [(0, 5), (10, 1)]  # 0-2, 2-3, 3 and 4 are contiguous
+    assert tag_ranges[1] == (n7[0], 0, 6)
+    assert tag_ranges[2] == (n7[0], 4, 4)  # overlapping reads share the data
+    assert tag_ranges[0] == (n7[0], 8, 2)
+    assert tag_ranges[5] == (n7[0], 6, 2)  # bit reads read the whole word
+    assert tag_ranges[3][0] is n7[1]
+
+    io_range = tag_ranges[6][0]
+    assert not io_range['merge'] and io_range['pos_number'] == 0
+    assert tag_ranges[4][0] is not tag_ranges[7][0]
+    assert len(ranges) == 5
+    assert all(len(r['data']) == r['count'] * r['data_size'] for r in ranges)
+
+
+@pytest.mark.parametrize('address, count, chunks', [
+    ('N7:0', SLC_MAX_DATA_SIZE // 2, [(0, SLC_MAX_DATA_SIZE // 2)]),
+    ('N7:0', SLC_MAX_DATA_SIZE // 2 + 1, [(0, SLC_MAX_DATA_SIZE // 2), (SLC_MAX_DATA_SIZE // 2, 1)]),
+    ('N7:10', 2 * (SLC_MAX_DATA_SIZE // 2), [(10, SLC_MAX_DATA_SIZE // 2), (10 + SLC_MAX_DATA_SIZE // 2,
+                                                                             SLC_MAX_DATA_SIZE // 2)]),
+    ('F8:0', SLC_MAX_DATA_SIZE // 4 + 1, [(0, SLC_MAX_DATA_SIZE // 4), (SLC_MAX_DATA_SIZE // 4, 1)]),
+    ('ST9:0', 2, [(0, 2)]),
+])
+def test_range_chunks(address, count, chunks):
+    ranges, _ = _merge_read_ranges(_parse(f'{address}{{{count}}}'))
+    assert list(_range_chunks(ranges[0])) == chunks
+    assert all(chunk_count * ranges[0]['data_size'] <= SLC_MAX_DATA_SIZE for _, chunk_count in chunks)
+
+
+def test_range_chunks_not_merged():
+    ranges, _ = _merge_read_ranges(_parse('I:1.0'))
+    assert list(_range_chunks(ranges[0])) == [(1, 1)]
+
+
+def test_read_large_ranges(plc):
+    count = SLC_MAX_DATA_SIZE // 2 + 1
+    assert plc.read(f'N7:0{{{count}}}').value == list(range(count))
+    results = plc.read(f'N7:{N_ELEMENTS - 1}', 'N7:0{200}', 'N7:100{20}', 'F8:0{60}', 'N7:130/0')
+    assert results[0].value == N_ELEMENTS - 1
+    assert results[1].value == list(range(200))
+    assert results[2].value == list(range(100, 120))
+    assert results[3].value == [0.5 * i for i in range(60)]
+    assert results[4].value is False
+
+
+def test_read_separately(plc):
+    # B3 has 4 elements, the combined read of B3:2{3} fails so the valid addresses are read by themselves
+    results = plc.read('B3:3', 'B3:4', 'B3:2', 'N7:5')
+    assert [bool(result) for result in results] == [True, False, True, True]
+    assert results[3].value == 5
+
+    result = plc.read('B3:3{2}')  # a failed read of a single address is not repeated
+    assert not result
+
+
+def _write_ranges(*address_values):
+    return _merge_write_ranges([(parse_tag(address), value) for address, value in address_values])
+
+
+def test_merge_write_ranges():
+    ranges, tag_ranges = _write_ranges(('N7:2', 2), ('N7:0{2}', [0, 1]), ('N7:3', 3), ('N7:10', 10), ('F8:0', 1.5),
+                                       ('N7:4/0', True))
+    assert [(r['element'], r['count']) for r in ranges if r['merge']] == [(0, 4), (10, 1), (0, 1)]
+    assert tag_ranges[0] is tag_ranges[1] is tag_ranges[2]
+    assert bytes(tag_ranges[0]['data']) == struct.pack('<4h', 0, 1, 2, 3)
+    assert not tag_ranges[5]['merge']  # bit writes are never combined
+
+
+def test_merge_overlapping_write_ranges():
+    values = [('N7:1', 1), ('N7:0{3}', [5, 6, 7]), ('N7:2', 2), ('N7:5', 5)]
+    ranges, tag_ranges = _write_ranges(*values)
+    # any overlap in a file writes all of its addresses separately, in the order given
+    assert [(r['element'], r['count']) for r in ranges] == [(1, 1), (0, 3), (2, 1), (5, 1)]
+    assert [r['data'] for r in tag_ranges] == [struct.pack('<h', 1), struct.pack('<3h', 5, 6, 7),
+                                               struct.pack('<h', 2), struct.pack('<h', 5)]
+
+
+def test_write_ranges(plc):
+    results = plc.write(('N7:201', 1), ('N7:200', 0), ('N7:202{2}', [2, 3]), ('N9:0', 1), ('B3:1/3', True))
+    assert [bool(result) for result in results] == [True, True, True, False, True]
+    assert plc.read('N7:200{4}').value == [0, 1, 2, 3]
+    assert plc.read('B3:1/3').value is True
+
+    results = plc.write(('N7:210', 1), ('N7:209{3}', [5, 6, 7]), ('N7:211', 2))
+    assert all(results)
+    assert plc.read('N7:209{3}').value == [5, 6, 2]  # written in order
+
+    count = SLC_MAX_DATA_SIZE // 2 + 10
+    assert plc.write((f'N7:0{{{count}}}', list(range(count, 0, -1))))
+    assert plc.read(f'N7:0{{{count}}}').value == list(range(count, 0, -1))
+
+
+def test_typed_write_size(plc):
+    request = plc._new_pccc_request(SLC_FNC_WRITE, _write_ranges(('N7:255', 1))[0][0], 255, 1, b'\x01\x00' * 2)
+    assert request_status(request.send().raw) is not None  # data longer than the size is rejected, not a mask
+
+
+def test_masked_writes(plc, simulator):
+    assert all(plc.write(('L9:0', 0x10000), ('L9:0/3', True), ('T4:0.PRE', 500), ('T4:0.ACC', 20), ('T4:0.DN', True),
+                         ('N7:250', 0), ('N7:250/2', True), ('N7:250/3', True), ('N7:250/2', False)))
+    assert plc.read('L9:0').value == 0x10008  # written in order, the bit is not overwritten by the element write
+    assert plc.read('N7:250').value == 8
+    assert [tag.value for tag in plc.read('T4:0.PRE', 'T4:0.ACC', 'T4:0.DN')] == [500, 20, True]
+    assert simulator.read_data_file('T4')[:6] == struct.pack('<3h', 1 << 13, 500, 20)
+
+    ranges, _ = _write_ranges(('T4:1.PRE', 5), ('L9:1/4', True))
+    assert [(r['pos_number'], r['data_size'], r['masked']) for r in ranges] == [(1, 2, True), (0, 4, True)]
+
+
+@pytest.mark.parametrize('address, expected', [
+    ('N7:0{3}', ('N7:0', 'N', 7, 0, None, None, 2, 3)),
+    ('n7:255', ('n7:255', 'N', 7, 255, None, None, 2, 1)),
+    ('F8:2', ('F8:2', 'F', 8, 2, None, None, 2, 1)),
+    ('B3/37', ('B3/37', 'B', 3, 2, 5, None, 3, 1)),
+    ('B3:1/15', ('B3:1/15', 'B', 3, 1, 15, None, 3, 1)),
+    ('T4:0.ACC', ('T4:0.ACC', 'T', 4, 0, 2, None, 3, 1)),
+    ('C5:1.PRE', ('C5:1.PRE', 'C', 5, 1, 1, None, 3, 1)),
+    ('I:1.0/3', ('I:1.0/3', 'I', 1, 1, 3, 0, 3, 1)),
+    ('O:2.1', ('O:2.1', 'O', 0, 2, None, 1, 2, 1)),
+    ('S:1/5', ('S:1/5', 'S', 2, 1, 5, None, 3, 1)),
+    ('ST9:0{2}', ('ST9:0', 'ST', 9, 0, None, None, 2, 2)),
+    ('L10:1', ('L10:1', 'L', 10, 1, None, None, 2, 1)),
+])
+def test_parse_tag(address, expected):
+    address_ = parse_tag(address)
+    assert (address_.tag, address_.file_type, address_.file_number, address_.element_number, address_.sub_element,
+            address_.pos_number, address_.address_field, address_.element_count) == expected
+    assert parse_tag(address) is address_  # cached
+
+
+@pytest.mark.parametrize('address', ['N7:256', 'N0:1', 'N256:1', 'B3:1/16', 'B3/4096', 'R6:0.LEN', 'X7:0', ''])
+def test_parse_tag_invalid(address):
+    assert parse_tag(address) is None
@@ -0,0 +1,161 @@
+import os
+import pytest
+from pycomm3 import LogixDriver
+from pycomm3.simulator import PLCSimulator
+from pycomm3.tag_cache import tag_registry, tag_cache_key
+
+
+L5X = os.path.join(os.path.dirname(__file__), 'Pycomm3_Testing.L5X')
+
+
+@pytest.fixture(scope='module')
+def simulator():
+    with PLCSimulator.from_l5x(L5X, port=0) as sim:
+        yield sim
+
+
+@pytest.fixture(scope='module')
+def plc(simulator):
+    # overrides the autouse fixture connecting to a real PLC
+    with LogixDriver(simulator.path, init_tags=False) as plc_:
+        yield plc_
+
+
+def test_tag_cache(simulator, tmp_path, monkeypatch):
+    cache_file = str(tmp_path / 'tags.cache')
+    with LogixDriver(simulator.path, init_program_tags=True, tag_cache=cache_file) as plc:
+        uploaded_tags, uploaded_types, uploaded_info = plc.tags, plc.data_types, plc.info
+
+    assert os.path.exists(cache_file)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError('tag list uploaded instead of loaded from cache')
+
+    with monkeypatch.context() as m:
+        m.setattr(LogixDriver, 'get_tag_list', _fail)
+        with LogixDriver(simulator.path, init_program_tags=True, tag_cache=cache_file) as plc:
+            assert plc.tags == uploaded_tags
+            assert plc.data_types == uploaded_types
+            for key in ('programs', 'tasks', 'modules'):
+                assert plc.info[key] == uploaded_info[key]
+            assert plc.tags['TestUDT1_1']['data_type'] is plc.data_types['TestUDT1']
+            assert plc.read('TestUDT1_1.string').value == 'Hello World!!!'
+
+    simulator.add_tag('NewTag', 'DINT', 5)
+    with LogixDriver(simulator.path, init_program_tags=True, tag_cache=cache_file) as plc:
+        assert 'NewTag' in plc.tags
+
+
+def test_shared_tags(simulator, monkeypatch):
+    uploads = []
+    get_tag_list = LogixDriver.get_tag_list
+
+    def _get_tag_list(self, *args, **kwargs):
+        uploads.append(self)
+        return get_tag_list(self, *args, **kwargs)
+
+    monkeypatch.setattr(LogixDriver, 'get_tag_list', _get_tag_list)
+    drivers = [LogixDriver(simulator.path, init_program_tags=True, share_tags=True) for _ in range(3)]
+    try:
+        assert len(uploads) == 1
+        assert all(plc.tags is drivers[0].tags for plc in drivers)
+        assert all(plc.data_types is drivers[0].data_types for plc in drivers)
+        assert all(plc.info['programs'] is drivers[0].info['programs'] for plc in drivers)
+        assert drivers[2].read('TestUDT1_1.string').value == 'Hello World!!!'
+        key = tag_cache_key(drivers[0].info)
+        drivers[0].close()
+        assert key in tag_registry
+    finally:
+        for plc in drivers:
+            plc.close()
+
+    assert key not in tag_registry  # removed once the last driver using it closed
+
+
+def test_refresh_tag_list(simulator):
+    with LogixDriver(simulator.path, init_program_tags=True) as plc:
+        udt_type = plc.data_types['TestUDT1']
+        assert plc.refresh_tag_list() == {'added': [], 'changed': [], 'removed': []}
+
+        simulator.add_tag('RefreshUDT', 'TestUDT1')
+        simulator.add_tag('RefreshDINT', 'DINT', 1)
+        simulator.add_tag('RefreshDINT', 'INT', 2)
+        changes = plc.refresh_tag_list()
+        assert changes['added'] == ['RefreshUDT', 'RefreshDINT']
+        assert plc.tags['RefreshUDT']['data_type'] is udt_type
+        assert plc.read('RefreshDINT').value == 2
+
+        simulator.add_tag('RefreshDINT', 'DINT', 3)
+        assert plc.refresh_tag_list()['changed'] == ['RefreshDINT']
+        assert plc.read('RefreshDINT').value == 3
+
+
+def test_shared_tags_replaced(simulator):
+    simulator.add_tag('SharedTag', 'DINT', 1)
+    with LogixDriver(simulator.path, share_tags=True) as plc1:
+        group = plc1.prepare_read('SharedTag')
+        assert plc1.read('SharedTag').value == 1
+        assert group.read().value == 1
+
+        simulator.add_tag('SharedTag', 'REAL', 2.5)
+        with LogixDriver(simulator.path, share_tags=True) as plc2:  # uploads and shares the new definitions
+            assert plc2.tags is not plc1.tags
+            assert plc1.read('SharedTag').value == 2.5
+            assert plc1.tags is plc2.tags
+            assert group.read().value == 2.5
+
+
+def test_shared_tags_refreshed(simulator):
+    simulator.add_tag('SharedDINT', 'DINT', 1)
+    with LogixDriver(simulator.path, share_tags=True) as plc1, LogixDriver(simulator.path, share_tags=True) as plc2:
+        assert plc1.tags is plc2.tags
+        tags = plc1.tags
+        instance_id = tags['SharedDINT']['instance_id']
+        assert plc2.read('SharedDINT').value == 1
+
+        simulator.remove_tag('SharedDINT')
+        simulator.add_tag('SharedDINT', 'DINT', 2)
+        assert plc1.refresh_tag_list()['changed'] == ['SharedDINT']
+        assert plc1.tags['SharedDINT']['instance_id'] != instance_id
+        assert tags['SharedDINT']['instance_id'] == instance_id  # the old definitions are not changed
+
+        assert plc2.read('SharedDINT').value == 2
+        assert plc2.tags is plc1.tags
+
+
+def test_shared_lazy_data_types(simulator):
+    kwargs = dict(share_tags=True, lazy_data_types=True)
+    with LogixDriver(simulator.path, **kwargs) as plc1, LogixDriver(simulator.path, **kwargs) as plc2:
+        tags, data_types = plc1.tags, plc1.data_types
+        assert plc1.read('TestUDT1_1.string').value == 'Hello World!!!'
+        assert tags['TestUDT1_1']['data_type'] is None and not data_types  # the shared definitions are not changed
+        assert plc1.tags['TestUDT1_1']['data_type'] is plc1.data_types['TestUDT1']
+
+        assert plc2.read('TestUDT1_1.string').value == 'Hello World!!!'
+        assert plc2.tags is plc1.tags  # uses the data types uploaded by plc1
+
+
+def test_batched_template_upload(simulator, monkeypatch):
+    batches = []
+    send_pipelined = LogixDriver._send_pipelined
+
+    def _send_pipelined(self, requests, *args, **kwargs):
+        requests = list(requests)
+        batches.append([request.type_ for request in requests])
+        return send_pipelined(self, requests, *args, **kwargs)
+
+    monkeypatch.setattr(LogixDriver, '_send_pipelined', _send_pipelined)
+    with LogixDriver(simulator.path, init_program_tags=True) as plc:
+        struct_tags = [tag for tag in plc.tags.values() if tag['tag_type'] == 'struct']
+        template_ids = {tag['template_instance_id'] for tag in struct_tags}
+        num_templates = len(plc.data_types)
+        assert num_templates > len(template_ids)  # includes the nested data types
+        makeup_requests = sum(batch.count('multi') for batch in batches)
+        assert makeup_requests < num_templates
+        assert max(len(batch) for batch in batches) > 1  # the templates are read pipelined
+
+        # the same data types as uploading each template one at a time
+        uploaded = {tag['tag_name']: tag['data_type'] for tag in struct_tags}
+        plc._cache = {'id:struct': {}, 'handle:id': {}, 'id:udt': {}}
+        for tag in struct_tags:
+            assert plc._get_data_type(tag['template_instance_id']) == uploaded[tag['tag_name']]